@@ -0,0 +1,152 @@
+{#
+    Helpers shared by the agg_claims_* rollup models.
+
+    Every rollup is keyed by source_system and claim_month: the month of the
+    incident, or the month the claim was first loaded when it has no
+    incident date (sources B and C). The first-load month never moves, but a
+    claim delivered again with another incident date (source A) moves to
+    another slice. fct_claims notes the slice it left in
+    previous_claim_month and appends it to claim_month_moves, so the
+    incremental runs re-aggregate both slices.
+#}
+
+{% macro rollup_month(alias=none) -%}
+    {%- set prefix = alias ~ '.' if alias else '' -%}
+    DATE_TRUNC('month', COALESCE({{ prefix }}incident_date, {{ prefix }}first_load_timestamp))
+{%- endmacro %}
+
+
+{#
+    Log of the slices claims left: one row per delivery that moved a claim
+    to another month. previous_claim_month on fct_claims only holds the
+    latest move, and fct_claims may run more than once between two rollup
+    runs, so every move is kept here. Created and appended by fct_claims'
+    post-hook; claim_month_moves() is none until then.
+#}
+{% macro record_claim_month_moves() %}
+    CREATE TABLE IF NOT EXISTS {{ this.schema }}.claim_month_moves (
+        claim_id TEXT NOT NULL,
+        source_system TEXT NOT NULL,
+        claim_month TIMESTAMP NOT NULL,
+        load_timestamp TIMESTAMP NOT NULL,
+        PRIMARY KEY (claim_id, load_timestamp)
+    );
+    INSERT INTO {{ this.schema }}.claim_month_moves
+    SELECT claim_id, source_system, previous_claim_month, load_timestamp
+    FROM {{ this }}
+    WHERE previous_claim_month IS NOT NULL
+    ON CONFLICT DO NOTHING
+{% endmacro %}
+
+{% macro claim_month_moves(claims) %}
+    {{ return(adapter.get_relation(database=claims.database, schema=claims.schema,
+                                   identifier='claim_month_moves')) }}
+{% endmacro %}
+
+
+{#
+    (source_system, claim_month text) slices changed since the rollup was
+    built. Candidates hold claims loaded at or after the rollup's newest
+    latest_load for their source (see macros/source_watermarks.sql); a
+    candidate changed when it is new, has claims loaded after its own
+    latest_load, or has gained claims under that same load_timestamp (a
+    multi-file load commits file by file). A slice a claim moved out of
+    since the watermark changed when its claim count no longer matches.
+    Looked up while compiling so the model gets literals: with a subquery
+    instead, the planner cannot tell how few rows qualify and scans all of
+    fct_claims.
+#}
+{% macro changed_rollup_slices(claims) %}
+    {% if not execute %}
+        {{ return([]) }}
+    {% endif %}
+    {% set watermarks = source_watermarks(this, 'latest_load', sources_from=claims) %}
+    {% set moves = claim_month_moves(claims) %}
+    {% set slices_query %}
+        WITH candidates AS (
+            SELECT source_system, {{ rollup_month() }} AS claim_month,
+                   MAX(load_timestamp) AS latest_load
+            FROM {{ claims }}
+            WHERE {{ since_source_watermarks(watermarks, other_sources=false) }}
+            GROUP BY 1, 2
+        ),
+        built AS (
+            SELECT source_system, claim_month,
+                   MAX(latest_load) AS latest_load, SUM(claim_count) AS claim_count
+            FROM {{ this }}
+            GROUP BY 1, 2
+        )
+        SELECT c.source_system, c.claim_month::TEXT
+        FROM candidates c
+        LEFT JOIN built b USING (source_system, claim_month)
+        WHERE b.latest_load IS NULL
+           OR c.latest_load > b.latest_load
+           OR b.claim_count <> (
+               SELECT COUNT(*) FROM {{ claims }} f
+               WHERE f.source_system = c.source_system
+                 AND {{ rollup_month('f') }} = c.claim_month
+           )
+        {% if moves %}
+        UNION
+        SELECT m.source_system, m.claim_month::TEXT
+        FROM (
+            SELECT DISTINCT source_system, claim_month
+            FROM {{ moves }}
+            WHERE {{ since_source_watermarks(watermarks, other_sources=false) }}
+        ) m
+        LEFT JOIN built b USING (source_system, claim_month)
+        WHERE COALESCE(b.claim_count, 0) <> (
+            SELECT COUNT(*) FROM {{ claims }} f
+            WHERE f.source_system = m.source_system
+              AND {{ rollup_month('f') }} = m.claim_month
+        )
+        {% endif %}
+    {% endset %}
+    {{ return(run_query(slices_query).rows) }}
+{% endmacro %}
+
+
+{#
+    fct_claims rows to aggregate. A full build reads them all; an
+    incremental run reads only the changed slices, through the
+    (source_system, rollup month) index on fct_claims, and the model's
+    delete+insert on [source_system, claim_month] swaps those slices whole.
+    python/duckdb_engine.py renders the full-build form itself; keep its
+    ROLLUP_CLAIMS_SQL in step with this macro.
+#}
+{% macro rollup_claims(claims) %}
+    SELECT c.*, {{ rollup_month('c') }} AS claim_month
+    FROM {{ claims }} c
+    {% if is_incremental() %}
+    {% set slices = changed_rollup_slices(claims) %}
+    {% if slices | length > 0 %}
+    WHERE (c.source_system, {{ rollup_month('c') }}) IN (
+        {%- for source_system, claim_month in slices %}
+        ('{{ source_system }}', '{{ claim_month }}'::TIMESTAMP){{ ',' if not loop.last }}
+        {%- endfor %}
+    )
+    {% else %}
+    WHERE FALSE
+    {% endif %}
+    {% endif %}
+{% endmacro %}
+
+
+{#
+    Post-hook of the rollups: delete+insert only replaces slices that still
+    have claims, so a slice every claim moved out of is deleted here.
+#}
+{% macro drop_emptied_slices(claims) %}
+    {% set moves = claim_month_moves(claims) %}
+    {% if moves %}
+    DELETE FROM {{ this }} r
+    USING (SELECT DISTINCT source_system, claim_month FROM {{ moves }}) m
+    WHERE r.source_system = m.source_system
+      AND r.claim_month = m.claim_month
+      AND NOT EXISTS (
+          SELECT 1 FROM {{ claims }} f
+          WHERE f.source_system = m.source_system
+            AND {{ rollup_month('f') }} = m.claim_month
+      )
+    {% endif %}
+{% endmacro %}
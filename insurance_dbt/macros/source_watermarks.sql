@@ -0,0 +1,68 @@
+{#
+    Incremental watermarks kept per source_system.
+
+    python/load_all.py loads the sources concurrently and each load stamps
+    its rows with the time it started, so a source can commit rows older
+    than another source's newest. One MAX(load_timestamp) over every source
+    would skip them; the newest timestamp of each source never moves back.
+#}
+
+{#
+    (source_system, newest column value as text) of a relation. Looked up
+    while compiling so the models get literals: a correlated subquery is
+    not pushed into the int_claims_unified branches and scans every raw row.
+    With sources_from, every source found there is listed, '-infinity'
+    where the relation has none of its rows yet.
+#}
+{% macro source_watermarks(relation, column='load_timestamp', sources_from=none) %}
+    {% if not execute %}
+        {{ return([]) }}
+    {% endif %}
+    {% set watermarks_query %}
+        {% if sources_from %}
+        SELECT s.source_system, COALESCE(w.watermark, '-infinity'::TIMESTAMP)::TEXT
+        FROM (SELECT DISTINCT source_system FROM {{ sources_from }}) s
+        LEFT JOIN (
+            SELECT source_system, MAX({{ column }}) AS watermark
+            FROM {{ relation }}
+            GROUP BY source_system
+        ) w USING (source_system)
+        {% else %}
+        SELECT source_system, MAX({{ column }})::TEXT
+        FROM {{ relation }}
+        GROUP BY source_system
+        {% endif %}
+    {% endset %}
+    {{ return(run_query(watermarks_query).rows) }}
+{% endmacro %}
+
+
+{#
+    Predicate keeping rows at or after their source's watermark: one range
+    per source, which an index on (source_system, column) or on column
+    serves. Sources without a watermark pass whole unless other_sources is
+    false (the watermarks already list every source). >= re-reads the
+    newest load because a multi-file load commits file by file under one
+    load_timestamp, so callers skip or rebuild what they have seen.
+#}
+{% macro since_source_watermarks(watermarks, column='load_timestamp', alias=none,
+                                 other_sources=true) %}
+    {%- set prefix = alias ~ '.' if alias else '' -%}
+    {%- if watermarks | length > 0 -%}
+    (
+        {%- for source_system, watermark in watermarks %}
+        ({{ prefix }}source_system = '{{ source_system }}'
+         AND {{ prefix }}{{ column }} >= '{{ watermark }}'::TIMESTAMP){{ ' OR' if not loop.last }}
+        {%- endfor %}
+        {%- if other_sources %}
+        OR {{ prefix }}source_system NOT IN (
+            {%- for source_system, watermark in watermarks -%}
+            '{{ source_system }}'{{ ', ' if not loop.last }}
+            {%- endfor -%}
+        )
+        {%- endif %}
+    )
+    {%- else -%}
+    {{ 'TRUE' if other_sources else 'FALSE' }}
+    {%- endif -%}
+{% endmacro %}
@@ -63,10 +63,10 @@ WITH customer_a_claims AS (
         property_damage,
         
         -- Claim amounts
-        total_claim_amount::DECIMAL,
-        injury_claim_amount::DECIMAL,
-        property_claim_amount::DECIMAL,
-        vehicle_claim_amount::DECIMAL,
+        total_claim_amount::DECIMAL AS total_claim_amount,
+        injury_claim_amount::DECIMAL AS injury_claim_amount,
+        property_claim_amount::DECIMAL AS property_claim_amount,
+        vehicle_claim_amount::DECIMAL AS vehicle_claim_amount,
         
         -- Prior claims
         NULL::INTEGER AS prior_claim_count,
@@ -0,0 +1,38 @@
+{{
+    config(
+        materialized='incremental',
+        schema='analytics',
+        unique_key=['source_system', 'claim_month'],
+        incremental_strategy='delete+insert',
+        indexes=[
+            {'columns': ['incident_date']},
+            {'columns': ['latest_load']}
+        ],
+        post_hook="{{ drop_emptied_slices(ref('fct_claims')) }}"
+    )
+}}
+
+/*
+    Rollup: Claims by Incident Date and Source
+    Daily claim counts and amounts for the running totals in query 1.2.
+    Claims without an incident date collapse into one row per source and
+    first-load month (incident_date NULL) so the incremental watermark still
+    covers them.
+
+    Incremental like agg_claims_segments_monthly; see macros/claim_rollups.sql.
+*/
+
+WITH claims AS (
+    {{ rollup_claims(ref('fct_claims')) }}
+)
+
+SELECT
+    claim_month,
+    source_system,
+    incident_date,
+    COUNT(*) AS claim_count,
+    COUNT(total_claim_amount) AS amount_count,
+    SUM(total_claim_amount) AS amount_sum,
+    MAX(load_timestamp) AS latest_load
+FROM claims
+GROUP BY 1, 2, 3
@@ -0,0 +1,87 @@
+{{
+    config(
+        materialized='incremental',
+        schema='analytics',
+        unique_key=['source_system', 'claim_month'],
+        incremental_strategy='delete+insert',
+        indexes=[
+            {'columns': ['source_system', 'claim_month']},
+            {'columns': ['latest_load']}
+        ],
+        post_hook="{{ drop_emptied_slices(ref('fct_claims')) }}"
+    )
+}}
+
+/*
+    Rollup: Claims by Month, Source and Segment
+    Additive claim measures at month x source x age group x vehicle age x
+    gender x incident severity, for queries 3.1, 4.1 and 6.1 and
+    mart_claims_summary.
+
+    Only sums, counts, mins and maxes are stored so any coarser grain can be
+    rebuilt with SUM/MIN/MAX: averages are sum / count, rates are count /
+    count. claim_month is the incident month, or the first-load month where
+    has_incident_date is false (see macros/claim_rollups.sql).
+
+    Incremental runs re-aggregate just the (source, month) slices that
+    received new claims or lost a claim to another month, so their cost
+    follows the load, not the history. Use `dbt run --full-refresh` after
+    deleting raw rows, as for fct_claims.
+*/
+
+WITH claims AS (
+    {{ rollup_claims(ref('fct_claims')) }}
+)
+
+SELECT
+    claim_month,
+    source_system,
+    incident_date IS NOT NULL AS has_incident_date,
+    age_group,
+    vehicle_age_category,
+    gender,
+    incident_severity,
+
+    -- Claim amounts
+    COUNT(*) AS claim_count,
+    COUNT(total_claim_amount) AS amount_count,
+    SUM(total_claim_amount) AS amount_sum,
+    MIN(total_claim_amount) AS amount_min,
+    MAX(total_claim_amount) AS amount_max,
+    COUNT(CASE WHEN total_claim_amount > 0 THEN 1 END) AS paid_claim_count,
+    SUM(CASE WHEN total_claim_amount > 0 THEN total_claim_amount END) AS paid_amount_sum,
+    COUNT(CASE WHEN claim_severity_category = 'Severe' THEN 1 END) AS severe_count,
+
+    -- Premiums
+    COUNT(policy_annual_premium) AS premium_count,
+    COUNT(CASE WHEN policy_annual_premium > 0 THEN 1 END) AS paid_premium_count,
+    SUM(CASE WHEN policy_annual_premium > 0 THEN policy_annual_premium END) AS paid_premium_sum,
+
+    -- Demographics and vehicle
+    COUNT(age) AS age_count,
+    SUM(age) AS age_sum,
+    COUNT(marital_status) AS marital_status_count,
+    COUNT(CASE WHEN marital_status = 'Married' THEN 1 END) AS married_count,
+    COUNT(vehicle_age) AS vehicle_age_count,
+    SUM(vehicle_age) AS vehicle_age_sum,
+    COUNT(vehicle_year) AS vehicle_year_count,
+
+    -- Fraud
+    COUNT(fraud_reported) AS fraud_known_count,
+    COUNT(CASE WHEN fraud_reported = TRUE THEN 1 END) AS fraud_count,
+    COUNT(CASE WHEN fraud_reported = TRUE THEN total_claim_amount END) AS fraud_amount_count,
+    SUM(CASE WHEN fraud_reported = TRUE THEN total_claim_amount END) AS fraud_amount_sum,
+    COUNT(CASE WHEN fraud_reported = FALSE THEN total_claim_amount END) AS legit_amount_count,
+    SUM(CASE WHEN fraud_reported = FALSE THEN total_claim_amount END) AS legit_amount_sum,
+
+    -- Data quality
+    SUM(data_quality_score) AS quality_score_sum,
+    MIN(data_quality_score) AS quality_score_min,
+    MAX(data_quality_score) AS quality_score_max,
+
+    -- Metadata
+    MIN(load_timestamp) AS earliest_load,
+    MAX(load_timestamp) AS latest_load
+
+FROM claims
+GROUP BY 1, 2, 3, 4, 5, 6, 7
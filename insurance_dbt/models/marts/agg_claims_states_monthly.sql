@@ -0,0 +1,41 @@
+{{
+    config(
+        materialized='incremental',
+        schema='analytics',
+        unique_key=['source_system', 'claim_month'],
+        incremental_strategy='delete+insert',
+        indexes=[
+            {'columns': ['source_system', 'claim_month']},
+            {'columns': ['latest_load']}
+        ],
+        post_hook="{{ drop_emptied_slices(ref('fct_claims')) }}"
+    )
+}}
+
+/*
+    Rollup: Claims by Month, Source and State
+    Claim counts and amounts per COALESCE(incident_state, policy_state) for
+    query 7.1. amount_sum_squares lets the sample standard deviation be
+    rebuilt at any coarser grain:
+        SQRT((SUM(amount_sum_squares) - SUM(amount_sum)^2 / n) / (n - 1))
+    with n = SUM(amount_count). Amounts are NUMERIC, so this is exact.
+
+    Incremental like agg_claims_segments_monthly; see macros/claim_rollups.sql.
+*/
+
+WITH claims AS (
+    {{ rollup_claims(ref('fct_claims')) }}
+)
+
+SELECT
+    claim_month,
+    source_system,
+    COALESCE(incident_state, policy_state) AS state,
+    COUNT(*) AS claim_count,
+    COUNT(total_claim_amount) AS amount_count,
+    SUM(total_claim_amount) AS amount_sum,
+    SUM(total_claim_amount * total_claim_amount) AS amount_sum_squares,
+    COUNT(CASE WHEN claim_severity_category = 'Severe' THEN 1 END) AS severe_count,
+    MAX(load_timestamp) AS latest_load
+FROM claims
+GROUP BY 1, 2, 3
@@ -1,17 +1,102 @@
 {{
     config(
-        materialized='table',
-        schema='analytics'
+        materialized='incremental',
+        schema='analytics',
+        unique_key='claim_id',
+        incremental_strategy='delete+insert',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['claim_id'], 'unique': True},
+            {'columns': ['load_timestamp']},
+            {'columns': ['source_system', 'load_timestamp']},
+            {'columns': ['incident_date']},
+            {'columns': ['total_claim_amount']}
+        ],
+        post_hook=[
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_incident_state_idx
+             ON {{ this }} ((COALESCE(incident_state, policy_state)))",
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_rollup_month_idx
+             ON {{ this }} (source_system, ({{ rollup_month() }}))",
+            "CREATE INDEX IF NOT EXISTS {{ this.name }}_moved_idx
+             ON {{ this }} (claim_id) WHERE previous_claim_month IS NOT NULL",
+            "{{ record_claim_month_moves() }}"
+        ]
     )
 }}
 
 /*
     Mart: Claims Analysis
     Final analytics-ready table for claims reporting
+
+    One row per claim: a claim delivered more than once keeps the version
+    with the latest load_timestamp.
+
+    Built incrementally: a run processes each source's raw rows loaded at or
+    after the newest load_timestamp the table holds for that source,
+    replacing any claim_id it sees again (first_load_timestamp keeps the
+    earliest delivery, as a full build does). The watermark is per source
+    (macros/source_watermarks.sql) because sources load concurrently. Use
+    `dbt run --full-refresh` after deleting raw rows.
+
+    Indexes follow sql/advanced_sql_queries.sql and the incremental filter:
+    - claim_id (unique): the delete+insert merge and the skip of rows
+      already built
+    - (source_system, load_timestamp): per-source MAX() watermark of every
+      incremental run; load_timestamp alone serves the global data version
+    - incident_date: date-ordered windows with LIMIT (1.3) and date-range
+      filters (10.1)
+    - total_claim_amount: top-N and threshold queries (2.1, 5.1)
+    - COALESCE(incident_state, policy_state): state lookups, and the
+      expression statistics ANALYZE gathers sharpen GROUP BY estimates (7.1)
+    - (source_system, rollup month): the (source, month) slices the
+      agg_claims_* rollups re-aggregate on each incremental run
+    - claim_id where previous_claim_month is set: the few moved claims the
+      post-hook copies to claim_month_moves (macros/claim_rollups.sql)
+    age_group gets none: it has 6 values and is only ever aggregated, and
+    the dashboards' aggregates (1.2, 3.1, 4.1, 6.1, 7.1) read the rollups.
+    Indexes are created with the table: after changing this list, or when
+    upgrading a table built before first_load_timestamp existed, run
+    `dbt run --full-refresh --select fct_claims+` once.
 */
 
 WITH claims AS (
-    SELECT * FROM {{ ref('int_claims_unified') }}
+    SELECT
+        ranked.*,
+        -- When the claim first arrived: its earliest delivery, so a rebuild
+        -- and incremental runs agree on the month the agg_claims_* rollups
+        -- place undated claims in
+        {% if is_incremental() %}
+        LEAST(prev.first_load_timestamp, ranked.first_delivery_load)
+        {% else %}
+        ranked.first_delivery_load
+        {% endif %} AS first_load_timestamp
+        {%- if is_incremental() %},
+        {{ rollup_month('prev') }} AS replaced_claim_month
+        {%- endif %}
+    FROM (
+        SELECT
+            unified.*,
+            ROW_NUMBER() OVER (
+                PARTITION BY source_system, source_claim_number
+                ORDER BY load_timestamp DESC
+            ) AS delivery_rank,
+            MIN(load_timestamp) OVER (
+                PARTITION BY source_system, source_claim_number
+            ) AS first_delivery_load
+        FROM {{ ref('int_claims_unified') }} unified
+        {% if is_incremental() %}
+        WHERE {{ since_source_watermarks(source_watermarks(this), alias='unified') }}
+        {% endif %}
+    ) ranked
+    {% if is_incremental() %}
+    LEFT JOIN {{ this }} prev
+        ON prev.claim_id = ranked.source_system || '_' || ranked.source_claim_number
+    {% endif %}
+    WHERE ranked.delivery_rank = 1
+    {% if is_incremental() %}
+    -- Rows of the re-read load that are already built are left alone
+    AND (prev.claim_id IS NULL OR prev.load_timestamp < ranked.load_timestamp)
+    {% endif %}
 ),
 
 enriched AS (
@@ -154,6 +239,13 @@ enriched AS (
         
         -- Metadata
         load_timestamp,
+        first_load_timestamp,
+        -- Rollup slice the replaced version was in, when this one moved it
+        {% if is_incremental() %}
+        NULLIF(replaced_claim_month, {{ rollup_month() }})
+        {% else %}
+        NULL::TIMESTAMP
+        {% endif %} AS previous_claim_month,
         CURRENT_TIMESTAMP AS created_at
         
     FROM claims
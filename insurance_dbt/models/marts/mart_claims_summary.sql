@@ -8,57 +8,71 @@
 /*
     Mart: Claims Summary by Source
     Aggregated statistics for comparing data sources
+
+    Built from agg_claims_segments_monthly rather than re-aggregating every
+    claim; GROUPING SETS adds the ALL_SOURCES row in the same pass.
 */
 
-WITH claims AS (
-    SELECT * FROM {{ ref('fct_claims') }}
+WITH segments AS (
+    SELECT * FROM {{ ref('agg_claims_segments_monthly') }}
+),
+
+-- Distinct policies and the median are not additive, so these two still
+-- read fct_claims; everything else comes from the monthly rollup
+exact_stats AS (
+    SELECT
+        COALESCE(source_system, 'ALL_SOURCES') AS source_system,
+        COUNT(DISTINCT source_policy_number) AS unique_policies,
+        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY total_claim_amount) AS median_claim_amount
+    FROM {{ ref('fct_claims') }}
+    GROUP BY GROUPING SETS ((source_system), ())
 ),
 
-source_summary AS (
+rollup_stats AS (
     SELECT
-        source_system,
+        COALESCE(source_system, 'ALL_SOURCES') AS source_system,
         
         -- Record counts
-        COUNT(*) AS total_claims,
-        COUNT(DISTINCT source_policy_number) AS unique_policies,
+        SUM(claim_count) AS total_claims,
         
         -- Claim amounts
-        SUM(total_claim_amount) AS total_claim_dollars,
-        AVG(total_claim_amount) AS avg_claim_amount,
-        MIN(total_claim_amount) AS min_claim_amount,
-        MAX(total_claim_amount) AS max_claim_amount,
-        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY total_claim_amount) AS median_claim_amount,
+        SUM(amount_sum) AS total_claim_dollars,
+        SUM(amount_sum) / NULLIF(SUM(amount_count), 0) AS avg_claim_amount,
+        MIN(amount_min) AS min_claim_amount,
+        MAX(amount_max) AS max_claim_amount,
         
         -- Demographics
-        AVG(age) AS avg_age,
-        COUNT(CASE WHEN gender = 'M' THEN 1 END)::FLOAT / NULLIF(COUNT(gender), 0) * 100 AS pct_male,
-        COUNT(CASE WHEN marital_status = 'Married' THEN 1 END)::FLOAT / NULLIF(COUNT(marital_status), 0) * 100 AS pct_married,
+        SUM(age_sum)::NUMERIC / NULLIF(SUM(age_count), 0) AS avg_age,
+        COALESCE(SUM(CASE WHEN gender = 'M' THEN claim_count END), 0)::DOUBLE PRECISION
+            / NULLIF(SUM(CASE WHEN gender IS NOT NULL THEN claim_count END), 0) * 100 AS pct_male,
+        SUM(married_count)::DOUBLE PRECISION / NULLIF(SUM(marital_status_count), 0) * 100 AS pct_married,
         
         -- Vehicle info
-        AVG(vehicle_age) AS avg_vehicle_age,
+        SUM(vehicle_age_sum) / NULLIF(SUM(vehicle_age_count), 0) AS avg_vehicle_age,
         
         -- Fraud
-        COUNT(CASE WHEN fraud_reported = TRUE THEN 1 END) AS fraud_count,
-        COUNT(CASE WHEN fraud_reported = TRUE THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 AS fraud_rate,
+        SUM(fraud_count) AS fraud_count,
+        SUM(fraud_count)::DOUBLE PRECISION / NULLIF(SUM(claim_count), 0) * 100 AS fraud_rate,
         
         -- Severity
-        COUNT(CASE WHEN claim_severity_category = 'Severe' THEN 1 END) AS severe_claims_count,
-        COUNT(CASE WHEN incident_severity = 'Total Loss' THEN 1 END) AS total_loss_count,
+        SUM(severe_count) AS severe_claims_count,
+        COALESCE(SUM(CASE WHEN incident_severity = 'Total Loss' THEN claim_count END), 0) AS total_loss_count,
         
         -- Data quality
-        AVG(data_quality_score) AS avg_data_quality_score,
-        MIN(data_quality_score) AS min_data_quality_score,
-        MAX(data_quality_score) AS max_data_quality_score,
+        SUM(quality_score_sum)::NUMERIC / NULLIF(SUM(claim_count), 0) AS avg_data_quality_score,
+        MIN(quality_score_min) AS min_data_quality_score,
+        MAX(quality_score_max) AS max_data_quality_score,
         
         -- Completeness metrics
-        COUNT(CASE WHEN age IS NOT NULL THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 AS pct_has_age,
-        COUNT(CASE WHEN incident_date IS NOT NULL THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 AS pct_has_incident_date,
-        COUNT(CASE WHEN vehicle_year IS NOT NULL THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 AS pct_has_vehicle_info,
-        COUNT(CASE WHEN policy_annual_premium IS NOT NULL THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 AS pct_has_premium,
+        SUM(age_count)::DOUBLE PRECISION / NULLIF(SUM(claim_count), 0) * 100 AS pct_has_age,
+        COALESCE(SUM(CASE WHEN has_incident_date THEN claim_count END), 0)::DOUBLE PRECISION
+            / NULLIF(SUM(claim_count), 0) * 100 AS pct_has_incident_date,
+        SUM(vehicle_year_count)::DOUBLE PRECISION / NULLIF(SUM(claim_count), 0) * 100 AS pct_has_vehicle_info,
+        SUM(premium_count)::DOUBLE PRECISION / NULLIF(SUM(claim_count), 0) * 100 AS pct_has_premium,
         
         -- Metadata
-        MIN(load_timestamp) AS earliest_load,
-        MAX(load_timestamp) AS latest_load,
+        MIN(earliest_load) AS earliest_load,
+        MAX(latest_load) AS latest_load,
         CURRENT_TIMESTAMP AS summary_created_at,
         
         -- Sort order helper
@@ -66,48 +80,17 @@ source_summary AS (
             WHEN source_system = 'customer_a' THEN 1
             WHEN source_system = 'customer_b' THEN 2
             WHEN source_system = 'customer_c' THEN 3
+            ELSE 4  -- ALL_SOURCES
         END AS sort_order
         
-    FROM claims
-    GROUP BY source_system
-),
-
-overall_summary AS (
-    SELECT
-        'ALL_SOURCES' AS source_system,
-        COUNT(*) AS total_claims,
-        COUNT(DISTINCT source_policy_number) AS unique_policies,
-        SUM(total_claim_amount) AS total_claim_dollars,
-        AVG(total_claim_amount) AS avg_claim_amount,
-        MIN(total_claim_amount) AS min_claim_amount,
-        MAX(total_claim_amount) AS max_claim_amount,
-        PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY total_claim_amount) AS median_claim_amount,
-        AVG(age) AS avg_age,
-        COUNT(CASE WHEN gender = 'M' THEN 1 END)::FLOAT / NULLIF(COUNT(gender), 0) * 100 AS pct_male,
-        COUNT(CASE WHEN marital_status = 'Married' THEN 1 END)::FLOAT / NULLIF(COUNT(marital_status), 0) * 100 AS pct_married,
-        AVG(vehicle_age) AS avg_vehicle_age,
-        COUNT(CASE WHEN fraud_reported = TRUE THEN 1 END) AS fraud_count,
-        COUNT(CASE WHEN fraud_reported = TRUE THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 AS fraud_rate,
-        COUNT(CASE WHEN claim_severity_category = 'Severe' THEN 1 END) AS severe_claims_count,
-        COUNT(CASE WHEN incident_severity = 'Total Loss' THEN 1 END) AS total_loss_count,
-        AVG(data_quality_score) AS avg_data_quality_score,
-        MIN(data_quality_score) AS min_data_quality_score,
-        MAX(data_quality_score) AS max_data_quality_score,
-        COUNT(CASE WHEN age IS NOT NULL THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 AS pct_has_age,
-        COUNT(CASE WHEN incident_date IS NOT NULL THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 AS pct_has_incident_date,
-        COUNT(CASE WHEN vehicle_year IS NOT NULL THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 AS pct_has_vehicle_info,
-        COUNT(CASE WHEN policy_annual_premium IS NOT NULL THEN 1 END)::FLOAT / NULLIF(COUNT(*), 0) * 100 AS pct_has_premium,
-        MIN(load_timestamp) AS earliest_load,
-        MAX(load_timestamp) AS latest_load,
-        CURRENT_TIMESTAMP AS summary_created_at,
-        4 AS sort_order  -- Sort order for ALL_SOURCES
-    FROM claims
+    FROM segments
+    GROUP BY GROUPING SETS ((source_system), ())
 ),
 
 combined AS (
-    SELECT * FROM source_summary
-    UNION ALL
-    SELECT * FROM overall_summary
+    SELECT r.*, e.unique_policies, e.median_claim_amount
+    FROM rollup_stats r
+    JOIN exact_stats e USING (source_system)
 )
 
 SELECT 
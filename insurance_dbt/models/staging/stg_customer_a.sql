@@ -22,7 +22,7 @@ cleaned AS (
         policy_number::TEXT AS source_claim_number,
         
         -- Policy information
-        policy_bind_date::DATE AS policy_effective_date,
+        policy_bind_date AS policy_effective_date,
         policy_state,
         policy_annual_premium,
         policy_deductable AS policy_deductible,
@@ -61,7 +61,7 @@ cleaned AS (
         EXTRACT(YEAR FROM CURRENT_DATE) - auto_year AS vehicle_age,
         
         -- Claim/Incident information
-        incident_date::DATE AS incident_date,
+        incident_date,
         incident_type,
         collision_type,
         incident_severity,
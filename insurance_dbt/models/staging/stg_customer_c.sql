@@ -42,17 +42,8 @@ cleaned AS (
         END AS marital_status,
         education,
         occupation,
-        CASE 
-            WHEN income LIKE '$%' THEN 
-                REPLACE(REPLACE(income, '$', ''), ',', '')::DECIMAL
-            ELSE NULL
-        END AS income_annual,
-        CASE 
-            WHEN home_value LIKE '$%' THEN 
-                REPLACE(REPLACE(home_value, '$', ''), ',', '')::DECIMAL
-            WHEN home_value = '$0' THEN 0
-            ELSE NULL
-        END AS home_value,
+        income AS income_annual,  -- Currency columns are typed by the loader
+        home_value,
         home_kids,
         years_on_job,
         travel_time AS travel_time_minutes,
@@ -60,11 +51,7 @@ cleaned AS (
         CASE WHEN parent1 = 'Yes' THEN TRUE ELSE FALSE END AS has_parent,
         
         -- Vehicle information
-        CASE 
-            WHEN bluebook_value LIKE '$%' THEN 
-                REPLACE(REPLACE(bluebook_value, '$', ''), ',', '')::DECIMAL
-            ELSE NULL
-        END AS vehicle_value,
+        bluebook_value AS vehicle_value,
         car_type AS vehicle_type,
         CASE 
             WHEN car_age IS NOT NULL AND car_age >= 0 
@@ -77,21 +64,11 @@ cleaned AS (
         
         -- Claims history
         claim_frequency AS prior_claim_count,
-        CASE 
-            WHEN old_claim LIKE '$%' THEN 
-                REPLACE(REPLACE(old_claim, '$', ''), ',', '')::DECIMAL
-            WHEN old_claim = '$0' THEN 0
-            ELSE NULL
-        END AS prior_claim_total_amount,
+        old_claim AS prior_claim_total_amount,
         
         -- Current claim
         CASE WHEN claim_flag = 1 THEN TRUE ELSE FALSE END AS has_claim,
-        CASE 
-            WHEN claim_amount LIKE '$%' THEN 
-                REPLACE(REPLACE(claim_amount, '$', ''), ',', '')::DECIMAL
-            WHEN claim_amount = '$0' THEN 0
-            ELSE NULL
-        END AS claim_amount,
+        claim_amount,
         
         -- Driving record
         mvr_points,
@@ -0,0 +1,302 @@
+"""
+Analytics Queries
+Named notebook and report queries over the dbt marts, served from a shared
+connection pool through two cache levels: an in-process LRU of DataFrames in
+front of the Parquet cache in extraction.py. Entries are keyed by the data
+version of the tables each query reads, so a dbt run invalidates them, and the
+version itself is re-checked at most every VERSION_TTL_SECONDS.
+
+    from analytics_queries import run_query
+    df = run_query('claims')          # fct_claims, paid claims only
+    states = run_query('7.1')         # any query in sql/advanced_sql_queries.sql
+
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import psycopg
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+from db_config import DB_CONFIG
+from extraction import CACHE_DIR, cached_query, data_version, newest_cached
+
+SQL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sql',
+                        'advanced_sql_queries.sql')
+
+ANALYTICS_SCHEMA = 'insurance_staging_analytics'
+
+# Same as the SET at the top of advanced_sql_queries.sql, whose queries use bare names
+SEARCH_PATH = f'{ANALYTICS_SCHEMA},insurance_analytics,public'
+
+# Tables a query can depend on, with the column data_version reads for each
+VERSION_COLUMNS = {
+    f'{ANALYTICS_SCHEMA}.fct_claims': 'load_timestamp',
+    f'{ANALYTICS_SCHEMA}.mart_claims_summary': 'latest_load',
+    f'{ANALYTICS_SCHEMA}.agg_claims_daily': 'latest_load',
+    f'{ANALYTICS_SCHEMA}.agg_claims_segments_monthly': 'latest_load',
+    f'{ANALYTICS_SCHEMA}.agg_claims_states_monthly': 'latest_load',
+    'insurance_analytics.claim_outlier_tags': 'tagged_at',
+    'insurance_raw.load_profiles': 'load_timestamp',
+}
+
+# DataFrames kept in memory per process; the least recently used goes first
+MEMORY_CACHE_ENTRIES = 32
+
+# A data version is trusted this long before the tables are asked again
+VERSION_TTL_SECONDS = 30
+
+POOL_MAX_SIZE = 4
+
+# Seconds to wait for a pooled connection before falling back to the disk cache
+POOL_TIMEOUT = 10
+
+
+@dataclass(frozen=True)
+class NamedQuery:
+    """One cacheable query and the tables whose data version keys it"""
+    name: str
+    sql: str
+    version_tables: tuple
+    title: str = ''
+    compact: bool = False   # Stream through extraction.compact_query
+
+
+def _referenced_tables(sql):
+    """Versioned tables a query reads, by bare or schema-qualified name
+
+    Everything else in the marts is built from fct_claims, so a query naming
+    none of them is versioned by fct_claims.
+    """
+    tables = tuple(table for table in VERSION_COLUMNS
+                   if re.search(rf'\b{table.split(".")[1]}\b', sql))
+    return tables or (f'{ANALYTICS_SCHEMA}.fct_claims',)
+
+
+def load_sql_file(path=SQL_FILE):
+    """Queries from advanced_sql_queries.sql as name -> NamedQuery
+
+    Each "-- Query 7.1: Title" header names the statement after it. EXPLAIN
+    examples are skipped: their output is a plan, not data.
+    """
+    with open(path) as f:
+        lines = f.read().splitlines()
+    queries = {}
+    index = 0
+    while index < len(lines):
+        header = re.match(r'--\s*Query\s+(\d+\.\d+):\s*(.*)', lines[index])
+        index += 1
+        if not header:
+            continue
+        statement = []
+        while index < len(lines):
+            line = lines[index]
+            index += 1
+            code = line.split('--', 1)[0].rstrip()
+            if not statement and not code:
+                continue  # Comment lines between header and statement
+            statement.append(line)
+            if code.endswith(';'):
+                break
+        sql = '\n'.join(statement).rstrip().rstrip(';')
+        if sql and not sql.lstrip().upper().startswith('EXPLAIN'):
+            name, title = header.groups()
+            queries[name] = NamedQuery(name, sql, _referenced_tables(sql), title)
+    return queries
+
+
+def default_queries():
+    """The notebook's extractions plus every query in advanced_sql_queries.sql"""
+    queries = {
+        'claims': NamedQuery(
+            'claims',
+            f"SELECT * FROM {ANALYTICS_SCHEMA}.fct_claims WHERE total_claim_amount > 0",
+            (f'{ANALYTICS_SCHEMA}.fct_claims',), 'Paid claims from the fact table',
+            compact=True),
+        'source_summary': NamedQuery(
+            'source_summary',
+            f"SELECT * FROM {ANALYTICS_SCHEMA}.mart_claims_summary "
+            f"WHERE source_system != 'ALL_SOURCES' ORDER BY source_system",
+            (f'{ANALYTICS_SCHEMA}.mart_claims_summary',), 'Claims summary by source'),
+    }
+    queries.update(load_sql_file())
+    return queries
+
+
+class AnalyticsQueries:
+    """Runs named queries through a connection pool and memory + disk caches
+
+    Connections are opened on first use and shared across calls and threads.
+    Results handed out are copies, so a caller editing its DataFrame never
+    changes the cached one (cheap under pandas copy-on-write).
+    """
+
+    def __init__(self, db_config=None, queries=None, cache_dir=None,
+                 memory_entries=MEMORY_CACHE_ENTRIES, version_ttl=VERSION_TTL_SECONDS,
+                 pool_size=POOL_MAX_SIZE, verbose=True):
+        self.db_config = db_config or DB_CONFIG
+        self.queries = queries if queries is not None else default_queries()
+        self.cache_dir = cache_dir or CACHE_DIR
+        self.memory_entries = memory_entries
+        self.version_ttl = version_ttl
+        self.pool_size = pool_size
+        self.say = print if verbose else (lambda *args, **kwargs: None)
+        self.pool = None
+        self._memory = OrderedDict()    # (name, version) -> DataFrame
+        self._versions = {}             # table -> (checked at, version)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+    def _connection(self):
+        with self._lock:
+            if self.pool is None:
+                kwargs = dict(self.db_config)
+                kwargs['options'] = f"{kwargs.get('options', '')} -c search_path={SEARCH_PATH}"
+                self.pool = ConnectionPool(kwargs=kwargs, min_size=1,
+                                           max_size=self.pool_size, timeout=POOL_TIMEOUT,
+                                           open=True)
+        return self.pool.connection()
+
+    def _version(self, conn, tables, refresh=False):
+        """Combined data version of tables, re-read once older than version_ttl
+
+        The per-table versions are shared between threads under the LRU's lock.
+        """
+        now = time.monotonic()
+        parts = []
+        for table in tables:
+            with self._lock:
+                checked = self._versions.get(table)
+            if refresh or checked is None or now - checked[0] > self.version_ttl:
+                # Read outside the lock so other threads' cache hits are not held up
+                with conn.cursor() as cursor:
+                    checked = (now, data_version(cursor, table, VERSION_COLUMNS[table]))
+                with self._lock:
+                    self._versions[table] = checked
+            parts.append(f"{table}={checked[1]}")
+        return ';'.join(parts)
+
+    def _remember(self, key, df):
+        with self._lock:
+            self._memory[key] = df
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def run(self, name, refresh=False):
+        """Result of a named query as a DataFrame
+
+        refresh=True re-checks the data version and re-runs the query. If the
+        database cannot be reached, the newest cached copy of any version is
+        returned instead.
+        """
+        query = self.queries[name]
+        start = time.perf_counter()
+        try:
+            with self._connection() as conn:
+                version = self._version(conn, query.version_tables, refresh)
+                key = (name, version)
+                with self._lock:
+                    df = None if refresh else self._memory.get(key)
+                    if df is not None:
+                        self._memory.move_to_end(key)
+                if df is None:
+                    df = cached_query(query.sql, self.db_config, cache_dir=self.cache_dir,
+                                      refresh=refresh, verbose=False, compact=query.compact,
+                                      conn=conn, version=version)
+                    self._remember(key, df)
+                    source = 'disk cache or database'
+                else:
+                    source = 'memory'
+        except (PoolTimeout, psycopg.OperationalError):
+            df = newest_cached(query.sql, self.cache_dir, query.compact)
+            if df is None:
+                raise
+            self.say(f"   ⚠ Database unavailable; using the newest cached '{name}'")
+            return df
+        self.say(f"   ✓ {name}: {len(df):,} rows from {source} "
+                 f"in {time.perf_counter() - start:.3f}s")
+        return df.copy()
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._versions.clear()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_queries(db_config=None):
+    """Process-wide AnalyticsQueries, so notebook cells share one pool and cache
+
+    Re-running a cell returns the same instance; a different db_config
+    replaces it.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is not None and db_config and db_config != _shared.db_config:
+            _shared.close()
+            _shared = None
+        if _shared is None:
+            _shared = AnalyticsQueries(db_config)
+        return _shared
+
+
+def run_query(name, refresh=False):
+    """Run a named query through the process-wide AnalyticsQueries"""
+    return shared_queries().run(name, refresh)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run named analytics queries through the cache")
+    parser.add_argument('names', nargs='*', help="Query names (default: list them)")
+    parser.add_argument('--refresh', action='store_true', help="Bypass both caches")
+    parser.add_argument('--output-dir', default=None,
+                        help="Write each result to <dir>/<name>.csv for reports")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("GUIDEWIRE INSURANCE ANALYTICS - ANALYTICS QUERIES")
+    print("="*80)
+
+    queries = default_queries()
+    if not args.names:
+        print("\nAvailable queries:")
+        for query in queries.values():
+            print(f"   • {query.name:<15} {query.title}")
+        sys.exit(0)
+    unknown = [name for name in args.names if name not in queries]
+    if unknown:
+        print(f"\n✗ Unknown queries: {', '.join(unknown)}")
+        sys.exit(1)
+
+    print(f"\n1. Running {len(args.names)} queries...")
+    try:
+        with AnalyticsQueries(queries=queries) as analytics:
+            for name in args.names:
+                df = analytics.run(name, args.refresh)
+                if args.output_dir:
+                    os.makedirs(args.output_dir, exist_ok=True)
+                    df.to_csv(os.path.join(args.output_dir, f"{name}.csv"), index=False)
+    except psycopg.Error as e:
+        print(f"\n✗ Database error: {e}")
+        sys.exit(1)
+    print("\n✓ QUERIES COMPLETE")
@@ -0,0 +1,124 @@
+"""
+Batch Scoring
+Scores every claim in the feature store that the chosen model version has not
+scored yet, or has scored from features that a re-delivery has since
+replaced, streaming in chunks and bulk-writing predictions back with COPY
+"""
+
+import argparse
+import sys
+
+import pandas as pd
+import psycopg
+
+from bulk_load import Throughput, copy_dataframe
+from db_config import DB_CONFIG
+from extraction import iter_frames
+from feature_store import refresh_features
+from features import FEATURE_COLUMNS, FEATURE_TABLE
+from model_artifacts import SEVERE_THRESHOLD, load_artifact
+
+PREDICTIONS_TABLE = 'insurance_analytics.claim_predictions'
+
+# Claims fetched, scored and written per round
+SCORE_CHUNK_ROWS = 50000
+
+# Claims without a prediction from the version, or predicted from features
+# older than the feature row now in the store
+UNSCORED_QUERY = f"""
+SELECT f.claim_id, f.source_load_timestamp, {', '.join(f'f.{col}' for col in FEATURE_COLUMNS)}
+FROM {FEATURE_TABLE} f
+LEFT JOIN {PREDICTIONS_TABLE} p
+    ON p.claim_id = f.claim_id AND p.model_version = %s
+WHERE p.claim_id IS NULL
+   OR p.source_load_timestamp IS DISTINCT FROM f.source_load_timestamp
+"""
+
+
+def score_frame(artifact, frame, version):
+    """Predictions for one chunk of feature store rows, ready for COPY"""
+    probabilities = artifact.predict_proba(frame)
+    return pd.DataFrame({
+        'claim_id': frame['claim_id'],
+        'model_version': version,
+        'severe_probability': probabilities,
+        'predicted_severe': probabilities >= SEVERE_THRESHOLD,
+        'source_load_timestamp': frame['source_load_timestamp'],
+    })
+
+
+def score_unscored(version=None, chunk_rows=SCORE_CHUNK_ROWS):
+    """Score all claims the model version has not seen or saw with older features
+
+    Stale predictions are deleted and rewritten in the same transaction as
+    the chunk's COPY. Returns rows scored.
+    """
+    print("\n1. Loading model artifact...")
+    artifact, metadata = load_artifact(version)
+    version = metadata['version']
+    print(f"   ✓ {metadata['model_name']} {version} (AUC {metadata['auc']:.4f}, "
+          f"trained {metadata['created_at']})")
+
+    print("\n2. Refreshing feature store...")
+    refresh_features()
+
+    print("\n3. Connecting to database...")
+    # One connection streams unscored claims, the other commits predictions
+    # per chunk, so an interrupted run keeps what it already wrote
+    reader = psycopg.connect(**DB_CONFIG)
+    writer = psycopg.connect(**DB_CONFIG)
+    print("   ✓ Connected successfully")
+
+    print(f"\n4. Scoring unscored claims ({chunk_rows:,} per chunk)...")
+    timer = Throughput()
+    total_scored = 0
+    try:
+        with writer.cursor() as cursor:
+            for frame in iter_frames(reader, UNSCORED_QUERY, (version,), chunk_rows,
+                                     cursor_name='unscored_claims'):
+                if frame.empty:
+                    continue
+                predictions = score_frame(artifact, frame, version)
+                cursor.execute(f"""
+                    DELETE FROM {PREDICTIONS_TABLE}
+                    WHERE model_version = %s AND claim_id = ANY(%s);
+                """, (version, predictions['claim_id'].tolist()))
+                copy_dataframe(cursor, PREDICTIONS_TABLE, predictions, show_progress=False)
+                writer.commit()
+                total_scored += len(predictions)
+                print(f"   • Scored {total_scored:,} claims...", end='\r')
+    finally:
+        reader.close()
+        writer.close()
+
+    if total_scored:
+        print(f"   ✓ Scored {timer.summary(total_scored)}")
+    else:
+        print("   ✓ Nothing to score; every claim already has a current prediction from this version")
+    return total_scored
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score unscored claims with a saved model")
+    parser.add_argument('--version', default=None,
+                        help="Model version to score with (default: latest)")
+    parser.add_argument('--chunksize', type=int, default=SCORE_CHUNK_ROWS,
+                        help="Claims fetched and scored per chunk")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("GUIDEWIRE INSURANCE ANALYTICS - BATCH SCORING")
+    print("Claim Severity Predictions")
+    print("="*80)
+
+    try:
+        score_unscored(args.version, args.chunksize)
+    except FileNotFoundError as e:
+        print(f"\n✗ {e}")
+        sys.exit(1)
+    except psycopg.Error as e:
+        print(f"\n✗ Database error: {e}")
+        sys.exit(1)
+
+    print("\n✓ BATCH SCORING COMPLETE")
+    print(f"✓ Predictions in {PREDICTIONS_TABLE}")
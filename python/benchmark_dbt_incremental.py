@@ -0,0 +1,139 @@
+"""
+dbt Incremental Benchmark
+Times `dbt run --select fct_claims` against the size of the newly loaded delta,
+next to a full refresh, to show run time tracks the delta rather than the table
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import psycopg
+
+from db_config import DB_CONFIG
+from source_specs import CUSTOMER_C
+
+DBT_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'insurance_dbt')
+FCT_CLAIMS = 'insurance_staging_analytics.fct_claims'
+
+# Synthetic delta rows are tagged so they can be removed afterwards
+DELTA_SOURCE_FILE = 'benchmark_delta.csv'
+# record_id range well above any real Customer C id
+DELTA_ID_BASE = 9_000_000_000_000
+
+
+def run_dbt(project_dir, full_refresh=False):
+    """Run the fct_claims model; returns wall-clock seconds"""
+    command = ['dbt', 'run', '--select', 'fct_claims', '--project-dir', project_dir]
+    if full_refresh:
+        command.append('--full-refresh')
+    start = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        print(completed.stdout[-2000:])
+        raise RuntimeError(f"dbt run failed ({' '.join(command)})")
+    return elapsed
+
+
+def append_delta(cursor, rows, batch):
+    """Load `rows` new claim rows into Customer C's raw table as one new batch
+
+    Existing claim rows are cloned with fresh record_ids, so every delta row
+    becomes a new claim_id in fct_claims. Like a real load, the batch shares
+    one load_timestamp.
+    """
+    columns = [col for col in CUSTOMER_C.target_columns if col != 'record_id']
+    column_list = ', '.join(columns)
+    # Delta rows are stamped now, possibly in a month the last load never saw
+    cursor.execute("SELECT insurance_raw.ensure_load_partition(%s::regclass, LOCALTIMESTAMP);",
+                   (CUSTOMER_C.table,))
+    cursor.execute(f"""
+        INSERT INTO {CUSTOMER_C.table} (record_id, {column_list}, load_timestamp, source_file)
+        SELECT
+            %s + ROW_NUMBER() OVER (),
+            {column_list},
+            LOCALTIMESTAMP,
+            %s
+        FROM (
+            SELECT c.*
+            FROM {CUSTOMER_C.table} c
+            CROSS JOIN generate_series(1, %s) AS copies
+            WHERE c.claim_flag = 1 AND c.source_file <> %s
+            LIMIT %s
+        ) AS template;
+    """, (DELTA_ID_BASE + batch * 1_000_000_000, DELTA_SOURCE_FILE, rows,
+          DELTA_SOURCE_FILE, rows))
+    return cursor.rowcount
+
+
+def fct_count(cursor):
+    cursor.execute(f"SELECT COUNT(*) FROM {FCT_CLAIMS};")
+    return cursor.fetchone()[0]
+
+
+def run_benchmark(delta_sizes, project_dir=DBT_PROJECT_DIR):
+    """Time a full refresh, then an incremental run per delta size"""
+    conn = psycopg.connect(**DB_CONFIG)
+    conn.autocommit = True
+    cursor = conn.cursor()
+    timings = []
+
+    try:
+        print("\n1. Full refresh baseline...")
+        seconds = run_dbt(project_dir, full_refresh=True)
+        table_rows = fct_count(cursor)
+        timings.append(('full refresh', table_rows, seconds))
+        print(f"   ✓ {table_rows:,} claims rebuilt in {seconds:.2f}s")
+
+        print("\n2. Incremental runs...")
+        for batch, size in enumerate(delta_sizes, 1):
+            appended = append_delta(cursor, size, batch)
+            before = fct_count(cursor)
+            seconds = run_dbt(project_dir)
+            added = fct_count(cursor) - before
+            timings.append((f"delta {size:,}", appended, seconds))
+            status = "✓" if added == appended else "⚠"
+            print(f"   {status} {appended:,} new raw rows -> {added:,} new claims in {seconds:.2f}s")
+    finally:
+        print("\n3. Removing benchmark rows...")
+        cursor.execute(f"DELETE FROM {CUSTOMER_C.table} WHERE source_file = %s;",
+                       (DELTA_SOURCE_FILE,))
+        print(f"   ✓ Deleted {cursor.rowcount:,} raw rows")
+        run_dbt(project_dir, full_refresh=True)
+        print("   ✓ fct_claims rebuilt without them")
+        cursor.close()
+        conn.close()
+
+    print_timings(timings)
+    return timings
+
+
+def print_timings(timings):
+    print("\n4. Results:")
+    print("\n   Run          | Rows       | Seconds")
+    print("   " + "-"*40)
+    for label, rows, seconds in timings:
+        print(f"   {label:<12} | {rows:>10,} | {seconds:>7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark incremental fct_claims builds")
+    parser.add_argument('--deltas', nargs='+', type=int, default=[0, 100, 1000, 10000],
+                        help="Raw rows to append before each incremental run")
+    parser.add_argument('--project-dir', default=DBT_PROJECT_DIR,
+                        help="dbt project directory (default: ../insurance_dbt)")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("GUIDEWIRE INSURANCE ANALYTICS - DBT INCREMENTAL BENCHMARK")
+    print("fct_claims: run time vs. delta size")
+    print("="*80)
+
+    try:
+        run_benchmark(args.deltas, args.project_dir)
+    except (psycopg.Error, RuntimeError, FileNotFoundError) as e:
+        print(f"\n✗ Benchmark failed: {e}")
+        sys.exit(1)
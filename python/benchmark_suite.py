@@ -0,0 +1,270 @@
+"""
+Scale Benchmark Suite
+Generates synthetic sources at several scales and times every pipeline stage
+end to end - load, dbt build, feature store, extraction, training - each in
+its own process so wall clock and peak memory are measured per stage. Results
+go to a JSON report that later runs can be compared against.
+
+Point --database at a scratch database created with sql/schema_setup.sql:
+the load and dbt stages replace its raw tables and marts.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib import metadata
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(PYTHON_DIR, '..')
+DBT_PROJECT_DIR = os.path.join(REPO_DIR, 'insurance_dbt')
+REPORT_DIR = os.path.join(REPO_DIR, 'benchmarks')
+
+STAGES = ['generate', 'load', 'dbt', 'features', 'extract', 'train']
+
+# Scales at or above this many rows per source load in streamed chunks
+STREAM_LOAD_ROWS = 1000000
+LOAD_CHUNK_ROWS = 200000
+
+# A stage this much slower than the baseline report is flagged as a regression
+REGRESSION_TOLERANCE = 0.20
+
+# Lines of a failed stage's log echoed to the console
+LOG_TAIL_LINES = 20
+
+EXTRACT_SNIPPET = (
+    "from extraction import cached_query\n"
+    "from features import FEATURE_TABLE, TRAINING_QUERY\n"
+    "df = cached_query(TRAINING_QUERY, refresh=True, compact=True, version_table=FEATURE_TABLE)\n"
+    "print(f'{len(df):,} rows, {df.memory_usage(deep=True).sum() / 1024**2:,.1f} MB in memory')\n"
+)
+
+
+def stage_command(stage, rows, data_dir, dbt_target=None):
+    """Command line for one stage at one scale"""
+    if stage == 'generate':
+        return [sys.executable, 'synthetic_data.py', '--rows', str(rows), '--output', data_dir]
+    if stage == 'load':
+        command = [sys.executable, 'load_all.py']
+        if rows >= STREAM_LOAD_ROWS:
+            command += ['--chunksize', str(LOAD_CHUNK_ROWS)]
+        return command
+    if stage == 'dbt':
+        command = ['dbt', 'run', '--full-refresh', '--project-dir', DBT_PROJECT_DIR]
+        if dbt_target:
+            command += ['--target', dbt_target]
+        return command
+    if stage == 'features':
+        return [sys.executable, 'feature_store.py', '--full-refresh']
+    if stage == 'extract':
+        return [sys.executable, '-c', EXTRACT_SNIPPET]
+    if stage == 'train':
+        return [sys.executable, 'ml_modeling.py']
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def stage_environment(database, scale_dir):
+    """Child environment: scratch database, this scale's data, cache, model and metrics folders"""
+    env = dict(os.environ)
+    env.update({
+        'INSURANCE_DB_NAME': database,
+        'INSURANCE_DATA_DIR': os.path.join(scale_dir, 'data'),
+        'INSURANCE_CACHE_DIR': os.path.join(scale_dir, 'cache'),
+        'INSURANCE_MODEL_DIR': os.path.join(scale_dir, 'models'),
+        'INSURANCE_METRICS_DIR': os.path.join(scale_dir, 'metrics'),
+        'PYTHONUNBUFFERED': '1',
+    })
+    return env
+
+
+def run_stage(command, env, log_path):
+    """Run one stage to completion; returns (seconds, peak RSS in MB, exit code)
+
+    The child's own resource usage comes from wait4. Linux carries the
+    parent's high-water RSS into a forked child, so this module deliberately
+    avoids importing pandas or sklearn to keep that floor near zero.
+    """
+    with open(log_path, 'w') as log:
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen(command, cwd=PYTHON_DIR, env=env,
+                                       stdout=log, stderr=subprocess.STDOUT)
+        except FileNotFoundError as e:
+            log.write(f"{e}\n")
+            return 0.0, None, 127
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+    return seconds, usage.ru_maxrss / 1024, os.waitstatus_to_exitcode(status)
+
+
+def _log_tail(log_path):
+    with open(log_path, errors='replace') as f:
+        return f.readlines()[-LOG_TAIL_LINES:]
+
+
+def run_scale(rows, stages, database, workdir, dbt_target=None):
+    """Run the selected stages in order at one scale; returns stage -> result
+
+    A failed stage stops the scale: later stages would only time errors.
+    """
+    scale_dir = os.path.join(workdir, f"rows_{rows}")
+    os.makedirs(scale_dir, exist_ok=True)
+    env = stage_environment(database, scale_dir)
+    results = {}
+    failed = None
+
+    for stage in stages:
+        if failed:
+            results[stage] = {'status': 'skipped', 'reason': f"{failed} failed"}
+            print(f"   • {stage:<9} skipped")
+            continue
+        log_path = os.path.join(scale_dir, f"{stage}.log")
+        seconds, peak_mb, exit_code = run_stage(
+            stage_command(stage, rows, env['INSURANCE_DATA_DIR'], dbt_target), env, log_path)
+        status = 'ok' if exit_code == 0 else 'failed'
+        results[stage] = {'status': status, 'seconds': round(seconds, 3),
+                          'peak_rss_mb': round(peak_mb, 1) if peak_mb is not None else None,
+                          'exit_code': exit_code}
+        if status == 'ok':
+            print(f"   ✓ {stage:<9} {seconds:>9.2f}s  {peak_mb:>9,.0f} MB peak")
+        else:
+            failed = stage
+            print(f"   ✗ {stage:<9} exited {exit_code} after {seconds:.2f}s; log: {log_path}")
+            for line in _log_tail(log_path):
+                print(f"      {line.rstrip()}")
+    return results
+
+
+def host_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except FileNotFoundError:
+        commit = None
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'pandas': metadata.version('pandas'),
+        'scikit-learn': metadata.version('scikit-learn'),
+        'psycopg': metadata.version('psycopg'),
+        'git_commit': commit,
+    }
+
+
+def run_benchmark(scales, stages, database, workdir, dbt_target=None):
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'host': host_info(),
+        'database': database,
+        'stages': stages,
+        'scales': {},
+    }
+    for step, rows in enumerate(scales, 1):
+        print(f"\n{step}. {rows:,} rows per source...")
+        report['scales'][str(rows)] = run_scale(rows, stages, database, workdir, dbt_target)
+    return report
+
+
+def print_summary(report):
+    stages = report['stages']
+    print("\n   Rows/source  | " + " | ".join(f"{stage:>9}" for stage in stages))
+    print("   " + "-"*(15 + 12 * len(stages)))
+    for rows, results in report['scales'].items():
+        cells = []
+        for stage in stages:
+            result = results[stage]
+            cells.append(f"{result['seconds']:>8.2f}s" if result['status'] == 'ok'
+                         else f"{result['status']:>9}")
+        print(f"   {int(rows):>12,} | " + " | ".join(cells))
+
+
+def compare_reports(report, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Stage timings slower than the baseline by more than tolerance
+
+    Only scales and stages that succeeded in both reports are compared.
+    Returns [(rows, stage, baseline seconds, seconds)].
+    """
+    regressions = []
+    for rows, results in report['scales'].items():
+        for stage, result in results.items():
+            before = baseline.get('scales', {}).get(rows, {}).get(stage)
+            if not before or before.get('status') != 'ok' or result['status'] != 'ok':
+                continue
+            if result['seconds'] > before['seconds'] * (1 + tolerance):
+                regressions.append((int(rows), stage, before['seconds'], result['seconds']))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the pipeline end to end on synthetic data")
+    parser.add_argument('--database', required=True,
+                        help="Scratch database to load into (its raw tables are replaced)")
+    parser.add_argument('--scales', nargs='+', type=int, default=[10000, 100000, 1000000],
+                        help="Rows per source at each scale")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help="Stages to run, always in pipeline order (default: all)")
+    parser.add_argument('--dbt-target', default=None,
+                        help="dbt profile target pointing at --database (default: profile default)")
+    parser.add_argument('--workdir', default=None,
+                        help="Folder for generated data, logs and artifacts, kept afterwards "
+                             "(default: a temp folder removed at the end)")
+    parser.add_argument('--output', default=None,
+                        help="JSON report path (default: benchmarks/benchmark_<timestamp>.json)")
+    parser.add_argument('--compare', default=None,
+                        help="Baseline JSON report; exit 1 if any stage regressed")
+    args = parser.parse_args()
+    stages = [stage for stage in STAGES if stage in args.stages]
+
+    print("\n" + "="*80)
+    print("GUIDEWIRE INSURANCE ANALYTICS - SCALE BENCHMARK")
+    print(f"Stages: {', '.join(stages)} | Database: {args.database}")
+    print("="*80)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='insurance_benchmark_')
+    try:
+        report = run_benchmark(args.scales, stages, args.database, workdir, args.dbt_target)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{len(args.scales) + 1}. Results:")
+    print_summary(report)
+
+    output = args.output or os.path.join(
+        REPORT_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n   ✓ Report saved to {output}")
+
+    failed = [(rows, stage) for rows, results in report['scales'].items()
+              for stage, result in results.items() if result['status'] == 'failed']
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline)
+        print(f"\n   Compared with {args.compare} "
+              f"(tolerance {REGRESSION_TOLERANCE:.0%}, baseline commit "
+              f"{baseline.get('host', {}).get('git_commit')}):")
+        for rows, stage, before, after in regressions:
+            print(f"   ⚠ {rows:,} rows / {stage}: {before:.2f}s -> {after:.2f}s "
+                  f"({after / before - 1:+.0%})")
+        if not regressions:
+            print("   ✓ No stage regressed")
+
+    if failed:
+        print(f"\n✗ {len(failed)} stage(s) failed")
+        sys.exit(1)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s) against the baseline")
+        sys.exit(1)
+    print("\n✓ BENCHMARK COMPLETE")
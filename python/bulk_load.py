@@ -0,0 +1,121 @@
+"""
+Bulk Load Helpers
+Shared COPY-protocol writer and throughput reporting for the customer loaders
+"""
+
+import logging
+import resource
+import sys
+import time
+
+import psycopg
+
+# Rows serialized per COPY write; bounds the size of each CSV text buffer
+COPY_BUFFER_ROWS = 50000
+
+# Rows per executemany batch on the INSERT fallback path
+INSERT_BATCH_ROWS = 1000
+
+# executemany pipelines its statements; when bisection rolls a failed batch
+# back, psycopg warns about the aborted pipeline. The error itself is handled.
+logging.getLogger('psycopg').setLevel(logging.ERROR)
+
+
+def copy_dataframe(cursor, table, frame, buffer_rows=COPY_BUFFER_ROWS, show_progress=True,
+                   progress_offset=0):
+    """Stream a DataFrame into a table with COPY ... FROM STDIN
+
+    Column names must match the table and values must already be typed for
+    it (see loader_engine.compile_spec). Returns the number of rows written.
+    """
+    columns = ', '.join(frame.columns)
+    copy_sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+    total_copied = 0
+    with cursor.copy(copy_sql) as copy:
+        for start in range(0, len(frame), buffer_rows):
+            chunk = frame.iloc[start:start + buffer_rows]
+            # Blank unquoted fields are read as NULL in CSV format
+            copy.write(chunk.to_csv(header=False, index=False))
+            total_copied += len(chunk)
+            if show_progress:
+                print(f"   • Copied {progress_offset + total_copied:,} records...", end='\r')
+
+    return total_copied
+
+
+def insert_dataframe(cursor, table, frame):
+    """INSERT a DataFrame with one executemany; returns the number of rows written"""
+    columns = list(frame.columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    insert_query = f"""
+        INSERT INTO {table}
+        ({', '.join(columns)})
+        VALUES ({placeholders})
+    """
+    cursor.executemany(insert_query, frame.to_numpy(dtype=object, na_value=None).tolist())
+    return len(frame)
+
+
+def write_with_bisection(connection, write, frame, batch_rows, show_progress=True,
+                         progress_offset=0, verb='Copied'):
+    """Write a frame in batches, bisecting failed batches to isolate bad rows
+
+    write(part) writes one slice of the frame. Each attempt runs in a
+    savepoint, so the caller must already be inside connection.transaction().
+    A failed batch is split in half and retried until each bad row is on its
+    own; those rows come back as rejects with their error text while every
+    other row is written. Returns (rows_written, rejects).
+    """
+    written = 0
+    rejects = []
+    # Stack of [start, end) positions, popped in file order
+    pending = [(start, min(start + batch_rows, len(frame)))
+               for start in range(0, len(frame), batch_rows)][::-1]
+
+    while pending:
+        start, end = pending.pop()
+        try:
+            with connection.transaction():
+                write(frame.iloc[start:end])
+            written += end - start
+            if show_progress:
+                print(f"   • {verb} {progress_offset + written:,} records...", end='\r')
+        except psycopg.Error as e:
+            if end - start == 1:
+                rejects.append({
+                    'row': frame.index[start],
+                    'error': str(e).strip(),
+                    'data': frame.iloc[start].to_dict(),
+                })
+            else:
+                middle = (start + end) // 2
+                pending.append((middle, end))
+                pending.append((start, middle))
+
+    return written, rejects
+
+
+class Throughput:
+    """Wall-clock timer that reports rows/sec for a load step"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def rate(self, rows):
+        elapsed = self.elapsed
+        return rows / elapsed if elapsed > 0 else float('inf')
+
+    def summary(self, rows):
+        return f"{rows:,} records in {self.elapsed:.2f}s ({self.rate(rows):,.0f} rows/sec)"
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
@@ -0,0 +1,231 @@
+"""
+Claim Amount Outliers
+Streaming version of query 5.1 (IQR outliers on total_claim_amount). A t-digest
+of paid claim amounts is kept per source_system and incident_type in
+insurance_analytics.claim_amount_sketches. Each refresh folds only the claims
+loaded since the last one into those sketches, then tags the new claims
+against them in insurance_analytics.claim_outlier_tags, with no sort of
+fct_claims.
+
+Groups with too few claims for a stable IQR borrow the merged sketch of their
+source, then of every source. Sketches cannot forget values, so run
+--full-refresh after rebuilding fct_claims or deleting claims.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+import psycopg
+
+from bulk_load import copy_dataframe
+from db_config import DB_CONFIG
+from extraction import FCT_CLAIMS, iter_frames, since_source_watermarks
+from metrics import PipelineMetrics
+from quantile_sketch import DEFAULT_COMPRESSION, TDigest
+
+SKETCH_TABLE = 'insurance_analytics.claim_amount_sketches'
+TAG_TABLE = 'insurance_analytics.claim_outlier_tags'
+
+# Paid claims not sketched yet, one per claim. {since} keeps claims first
+# loaded at or after their source's watermark (load_timestamp is never
+# earlier, and is what the index serves). Every sketched claim is tagged, and
+# claims delivered again keep their first_load_timestamp, so no claim is
+# counted into the sketches twice.
+NEW_CLAIMS_QUERY = f"""
+SELECT DISTINCT ON (claim_id)
+    claim_id,
+    source_system,
+    COALESCE(incident_type, 'Unknown') AS incident_type,
+    total_claim_amount,
+    first_load_timestamp
+FROM {FCT_CLAIMS} c
+WHERE ({{since}})
+    AND total_claim_amount > 0
+    AND NOT EXISTS (SELECT 1 FROM {TAG_TABLE} t WHERE t.claim_id = c.claim_id)
+ORDER BY claim_id, load_timestamp DESC
+"""
+
+# Claims a group needs before its own quartiles are trusted
+MIN_GROUP_CLAIMS = 30
+
+# Claims fetched and sketched per round
+REFRESH_CHUNK_ROWS = 100000
+
+TAG_COLUMNS = ['claim_id', 'source_system', 'incident_type', 'total_claim_amount',
+               'q1', 'median', 'q3', 'iqr_distance', 'outlier_category', 'sketch_scope']
+
+# Same categories and fences as query 5.1
+CATEGORIES = ['Extreme Outlier (>3 IQR)', 'Moderate Outlier (>1.5 IQR)', 'Low Outlier', 'Normal']
+
+
+# ============================================================================
+# SKETCHES
+# ============================================================================
+
+def load_sketches(cursor, compression=DEFAULT_COMPRESSION):
+    """Stored sketches as {(source_system, incident_type): TDigest}, and the watermarks
+
+    Watermarks are per source_system, as sources load concurrently. Returns
+    ({}, None) when nothing is stored or the sketches were built with a
+    different compression, meaning every claim has to be sketched again.
+    """
+    cursor.execute(f"""
+        SELECT source_system, incident_type, compression, means, weights,
+               min_amount, max_amount, source_watermark
+        FROM {SKETCH_TABLE};
+    """)
+    rows = cursor.fetchall()
+    if not rows or any(row[2] != compression for row in rows):
+        return {}, None
+    sketches = {(source, incident_type): TDigest(compression, means, weights, low, high)
+                for source, incident_type, _, means, weights, low, high, _ in rows}
+    watermarks = {}
+    for row in rows:
+        watermarks[row[0]] = max(watermarks.get(row[0], row[7]), row[7])
+    return sketches, watermarks
+
+
+def save_sketches(cursor, sketches, watermarks):
+    """Replace the stored sketches with these, each with its source's watermark"""
+    cursor.execute(f"DELETE FROM {SKETCH_TABLE};")
+    cursor.executemany(f"""
+        INSERT INTO {SKETCH_TABLE}
+            (source_system, incident_type, compression, means, weights,
+             claim_count, min_amount, max_amount, source_watermark)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
+    """, [(source, incident_type, digest.compression, digest.means.tolist(),
+           digest.weights.tolist(), int(digest.count), digest.minimum, digest.maximum,
+           watermarks[source])
+          for (source, incident_type), digest in sorted(sketches.items())])
+
+
+def quartiles(sketches, min_claims=MIN_GROUP_CLAIMS):
+    """Q1, median and Q3 per (source_system, incident_type), with the scope used
+
+    A group below min_claims uses its source's merged sketch, and a source
+    below it the merge of every group ('all').
+    """
+    first, *rest = sketches.values()
+    everything = first.merge(*rest)
+    by_source = {}
+    for (source, _), digest in sketches.items():
+        by_source[source] = by_source[source].merge(digest) if source in by_source else digest
+    rows = []
+    for (source, incident_type), digest in sketches.items():
+        if digest.count >= min_claims:
+            scope, chosen = 'incident_type', digest
+        elif by_source[source].count >= min_claims:
+            scope, chosen = 'source_system', by_source[source]
+        else:
+            scope, chosen = 'all', everything
+        q1, median, q3 = chosen.quantile([0.25, 0.5, 0.75])
+        rows.append((source, incident_type, q1, median, q3, scope))
+    return pd.DataFrame(rows, columns=['source_system', 'incident_type',
+                                       'q1', 'median', 'q3', 'sketch_scope'])
+
+
+def tag_claims(claims, quartile_frame):
+    """Query 5.1's outlier_category and iqr_distance for each claim
+
+    claims needs source_system, incident_type and total_claim_amount; groups
+    with no sketch come back untagged (NULL quartiles, category 'Normal').
+    """
+    tagged = claims.merge(quartile_frame, on=['source_system', 'incident_type'], how='left')
+    amount = tagged['total_claim_amount'].astype('float64')
+    iqr = tagged['q3'] - tagged['q1']
+    tagged['iqr_distance'] = ((amount - tagged['median']) / iqr.where(iqr != 0)).round(2)
+    tagged['outlier_category'] = np.select(
+        [amount > tagged['q3'] + 3 * iqr,
+         amount > tagged['q3'] + 1.5 * iqr,
+         amount < tagged['q1'] - 1.5 * iqr],
+        CATEGORIES[:3], default=CATEGORIES[3])
+    return tagged
+
+
+# ============================================================================
+# REFRESH
+# ============================================================================
+
+def refresh_outliers(full_refresh=False, chunk_rows=REFRESH_CHUNK_ROWS,
+                     compression=DEFAULT_COMPRESSION, db_config=None, metrics=None):
+    """Sketch and tag the claims loaded since the last refresh
+
+    Everything runs in one transaction. Returns the newly tagged claims.
+    """
+    own_metrics = metrics is None
+    metrics = metrics or PipelineMetrics('claim_outliers')
+    conn = psycopg.connect(**(db_config or DB_CONFIG))
+    try:
+        with metrics.stage('sketch') as run, conn.cursor() as cursor:
+            sketches, watermarks = (({}, None) if full_refresh
+                                    else load_sketches(cursor, compression))
+            if watermarks is None:
+                print("   • Sketching every paid claim")
+                cursor.execute(f"TRUNCATE {TAG_TABLE}, {SKETCH_TABLE};")
+            else:
+                for source, watermark in sorted(watermarks.items()):
+                    print(f"   • {source}: claims first loaded since "
+                          f"{watermark:%Y-%m-%d %H:%M:%S}")
+
+            since, params = since_source_watermarks(
+                watermarks, columns=('load_timestamp', 'first_load_timestamp'))
+            new_claims = []
+            for frame in iter_frames(conn, NEW_CLAIMS_QUERY.format(since=since), params,
+                                     chunk_rows, cursor_name='outlier_source'):
+                for key, amounts in frame.groupby(['source_system', 'incident_type'])[
+                        'total_claim_amount']:
+                    sketches.setdefault(key, TDigest(compression)).update(amounts.to_numpy())
+                new_claims.append(frame)
+                run.rows += len(frame)
+            claims = pd.concat(new_claims, ignore_index=True)
+
+        if claims.empty:
+            print("   ✓ No new paid claims; sketches already current")
+            return claims
+
+        with metrics.stage('tag') as run, conn.cursor() as cursor:
+            tagged = tag_claims(claims.drop(columns='first_load_timestamp'), quartiles(sketches))
+            run.rows = copy_dataframe(cursor, TAG_TABLE, tagged[TAG_COLUMNS], show_progress=False)
+            watermarks = dict(watermarks or {})
+            watermarks.update(claims.groupby('source_system')['first_load_timestamp'].max())
+            save_sketches(cursor, sketches, watermarks)
+        conn.commit()
+    finally:
+        conn.close()
+        if own_metrics:
+            metrics.write_textfile()
+
+    print(f"   ✓ Tagged {len(tagged):,} claims across {len(sketches)} sketches")
+    return tagged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tag claim amount outliers from streaming sketches")
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="Rebuild the sketches and tags from every claim")
+    parser.add_argument('--compression', type=int, default=DEFAULT_COMPRESSION,
+                        help="t-digest compression (changing it rebuilds the sketches)")
+    parser.add_argument('--chunksize', type=int, default=REFRESH_CHUNK_ROWS,
+                        help="Claims fetched and sketched per chunk")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("GUIDEWIRE INSURANCE ANALYTICS - CLAIM AMOUNT OUTLIERS")
+    print("="*80)
+
+    print(f"\n1. Refreshing {SKETCH_TABLE}...")
+    try:
+        tagged = refresh_outliers(args.full_refresh, args.chunksize, args.compression)
+    except psycopg.Error as e:
+        print(f"\n✗ Database error: {e}")
+        sys.exit(1)
+
+    if not tagged.empty:
+        print("\n2. New claims by outlier category:")
+        counts = tagged['outlier_category'].value_counts()
+        for category in CATEGORIES:
+            print(f"   • {category:<28} {counts.get(category, 0):>10,}")
+
+    print("\n✓ OUTLIER REFRESH COMPLETE")
@@ -0,0 +1,17 @@
+"""
+Database Configuration
+Single place for PostgreSQL connection settings, read from the environment
+"""
+
+import os
+
+# Database connection parameters; override with environment variables.
+# Leave INSURANCE_DB_PASSWORD unset to fall back to PGPASSWORD or ~/.pgpass.
+DB_CONFIG = {
+    'dbname': os.environ.get('INSURANCE_DB_NAME', 'insurance_analytics'),
+    'user': os.environ.get('INSURANCE_DB_USER', 'addy'),
+    'host': os.environ.get('INSURANCE_DB_HOST', 'localhost'),
+    'port': os.environ.get('INSURANCE_DB_PORT', '5432'),
+}
+if os.environ.get('INSURANCE_DB_PASSWORD'):
+    DB_CONFIG['password'] = os.environ['INSURANCE_DB_PASSWORD']
@@ -0,0 +1,318 @@
+"""
+Embedded Engine
+Runs the dbt staging, union and mart models in an in-process DuckDB database,
+straight over the source CSV or Parquet files, so fct_claims and the marts can
+be built and analyzed without a PostgreSQL server.
+
+Source files are parsed with the loader engine's spec conversions, so the raw
+tables hold exactly what load_all.py would load. The model SQL is read from
+insurance_dbt/models and rendered as a full (non-incremental) build.
+
+    python duckdb_engine.py                     # CSVs in INSURANCE_DATA_DIR
+    python duckdb_engine.py --format parquet    # same names, .parquet
+
+    from duckdb_engine import read_table
+    claims = read_table('fct_claims')           # pyarrow.Table, no copy
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from features import FEATURE_SELECT, FEATURE_TABLE, TRAINING_QUERY, engineer_features
+from loader_engine import _iter_chunks, compile_spec
+from metrics import PipelineMetrics
+from source_specs import DATA_DIR, SOURCES
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+MODELS_DIR = os.path.join(REPO_DIR, 'insurance_dbt', 'models')
+
+# Database file; override with INSURANCE_DUCKDB_PATH (':memory:' keeps nothing)
+DUCKDB_PATH = os.environ.get('INSURANCE_DUCKDB_PATH',
+                             os.path.join(REPO_DIR, 'warehouse', 'insurance.duckdb'))
+
+# Same schema names dbt gives the models in PostgreSQL, so queries written for
+# one run unchanged on the other
+RAW_SCHEMA = 'insurance_raw'
+STAGING_SCHEMA = 'insurance_staging_staging'
+ANALYTICS_SCHEMA = 'insurance_staging_analytics'
+
+# (model, folder, materialization) in dependency order
+MODELS = [
+    ('stg_customer_a', 'staging', 'view'),
+    ('stg_customer_b', 'staging', 'view'),
+    ('stg_customer_c', 'staging', 'view'),
+    ('int_claims_unified', 'intermediate', 'view'),
+    ('fct_claims', 'marts', 'table'),
+    ('agg_claims_segments_monthly', 'marts', 'table'),
+    ('agg_claims_states_monthly', 'marts', 'table'),
+    ('agg_claims_daily', 'marts', 'table'),
+    ('mart_claims_summary', 'marts', 'table'),
+]
+
+# Raw column type per SourceSpec sql_type, as in sql/schema_setup.sql
+RAW_TYPES = {
+    'INTEGER': 'INTEGER',
+    'BIGINT': 'BIGINT',
+    'DECIMAL': 'DOUBLE',
+    'CURRENCY': 'DOUBLE',
+    'DATE': 'DATE',
+    'VARCHAR': 'VARCHAR',
+}
+
+# Rows parsed per chunk while building the raw tables
+CHUNK_ROWS = 100_000
+
+
+# ============================================================================
+# MODEL RENDERING - the few Jinja constructs the models use
+# ============================================================================
+
+_CONFIG = re.compile(r'^\{\{\s*config\(.*?^\}\}', re.DOTALL | re.MULTILINE)
+_COMMENT = re.compile(r'\{#.*?#\}', re.DOTALL)
+_INCREMENTAL = re.compile(
+    r'\{%-?\s*if is_incremental\(\)\s*-?%\}.*?'
+    r'(?:\{%-?\s*else\s*-?%\}(.*?))?\{%-?\s*endif\s*-?%\}', re.DOTALL)
+_SOURCE = re.compile(r"\{\{\s*source\('(\w+)',\s*'(\w+)'\)\s*\}\}")
+_REF = re.compile(r"\{\{\s*ref\('(\w+)'\)\s*\}\}")
+
+# Full-build form of the macros in insurance_dbt/macros/claim_rollups.sql
+_ROLLUP_CLAIMS = re.compile(r"\{\{\s*rollup_claims\(ref\('(\w+)'\)\)\s*\}\}")
+ROLLUP_CLAIMS_SQL = ("SELECT c.*, DATE_TRUNC('month', COALESCE(c.incident_date, "
+                     "c.first_load_timestamp)) AS claim_month FROM {relation} c")
+
+
+def model_relation(model):
+    """Schema-qualified name a model is built as"""
+    folder = {name: folder for name, folder, _ in MODELS}[model]
+    return f"{ANALYTICS_SCHEMA if folder == 'marts' else STAGING_SCHEMA}.{model}"
+
+
+def render_model(model):
+    """SQL of one dbt model for a full build
+
+    config() blocks and post-hooks (PostgreSQL indexes) are dropped and
+    is_incremental() branches take their else side. Anything else in Jinja
+    raises, rather than running SQL that differs from what dbt would.
+    """
+    folder = {name: folder for name, folder, _ in MODELS}[model]
+    with open(os.path.join(MODELS_DIR, folder, f"{model}.sql")) as f:
+        sql = f.read()
+    sql = _CONFIG.sub('', sql)
+    sql = _COMMENT.sub('', sql)
+    sql = _INCREMENTAL.sub(lambda m: m.group(1) or '', sql)
+    sql = _ROLLUP_CLAIMS.sub(
+        lambda m: ROLLUP_CLAIMS_SQL.format(relation=model_relation(m.group(1))), sql)
+    sql = _SOURCE.sub(lambda m: f"{RAW_SCHEMA}.{m.group(2)}", sql)
+    sql = _REF.sub(lambda m: model_relation(m.group(1)), sql)
+    if '{{' in sql or '{%' in sql:
+        raise ValueError(f"{model}: Jinja the embedded engine cannot render")
+    return sql
+
+
+# ============================================================================
+# RAW LAYER
+# ============================================================================
+
+def source_files(spec, data_dir=None, file_format='csv'):
+    """Files of one feed, oldest name first; Parquet files share the CSV's name"""
+    pattern = os.path.join(data_dir or DATA_DIR, spec.file_glob or spec.file_name)
+    if file_format == 'parquet':
+        pattern = os.path.splitext(pattern)[0] + '.parquet'
+    paths = sorted(glob.glob(pattern))
+    if not paths:
+        raise FileNotFoundError(pattern)
+    return paths
+
+
+def _iter_parquet(path, compiled, chunksize):
+    """Parquet batches shaped like _iter_chunks' CSV frames
+
+    The file holds the CSV's columns; text columns are read as strings and the
+    spec's null tokens blanked, so the same converters apply.
+    """
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+        df = batch.to_pandas()
+        df = df.astype({col: dtype for col, dtype in compiled.dtype.items() if col in df})
+        for col, tokens in compiled.na_values.items():
+            if col in df:
+                df[col] = df[col].mask(df[col].isin(tokens))
+        yield df
+
+
+def load_raw(con, spec, paths, chunksize=CHUNK_ROWS):
+    """(Re)create one raw table from its files; returns (rows, NULLed values)"""
+    compiled = compile_spec(spec)
+    columns = [f"{col.target} {RAW_TYPES[col.sql_type]}" for col in spec.columns]
+    con.execute(f"CREATE OR REPLACE TABLE {spec.table} ("
+                f"{', '.join(columns)}, load_timestamp TIMESTAMP, source_file VARCHAR)")
+
+    load_timestamp = datetime.now()
+    rows = coerced = 0
+    for path in paths:
+        if path.endswith('.parquet'):
+            chunks = _iter_parquet(path, compiled, chunksize)
+        else:
+            chunks = _iter_chunks(path, compiled, chunksize=chunksize)
+        for chunk in chunks:
+            frame, lost = compiled.prepare(chunk, load_timestamp, os.path.basename(path))
+            con.register('raw_chunk', frame)
+            con.execute(f"INSERT INTO {spec.table} BY NAME SELECT * FROM raw_chunk")
+            con.unregister('raw_chunk')
+            rows += len(frame)
+            coerced += sum(lost.values())
+    return rows, coerced
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def connect(database=DUCKDB_PATH, read_only=False):
+    """DuckDB connection, creating the database's folder if needed"""
+    if database != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(database)), exist_ok=True)
+    return duckdb.connect(database, read_only=read_only)
+
+
+def build(database=DUCKDB_PATH, data_dir=None, file_format='csv', chunksize=CHUNK_ROWS,
+          verbose=True, metrics=None):
+    """Load the raw tables and build every model; returns the open connection"""
+    say = print if verbose else (lambda *args, **kwargs: None)
+    con = connect(database)
+    for schema in (RAW_SCHEMA, STAGING_SCHEMA, ANALYTICS_SCHEMA):
+        con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+
+    say("\n1. Loading raw tables...")
+    for spec in SOURCES.values():
+        paths = source_files(spec, data_dir, file_format)
+        start = time.perf_counter()
+        rows, coerced = load_raw(con, spec, paths, chunksize)
+        elapsed = time.perf_counter() - start
+        if metrics:
+            metrics.record('raw_load', elapsed, rows, source=spec.name)
+        say(f"   ✓ {spec.table}: {rows:,} rows from {len(paths)} file(s) in {elapsed:.2f}s")
+        if coerced:
+            say(f"   ⚠ {coerced:,} unparseable values loaded as NULL")
+
+    say("\n2. Building models...")
+    for model, _, materialized in MODELS:
+        relation = model_relation(model)
+        start = time.perf_counter()
+        kind = 'VIEW' if materialized == 'view' else 'TABLE'
+        con.execute(f"CREATE OR REPLACE {kind} {relation} AS {render_model(model)}")
+        elapsed = time.perf_counter() - start
+        if materialized == 'view':
+            say(f"   ✓ {relation} (view)")
+            continue
+        rows = con.execute(f"SELECT COUNT(*) FROM {relation}").fetchone()[0]
+        if metrics:
+            metrics.record('model', elapsed, rows, model=model)
+        say(f"   ✓ {relation}: {rows:,} rows in {elapsed:.2f}s")
+    return con
+
+
+# ============================================================================
+# ARROW ACCESS
+# ============================================================================
+
+def _fetch_arrow(con, sql, params=None):
+    """Query result as a pyarrow.Table with DECIMAL columns as float64
+
+    DuckDB hands its columnar result to Arrow without converting it row by
+    row. DECIMAL becomes float64, as NUMERIC does in extraction.iter_frames,
+    since pandas would otherwise hold it as Decimal objects.
+    """
+    table = con.execute(sql, params).fetch_arrow_table()
+    for index, field in enumerate(table.schema):
+        if pa.types.is_decimal(field.type):
+            table = table.set_column(index, field.name, table.column(index).cast(pa.float64()))
+    return table
+
+
+def query(sql, database=DUCKDB_PATH, params=None):
+    """Result of a query against a built database as a pyarrow.Table"""
+    con = connect(database, read_only=True)
+    try:
+        return _fetch_arrow(con, sql, params)
+    finally:
+        con.close()
+
+
+def read_table(model='fct_claims', database=DUCKDB_PATH, where=None):
+    """A built model as a pyarrow.Table, optionally filtered by a SQL predicate"""
+    sql = f"SELECT * FROM {model_relation(model)}"
+    if where:
+        sql += f" WHERE {where}"
+    return query(sql, database)
+
+
+def training_data(database=DUCKDB_PATH):
+    """ml_modeling's training frame, engineered in-process from fct_claims
+
+    Takes the place of the PostgreSQL feature store: the feature store's
+    extraction and features.engineer_features produce the claim_features
+    rows, and TRAINING_QUERY runs over them unchanged.
+    """
+    con = connect(database, read_only=True)
+    try:
+        features = _fetch_arrow(
+            con, f"SELECT {FEATURE_SELECT}, total_claim_amount "
+                 f"FROM {model_relation('fct_claims')} ORDER BY load_timestamp").to_pandas()
+        features = engineer_features(features.drop_duplicates('claim_id', keep='last'))
+        con.register('claim_features', features)
+        return _fetch_arrow(con, TRAINING_QUERY.replace(FEATURE_TABLE, 'claim_features')).to_pandas()
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the claims models in embedded DuckDB")
+    parser.add_argument('--database', default=DUCKDB_PATH,
+                        help="DuckDB file to build (default: INSURANCE_DUCKDB_PATH)")
+    parser.add_argument('--data-dir', default=None,
+                        help="Folder with the source files (default: INSURANCE_DATA_DIR)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help="Source file format")
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS,
+                        help="Rows parsed per chunk")
+    parser.add_argument('--export-dir', default=None,
+                        help="Also write every mart table to <dir>/<model>.parquet")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("GUIDEWIRE INSURANCE ANALYTICS - EMBEDDED ENGINE")
+    print("="*80)
+    print(f"\n   • Database: {args.database}")
+
+    metrics = PipelineMetrics('duckdb_engine')
+    start = time.perf_counter()
+    try:
+        con = build(args.database, args.data_dir, args.format, args.chunksize, metrics=metrics)
+    except (FileNotFoundError, ValueError, duckdb.Error) as e:
+        print(f"\n✗ Build failed: {e}")
+        metrics.write_textfile()
+        sys.exit(1)
+
+    if args.export_dir:
+        print("\n3. Exporting marts...")
+        os.makedirs(args.export_dir, exist_ok=True)
+        for model, folder, materialized in MODELS:
+            if materialized == 'table':
+                path = os.path.join(args.export_dir, f"{model}.parquet")
+                con.execute(f"COPY {model_relation(model)} TO '{path}' (FORMAT PARQUET)")
+                print(f"   ✓ {path}")
+    con.close()
+
+    metrics.record('total', time.perf_counter() - start)
+    metrics.write_textfile()
+    print(f"\n✓ BUILD COMPLETE in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,165 @@
+"""
+Query Workload EXPLAIN Benchmark
+Times the index-sensitive queries from sql/advanced_sql_queries.sql and the
+incremental raw-table scan with EXPLAIN ANALYZE, once as the old heap-only
+layout would run them and once with the partitions and indexes in place
+
+"Before" runs with index scans and partition pruning switched off for the
+transaction, which is how the planner saw the tables before they had
+indexes or partitions; nothing is dropped, so it is safe on a live database.
+"""
+
+import argparse
+import statistics
+import sys
+
+import psycopg
+
+from db_config import DB_CONFIG
+
+FCT_CLAIMS = 'insurance_staging_analytics.fct_claims'
+
+# Planner settings that reproduce the unindexed, unpartitioned layout
+BEFORE_SETTINGS = ['enable_indexscan', 'enable_indexonlyscan', 'enable_bitmapscan',
+                   'enable_partition_pruning']
+
+# (label, query) pairs; numbers refer to sql/advanced_sql_queries.sql
+WORKLOAD = [
+    ('1.2 daily running totals', f"""
+        SELECT incident_date, COUNT(*), SUM(total_claim_amount),
+               SUM(COUNT(*)) OVER (ORDER BY incident_date)
+        FROM {FCT_CLAIMS}
+        WHERE incident_date IS NOT NULL
+        GROUP BY incident_date
+        ORDER BY incident_date"""),
+    ('1.3 moving average, first 100', f"""
+        SELECT claim_id, incident_date, total_claim_amount,
+               AVG(total_claim_amount) OVER (ORDER BY incident_date
+                                             ROWS BETWEEN 50 PRECEDING AND 50 FOLLOWING)
+        FROM {FCT_CLAIMS}
+        WHERE incident_date IS NOT NULL
+        ORDER BY incident_date
+        LIMIT 100"""),
+    ('2.1 largest claims', f"""
+        SELECT claim_id, source_system, total_claim_amount, claim_severity_category
+        FROM {FCT_CLAIMS}
+        WHERE total_claim_amount > 50000
+        ORDER BY total_claim_amount DESC
+        LIMIT 25"""),
+    ('5.1 outliers above Q3 + 1.5 IQR', f"""
+        WITH s AS (
+            SELECT PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY total_claim_amount) AS q1,
+                   PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY total_claim_amount) AS q3
+            FROM {FCT_CLAIMS}
+            WHERE total_claim_amount > 0
+        )
+        SELECT c.claim_id, c.total_claim_amount
+        FROM {FCT_CLAIMS} c CROSS JOIN s
+        WHERE c.total_claim_amount > (SELECT (q3 + 1.5 * (q3 - q1))::numeric FROM s)
+        ORDER BY c.total_claim_amount DESC
+        LIMIT 50"""),
+    ('7.1 one state', f"""
+        SELECT COUNT(*), SUM(total_claim_amount)
+        FROM {FCT_CLAIMS}
+        WHERE COALESCE(incident_state, policy_state) = 'OH'"""),
+    # 10.1 with a recent cutoff; its 2015-01-01 covers every sample claim
+    ('10.1 recent claims by age group', f"""
+        SELECT age_group, claim_severity_category, COUNT(*), AVG(total_claim_amount)
+        FROM {FCT_CLAIMS}
+        WHERE total_claim_amount > 1000 AND incident_date >= '2015-03-01'
+        GROUP BY age_group, claim_severity_category"""),
+    ('raw delta since watermark', f"""
+        SELECT COUNT(*)
+        FROM insurance_raw.customer_c_policies
+        WHERE load_timestamp > (SELECT MAX(load_timestamp) - INTERVAL '1 day'
+                                FROM {FCT_CLAIMS})"""),
+]
+
+
+def explain(cursor, query, before):
+    """(execution ms, plan) for one EXPLAIN ANALYZE run, rolled back afterwards"""
+    cursor.execute("BEGIN;")
+    try:
+        if before:
+            for setting in BEFORE_SETTINGS:
+                cursor.execute(f"SET LOCAL {setting} = off;")
+        cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}")
+        result = cursor.fetchone()[0][0]
+    finally:
+        cursor.execute("ROLLBACK;")
+    return result['Execution Time'], result['Plan']
+
+
+def _scan_nodes(plan):
+    """Distinct scans that actually ran, e.g. 'Index Scan fct_claims_idx'
+
+    Partitions removed by runtime pruning stay in the plan with no loops.
+    """
+    nodes = []
+    if plan.get('Actual Loops', 1) == 0:
+        return nodes
+    if 'Scan' in plan['Node Type']:
+        target = plan.get('Index Name') or plan.get('Relation Name', '')
+        nodes.append(f"{plan['Node Type']} {target}".strip())
+    for child in plan.get('Plans', []):
+        nodes.extend(_scan_nodes(child))
+    return list(dict.fromkeys(nodes))
+
+
+def run_workload(repeat=5, db_config=None):
+    """Median before/after execution time per workload query
+
+    Returns [(label, before ms, after ms, after-plan scans)].
+    """
+    conn = psycopg.connect(**(db_config or DB_CONFIG), autocommit=True)
+    results = []
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"ANALYZE {FCT_CLAIMS};")
+            for label, query in WORKLOAD:
+                # One untimed pass each warms the cache so both sides read from memory
+                explain(cursor, query, before=True)
+                explain(cursor, query, before=False)
+                before = [explain(cursor, query, before=True)[0] for _ in range(repeat)]
+                timings = [explain(cursor, query, before=False) for _ in range(repeat)]
+                after = [ms for ms, _ in timings]
+                results.append((label, statistics.median(before), statistics.median(after),
+                                _scan_nodes(timings[-1][1])))
+    finally:
+        conn.close()
+    return results
+
+
+def print_results(results):
+    print("\n   Query                            | Before ms | After ms | Speedup")
+    print("   " + "-"*70)
+    for label, before, after, _ in results:
+        speedup = before / after if after > 0 else float('inf')
+        print(f"   {label:<32} | {before:>9.2f} | {after:>8.2f} | {speedup:>6.1f}x")
+    print("\n   Plans with indexes and partitions:")
+    for label, _, _, scans in results:
+        print(f"   • {label}: {', '.join(scans) or 'no table scan'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the query workload "
+                                                 "with and without indexes and pruning")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="Timed runs per query and layout; the median is reported")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("GUIDEWIRE INSURANCE ANALYTICS - QUERY WORKLOAD EXPLAIN")
+    print("Heap-only layout vs. partitions and workload indexes")
+    print("="*80)
+
+    print(f"\n1. Running {len(WORKLOAD)} queries, {args.repeat} times per layout...")
+    try:
+        results = run_workload(args.repeat)
+    except psycopg.Error as e:
+        print(f"\n✗ Database error: {e}")
+        sys.exit(1)
+
+    print("\n2. Results (median execution time):")
+    print_results(results)
+    print("\n✓ WORKLOAD EXPLAIN COMPLETE")
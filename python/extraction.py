@@ -0,0 +1,327 @@
+"""
+Extraction Cache
+Local Parquet cache for analytics extractions from the dbt marts, keyed by the
+query text and the mart's data version so repeat runs skip the database read
+"""
+
+import hashlib
+import os
+import time
+import warnings
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import psycopg
+from psycopg.types.numeric import FloatLoader
+
+from db_config import DB_CONFIG
+from source_specs import SOURCES
+
+FCT_CLAIMS = 'insurance_staging_analytics.fct_claims'
+
+# Cache folder; override with INSURANCE_CACHE_DIR
+CACHE_DIR = os.environ.get(
+    'INSURANCE_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '.cache', 'extractions'))
+
+# Disk budget for the cache folder; least recently used files go first.
+# Override with INSURANCE_CACHE_MAX_MB
+CACHE_MAX_BYTES = int(os.environ.get('INSURANCE_CACHE_MAX_MB', '2048')) * 1024 * 1024
+
+# Rows fetched per round trip from the server-side cursor
+FETCH_ROWS = 50000
+
+# Text columns with at most this share of distinct values become category
+CATEGORY_MAX_RATIO = 0.5
+
+# Largest integer float32 holds exactly
+FLOAT32_EXACT_INT = 2 ** 24
+
+
+def data_version(cursor, table=FCT_CLAIMS, column='load_timestamp'):
+    """Row count and newest load timestamp of a mart, as a short string
+
+    Both change whenever an incremental or full dbt run adds or replaces rows.
+    column names the table's load timestamp (latest_load on the rollups).
+    """
+    cursor.execute(f"SELECT COUNT(*), MAX({column}) FROM {table};")
+    row_count, latest = cursor.fetchone()
+    return f"{row_count}@{latest.isoformat() if latest else 'empty'}"
+
+
+def since_source_watermarks(watermarks, columns=('load_timestamp',)):
+    """WHERE predicate and parameters for fct_claims rows at or after their source's watermark
+
+    watermarks maps source_system to a timestamp; sources in
+    source_specs.SOURCES without one are read whole. Sources load
+    concurrently, so one watermark for all of them would skip a source that
+    committed late. Every source is its own range, which the
+    (source_system, load_timestamp) index serves; >= re-reads the newest
+    load, so callers skip the rows they already hold.
+    """
+    watermarks = watermarks or {}
+    sources = sorted(set(SOURCES) | set(watermarks))
+    bounds = ''.join(f" AND {column} >= %s" for column in columns)
+    predicate = ' OR '.join([f"(source_system = %s{bounds})"] * len(sources))
+    params = []
+    for source in sources:
+        params += [source] + [watermarks.get(source, '-infinity')] * len(columns)
+    return predicate, params
+
+
+# ============================================================================
+# COMPACT EXTRACTION - server-side cursor, category text, downcast numerics
+# ============================================================================
+
+def _widen(series):
+    """Driver objects (Decimal, date, bool) -> a native pandas dtype"""
+    sample = series.dropna()
+    if series.dtype != object or sample.empty:
+        return series
+    first = sample.iloc[0]
+    if isinstance(first, bool):
+        return series.astype('boolean')
+    if isinstance(first, (int, float, Decimal)):
+        return pd.to_numeric(series).astype('float64')
+    if hasattr(first, 'isoformat'):
+        return pd.to_datetime(series)
+    return series
+
+
+def _text_columns(frame):
+    return [column for column in frame.columns
+            if pd.api.types.infer_dtype(frame[column], skipna=True) == 'string']
+
+
+def _downcast(series):
+    """Smallest dtype that holds every value exactly
+
+    Integral columns become the narrowest int, or float32 when they have NULLs
+    and fit its exact-integer range. Fractional floats stay float64 so money
+    keeps its cents.
+    """
+    if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+        return series
+    values = series.dropna().to_numpy(dtype='float64')
+    if values.size and not np.array_equal(values, np.trunc(values)):
+        return series
+    if series.isna().any():
+        if not values.size or np.abs(values).max() <= FLOAT32_EXACT_INT:
+            return series.astype('float32')
+        return series
+    return pd.to_numeric(series, downcast='integer')
+
+
+def iter_frames(conn, query, params=None, chunk_rows=FETCH_ROWS, cursor_name='extraction'):
+    """Yield a query's result as DataFrames of up to chunk_rows rows
+
+    Rows come through a named server-side cursor, so neither the driver nor
+    pandas ever holds the whole result. At least one (possibly empty) frame
+    is yielded so callers always see the columns.
+    """
+    with conn.cursor(name=cursor_name) as cursor:
+        # NUMERIC arrives as float rather than Decimal: the frame stores
+        # float64 either way and Decimal parsing dominates fetch time
+        cursor.adapters.register_loader('numeric', FloatLoader)
+        cursor.execute(query, params)
+        columns = [column.name for column in cursor.description]
+        first = True
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows and not first:
+                break
+            first = False
+            frame = pd.DataFrame.from_records(rows, columns=columns)
+            del rows  # Drop the tuples before the consumer works on the frame
+            yield frame
+
+
+def _aligned_categoricals(parts):
+    """Categoricals of each chunk, with all-NULL chunks given the others' category dtype
+
+    A chunk where a column is entirely NULL has empty object categories,
+    which union_categoricals refuses to combine with text categories.
+    """
+    arrays = [part.array for part in parts]
+    dtype = next((array.categories.dtype for array in arrays if len(array.categories)), None)
+    if dtype is None:
+        return arrays
+    return [array if len(array.categories) else
+            array.set_categories(array.categories.astype(dtype)) for array in arrays]
+
+
+def compact_query(query, conn, chunk_rows=FETCH_ROWS):
+    """Fetch a query through iter_frames into a compact DataFrame
+
+    Each chunk's low-cardinality text becomes category (decided on the first
+    chunk where the column has values) and numerics are downcast once the
+    full columns are known.
+    """
+    frames = []
+    category_columns = set()
+    undecided = None
+    for frame in iter_frames(conn, query, chunk_rows=chunk_rows,
+                             cursor_name='compact_extraction'):
+        if undecided is None:
+            undecided = set(frame.columns)
+        # An all-NULL chunk says nothing about a column's cardinality, so it
+        # is judged on the first chunk that has values
+        present = [column for column in frame.columns
+                   if column in undecided and frame[column].count()]
+        undecided.difference_update(present)
+        category_columns.update(
+            column for column in _text_columns(frame[present])
+            if frame[column].nunique() <= CATEGORY_MAX_RATIO * frame[column].count()
+        )
+        for column in frame.columns:
+            if column in category_columns:
+                frame[column] = frame[column].astype('category')
+            else:
+                frame[column] = _widen(frame[column])
+        frames.append(frame)
+    columns = list(frames[0].columns)
+
+    combined = {}
+    for column in columns:
+        parts = [frame[column] for frame in frames]
+        if column in category_columns:
+            # Chunks before the decision hold only NULLs in this column
+            combined[column] = pd.Series(pd.api.types.union_categoricals(
+                _aligned_categoricals([part.astype('category') for part in parts])))
+        else:
+            # Widened again: chunks that were all NULL left the parts as object
+            combined[column] = _downcast(_widen(pd.concat(parts, ignore_index=True)))
+    return pd.DataFrame(combined)
+
+
+# ============================================================================
+# PARQUET CACHE
+# ============================================================================
+
+def _digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _query_key(query, compact=False):
+    # Whitespace-insensitive, so reformatting a query keeps its cache
+    mode = '\n-- compact' if compact else ''
+    return _digest(' '.join(query.split()) + mode)
+
+
+def _cached_files(cache_dir, query_key):
+    """Cache files for a query, newest first"""
+    if not os.path.isdir(cache_dir):
+        return []
+    paths = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+             if name.startswith(query_key + '-') and name.endswith('.parquet')]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def newest_cached(query, cache_dir=None, compact=False):
+    """Newest cached copy of a query's result regardless of data version, or None"""
+    cached = _cached_files(cache_dir or CACHE_DIR, _query_key(query, compact))
+    return pd.read_parquet(cached[0]) if cached else None
+
+
+def prune_cache(cache_dir=None, max_bytes=CACHE_MAX_BYTES, keep=()):
+    """Delete least recently used cache files until the folder fits max_bytes
+
+    Hits refresh a file's mtime, so mtime order is use order. Paths in keep
+    are never deleted. Returns the number of files removed.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return 0
+    files = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.parquet'):
+            stat = os.stat(os.path.join(cache_dir, name))
+            files.append((stat.st_mtime, stat.st_size, os.path.join(cache_dir, name)))
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Another process evicted it first
+        total -= size
+        removed += 1
+    return removed
+
+
+def cached_query(query, db_config=None, version_table=FCT_CLAIMS, cache_dir=None,
+                 refresh=False, verbose=True, compact=False, chunk_rows=FETCH_ROWS,
+                 conn=None, version=None):
+    """Run a query against a mart, or load its result from the local cache
+
+    The cache entry is keyed by the query text plus data_version(version_table),
+    so it refreshes automatically after a dbt run changes the mart. Older
+    versions of the same query are removed when a new one is written, and the
+    folder is kept under CACHE_MAX_BYTES by evicting the least recently used
+    files. If the database cannot be reached, the newest cached copy is used
+    instead.
+
+    compact=True fetches through compact_query (server-side cursor, category
+    text, downcast numerics); Parquet keeps those dtypes on the way back.
+    conn reuses an open connection (left open), and version skips the
+    data_version query when the caller already knows it.
+    """
+    db_config = db_config or DB_CONFIG
+    cache_dir = cache_dir or CACHE_DIR
+    say = print if verbose else (lambda *args, **kwargs: None)
+    query_key = _query_key(query, compact)
+    start = time.perf_counter()
+
+    own_conn = conn is None
+    if own_conn:
+        try:
+            conn = psycopg.connect(**db_config)
+        except psycopg.OperationalError:
+            cached = _cached_files(cache_dir, query_key)
+            if not cached:
+                raise
+            say(f"   ⚠ Database unavailable; using cached extraction "
+                f"{os.path.basename(cached[0])}")
+            return pd.read_parquet(cached[0])
+
+    try:
+        if version is None:
+            with conn.cursor() as cursor:
+                version = data_version(cursor, version_table)
+        path = os.path.join(cache_dir, f"{query_key}-{_digest(version)}.parquet")
+
+        if not refresh and os.path.exists(path):
+            df = pd.read_parquet(path)
+            os.utime(path)  # Mark as recently used for prune_cache
+            say(f"   ✓ Loaded from cache in {time.perf_counter() - start:.3f}s "
+                f"(data version {version})")
+            return df
+
+        if compact:
+            df = compact_query(query, conn, chunk_rows)
+        else:
+            with warnings.catch_warnings():
+                # psycopg works fine here; pandas only vouches for SQLAlchemy
+                warnings.filterwarnings('ignore', message='pandas only supports SQLAlchemy')
+                df = pd.read_sql_query(query, conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write to a temp name first so a crash never leaves a partial cache file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(temp_path, index=False)
+    os.replace(temp_path, path)
+    for stale in _cached_files(cache_dir, query_key):
+        if stale != path:
+            os.remove(stale)
+    prune_cache(cache_dir, keep=(path,))
+    say(f"   ✓ Queried database in {time.perf_counter() - start:.3f}s and cached "
+        f"(data version {version})")
+    return df
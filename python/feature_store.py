@@ -0,0 +1,152 @@
+"""
+Claim Feature Store
+Keeps insurance_analytics.claim_features, one row of model-ready features per
+claim, in step with fct_claims. Only claims loaded since the last refresh are
+engineered and upserted, so training and batch scoring read finished features
+instead of recomputing them
+"""
+
+import argparse
+import sys
+
+import psycopg
+
+from bulk_load import Throughput, copy_dataframe
+from db_config import DB_CONFIG
+from extraction import iter_frames, since_source_watermarks
+from features import (FCT_CLAIMS, FEATURE_COLUMNS, FEATURE_TABLE, SOURCE_QUERY,
+                      engineer_features, feature_set_version)
+from metrics import PipelineMetrics
+
+# Claims fetched, engineered and written per round
+REFRESH_CHUNK_ROWS = 50000
+
+STORE_COLUMNS = (['claim_id'] + FEATURE_COLUMNS +
+                 ['total_claim_amount', 'source_system', 'source_load_timestamp',
+                  'feature_version'])
+
+
+def stored_watermarks(cursor, version):
+    """Newest fct_claims load_timestamp already in the store, per source_system
+
+    Per source because the sources load concurrently: one can reach the
+    mart with rows older than another's newest. Returns None when the store
+    is empty or was built by a different feature set version, meaning every
+    claim has to be rebuilt.
+    """
+    # Every row carries the version of the refresh that wrote it, and a
+    # version change rebuilds them all, so any one row is representative
+    cursor.execute(f"SELECT feature_version FROM {FEATURE_TABLE} LIMIT 1;")
+    row = cursor.fetchone()
+    if row is None or row[0] != version:
+        return None
+    cursor.execute(f"""
+        SELECT source_system, MAX(source_load_timestamp)
+        FROM {FEATURE_TABLE}
+        GROUP BY source_system;
+    """)
+    return dict(cursor.fetchall())
+
+
+def holds_dropped_claims(cursor):
+    """True when the store has claims that fct_claims no longer has
+
+    Claims only leave fct_claims when dbt rebuilds it (--full-refresh after
+    raw rows were deleted). A refresh leaves every fct_claims claim in the
+    store, so the store outnumbering the mart means some were dropped: two
+    index-only counts rather than an anti-join of both tables every time.
+    """
+    cursor.execute(f"""
+        SELECT (SELECT COUNT(*) FROM {FEATURE_TABLE}) > (SELECT COUNT(*) FROM {FCT_CLAIMS});
+    """)
+    return cursor.fetchone()[0]
+
+
+def refresh_features(full_refresh=False, chunk_rows=REFRESH_CHUNK_ROWS, db_config=None,
+                     metrics=None):
+    """Bring claim_features up to date with fct_claims
+
+    New and reloaded claims (load_timestamp past their source's stored
+    watermark) are engineered with features.engineer_features and replace
+    their old rows; after a rebuild of fct_claims dropped claims, they are
+    removed too. Everything runs in one transaction, so readers never see a
+    half-refreshed store.
+    The refresh is recorded as the feature_build stage of metrics (by default
+    its own feature_store pipeline). Returns (claims written, claims removed).
+    """
+    own_metrics = metrics is None
+    metrics = metrics or PipelineMetrics('feature_store')
+    version = feature_set_version()
+    conn = psycopg.connect(**(db_config or DB_CONFIG))
+    timer = Throughput()
+    written = 0
+    try:
+        with metrics.stage('feature_build') as run, conn.cursor() as cursor:
+            watermarks = None if full_refresh else stored_watermarks(cursor, version)
+            if watermarks is None:
+                print(f"   • Rebuilding every claim (feature set {version})")
+                cursor.execute(f"TRUNCATE {FEATURE_TABLE};")
+            else:
+                for source, watermark in sorted(watermarks.items()):
+                    print(f"   • {source}: claims loaded since {watermark:%Y-%m-%d %H:%M:%S}")
+
+            since, params = since_source_watermarks(watermarks)
+            for frame in iter_frames(conn, SOURCE_QUERY.format(since=since), params, chunk_rows,
+                                     cursor_name='feature_source'):
+                if frame.empty:
+                    continue
+                frame = engineer_features(frame)
+                frame['feature_version'] = version
+                if watermarks is not None:
+                    cursor.execute(f"DELETE FROM {FEATURE_TABLE} WHERE claim_id = ANY(%s);",
+                                   (frame['claim_id'].tolist(),))
+                copy_dataframe(cursor, FEATURE_TABLE, frame[STORE_COLUMNS], show_progress=False)
+                written += len(frame)
+                run.rows = written
+                run.bytes += int(frame.memory_usage(index=False).sum())
+                print(f"   • Engineered {written:,} claims...", end='\r')
+
+            # Claims dropped from the mart (by a dbt --full-refresh)
+            removed = 0
+            if watermarks is not None and holds_dropped_claims(cursor):
+                cursor.execute(f"""
+                    DELETE FROM {FEATURE_TABLE} f
+                    WHERE NOT EXISTS (SELECT 1 FROM {FCT_CLAIMS} c WHERE c.claim_id = f.claim_id);
+                """)
+                removed = cursor.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+        if own_metrics:
+            metrics.write_textfile()
+
+    if written:
+        print(f"   ✓ Engineered {timer.summary(written)}")
+    else:
+        print("   ✓ Feature store already current")
+    if removed:
+        print(f"   ✓ Removed {removed:,} claims no longer in {FCT_CLAIMS}")
+    return written, removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the claim feature store from fct_claims")
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="Rebuild every claim instead of only new ones")
+    parser.add_argument('--chunksize', type=int, default=REFRESH_CHUNK_ROWS,
+                        help="Claims fetched and engineered per chunk")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("GUIDEWIRE INSURANCE ANALYTICS - FEATURE STORE")
+    print("Model-Ready Claim Features")
+    print("="*80)
+
+    print(f"\n1. Refreshing {FEATURE_TABLE}...")
+    try:
+        refresh_features(args.full_refresh, args.chunksize)
+    except psycopg.Error as e:
+        print(f"\n✗ Database error: {e}")
+        sys.exit(1)
+
+    print("\n✓ FEATURE STORE REFRESH COMPLETE")
@@ -0,0 +1,118 @@
+"""
+Load Manifest
+Fingerprints source files and records what has been loaded from each one in
+insurance_raw.load_manifest, so incremental runs only read the delta
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+
+MANIFEST_TABLE = 'insurance_raw.load_manifest'
+
+# Read size for hashing source files
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+@dataclass
+class FilePlan:
+    """What an incremental run will do with one source file"""
+    path: str
+    action: str          # 'new', 'append', 'reload' or 'skip'
+    start_offset: int    # Byte offset where reading starts (0 = whole file)
+    size: int            # Byte offset where reading stops: the end of the last full line
+    content_hash: str    # sha256 of the first size bytes
+    prior_rows: int      # Rows already loaded from this file
+    tail_bytes: int = 0  # Bytes after the last newline, left until the line is finished
+
+    @property
+    def source_file(self):
+        return os.path.basename(self.path)
+
+
+def hash_file(path, prefix_bytes=0):
+    """Hash a file in one pass; returns (prefix_hash, lines_hash, lines_size, tail_bytes)
+
+    prefix_hash covers the first prefix_bytes bytes and is None when the
+    file is shorter than that. lines_hash and lines_size cover the file up
+    to its last newline: a writer may be halfway through the line after it,
+    so those tail_bytes are neither hashed nor loaded until it is finished.
+    """
+    digest = hashlib.sha256()
+    prefix_hash = None if prefix_bytes else digest.hexdigest()
+    size = 0
+    # Digest state before the last block holding a newline, and that block
+    last_lines = (digest.copy(), b'', 0)
+    with open(path, 'rb') as f:
+        while True:
+            block_size = HASH_BLOCK_BYTES
+            if prefix_hash is None:
+                block_size = min(block_size, prefix_bytes - size)
+            block = f.read(block_size)
+            if not block:
+                break
+            if b'\n' in block:
+                last_lines = (digest.copy(), block, size)
+            digest.update(block)
+            size += len(block)
+            if prefix_hash is None and size == prefix_bytes:
+                prefix_hash = digest.hexdigest()
+
+    lines_digest, block, block_start = last_lines
+    line_end = block.rfind(b'\n') + 1
+    lines_digest.update(block[:line_end])
+    lines_size = block_start + line_end
+    return prefix_hash, lines_digest.hexdigest(), lines_size, size - lines_size
+
+
+def latest_entries(cursor, table):
+    """Most recent manifest row per source file for one raw table"""
+    cursor.execute(f"""
+        SELECT DISTINCT ON (source_file)
+            source_file, content_hash, row_count, byte_offset
+        FROM {MANIFEST_TABLE}
+        WHERE table_name = %s
+        ORDER BY source_file, manifest_id DESC;
+    """, (table,))
+    return {
+        row[0]: {'content_hash': row[1], 'row_count': row[2], 'byte_offset': row[3]}
+        for row in cursor.fetchall()
+    }
+
+
+def plan_file(path, entry):
+    """Compare a file with its last manifest entry and decide what to load"""
+    if entry is None:
+        _, content_hash, size, tail = hash_file(path)
+        return FilePlan(path, 'new', 0, size, content_hash, 0, tail)
+
+    offset = entry['byte_offset']
+    prefix_hash, content_hash, size, tail = hash_file(path, prefix_bytes=offset)
+    if prefix_hash != entry['content_hash']:
+        # Earlier bytes changed: the file was rewritten, not appended to
+        return FilePlan(path, 'reload', 0, size, content_hash, 0, tail)
+    if size == offset:
+        return FilePlan(path, 'skip', offset, size, content_hash, entry['row_count'], tail)
+    return FilePlan(path, 'append', offset, size, content_hash, entry['row_count'], tail)
+
+
+def full_plan(path):
+    """Plan for a full (non-incremental) load of a file"""
+    _, content_hash, size, tail = hash_file(path)
+    return FilePlan(path, 'full', 0, size, content_hash, 0, tail)
+
+
+def record_load(cursor, table, plan, rows_read, load_timestamp):
+    """Add a manifest row for a file that was just loaded"""
+    cursor.execute(f"""
+        INSERT INTO {MANIFEST_TABLE}
+        (table_name, source_file, content_hash, row_count, byte_offset,
+         rows_appended, load_mode, load_timestamp)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, (table, plan.source_file, plan.content_hash, plan.prior_rows + rows_read,
+          plan.size, rows_read, plan.action, load_timestamp))
+
+
+def clear_manifest(cursor, table):
+    """Forget everything loaded into a table (used with TRUNCATE)"""
+    cursor.execute(f"DELETE FROM {MANIFEST_TABLE} WHERE table_name = %s;", (table,))
@@ -0,0 +1,227 @@
+"""
+Load Profiles
+Per-column profiles built while the loader streams each file: row and null
+counts, min/max, sum (for the mean), a HyperLogLog distinct count and the most
+frequent values. One row per column, file and load goes to
+insurance_raw.load_profiles, so quality checks and completeness reports read
+a few profile rows instead of rescanning the raw tables.
+
+Profiles of one table merge across files and incremental appends: counts and
+sums add, min/max combine, HyperLogLog registers take the maximum and the
+frequent-value lists add up.
+"""
+
+import numpy as np
+import pandas as pd
+
+from psycopg.types.json import Jsonb
+
+from load_manifest import MANIFEST_TABLE
+
+PROFILE_TABLE = 'insurance_raw.load_profiles'
+
+# HyperLogLog registers are 2 ** precision bytes; 12 gives ~1.6% standard error
+HLL_PRECISION = 12
+
+# Frequent values tracked per column; beyond this the counts become lower bounds
+TOP_CAPACITY = 50
+
+# Frequent values shown per column in reports
+TOP_VALUES = 5
+
+NUMERIC_TYPES = {'INTEGER', 'BIGINT', 'DECIMAL', 'CURRENCY'}
+
+# Profiles describing what each table holds now: for every file still in the
+# manifest, the runs since its last full, new or reload load (appends add up)
+CURRENT_PROFILES_SQL = f"""
+WITH current_loads AS (
+    SELECT table_name, source_file,
+           MAX(load_timestamp) FILTER (WHERE load_mode <> 'append') AS since
+    FROM {MANIFEST_TABLE}
+    WHERE table_name = %s
+    GROUP BY table_name, source_file
+)
+SELECT p.column_name, p.row_count, p.null_count, p.min_value, p.max_value,
+       p.value_sum, p.hll_registers, p.top_values
+FROM {PROFILE_TABLE} p
+JOIN current_loads c USING (table_name, source_file)
+WHERE p.load_timestamp >= c.since
+ORDER BY p.profile_id;
+"""
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch over 64-bit hashes"""
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        if registers is None:
+            self.registers = np.zeros(1 << precision, dtype=np.uint8)
+        else:
+            self.registers = np.frombuffer(registers, dtype=np.uint8).copy()
+
+    def update(self, hashes):
+        """Absorb uint64 hashes, e.g. from pd.util.hash_pandas_object"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        suffix_bits = 64 - self.precision
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << suffix_bits) - 1)
+        # rest < 2 ** 52 converts to float64 exactly, so frexp's exponent is its bit length
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (suffix_bits + 1 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def estimate(self):
+        """Approximate number of distinct values, with small-range correction"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+    def to_bytes(self):
+        return self.registers.tobytes()
+
+
+def _text(value):
+    """A profiled value as stored: numbers as-is, dates as ISO dates, text unchanged"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.date().isoformat()
+    return str(value)
+
+
+def _top(counts, capacity=TOP_CAPACITY):
+    return dict(sorted(counts.items(), key=lambda item: -item[1])[:capacity])
+
+
+class ColumnProfile:
+    """Running profile of one column"""
+
+    def __init__(self, name, sql_type):
+        self.name = name
+        self.numeric = sql_type in NUMERIC_TYPES
+        self.rows = 0
+        self.nulls = 0
+        self.minimum = None
+        self.maximum = None
+        self.total = 0.0 if self.numeric else None
+        self.hll = HyperLogLog()
+        self.top = {}
+
+    def update(self, series):
+        """Fold in one chunk; values are hashed once, by factorize
+
+        Min/max, the HyperLogLog and the frequent values all work on the
+        chunk's distinct values, which are far fewer than its rows for
+        everything but ID-like columns.
+        """
+        self.rows += len(series)
+        codes, distinct = pd.factorize(series)
+        self.nulls += int(np.count_nonzero(codes < 0))
+        if not len(distinct):
+            return
+        distinct = pd.Series(distinct)
+        low, high = distinct.min(), distinct.max()
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+        if self.numeric:
+            self.total += float(series.sum())
+        self.hll.update(pd.util.hash_pandas_object(distinct, index=False).to_numpy())
+        counts = np.bincount(codes[codes >= 0], minlength=len(distinct))
+        frequent = np.argsort(-counts, kind='stable')[:TOP_CAPACITY]
+        merged = self.top.copy()
+        for value, count in zip(distinct.iloc[frequent], counts[frequent]):
+            key = _text(value)
+            merged[key] = merged.get(key, 0) + int(count)
+        self.top = _top(merged)
+
+    def record(self):
+        """Values for one load_profiles row, from column_name to top_values"""
+        return (self.name, self.rows, self.nulls,
+                None if self.minimum is None else _text(self.minimum),
+                None if self.maximum is None else _text(self.maximum),
+                self.total, self.hll.estimate(), self.hll.to_bytes(),
+                Jsonb([[value, count] for value, count in self.top.items()]))
+
+
+class FileProfile:
+    """Profiles of every target column of one file, updated chunk by chunk"""
+
+    def __init__(self, spec):
+        self.columns = [ColumnProfile(col.target, col.sql_type) for col in spec.columns]
+
+    @property
+    def rows(self):
+        return self.columns[0].rows if self.columns else 0
+
+    def update(self, frame):
+        for column in self.columns:
+            column.update(frame[column.name])
+
+    def save(self, cursor, table, plan, load_timestamp):
+        """Insert one load_profiles row per column for this file and run"""
+        cursor.executemany(f"""
+            INSERT INTO {PROFILE_TABLE}
+            (table_name, source_file, load_mode, column_name, row_count, null_count,
+             min_value, max_value, value_sum, distinct_estimate, hll_registers,
+             top_values, load_timestamp)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, [(table, plan.source_file, plan.action) + column.record() + (load_timestamp,)
+              for column in self.columns])
+
+
+def table_profile(cursor, table):
+    """Merged profile of everything a raw table holds now, one row per column
+
+    Reads only load_profiles rows. Columns: column_name, row_count,
+    null_count, null_rate, min_value, max_value, mean_value,
+    distinct_estimate and top_values (most frequent first, as lists).
+    """
+    cursor.execute(CURRENT_PROFILES_SQL, (table,))
+    merged = {}
+    for name, rows, nulls, low, high, total, registers, top in cursor.fetchall():
+        numeric = total is not None
+        if numeric:
+            low, high = (None if v is None else float(v) for v in (low, high))
+        entry = merged.setdefault(name, {'rows': 0, 'nulls': 0, 'min': None, 'max': None,
+                                         'total': 0.0 if numeric else None,
+                                         'hll': HyperLogLog(), 'top': {}})
+        entry['rows'] += rows
+        entry['nulls'] += nulls
+        if low is not None:
+            entry['min'] = low if entry['min'] is None else min(entry['min'], low)
+            entry['max'] = high if entry['max'] is None else max(entry['max'], high)
+        if numeric:
+            entry['total'] += total
+        entry['hll'] = entry['hll'].merge(HyperLogLog(registers=registers))
+        for value, count in top:
+            entry['top'][value] = entry['top'].get(value, 0) + count
+
+    records = []
+    for name, entry in merged.items():
+        present = entry['rows'] - entry['nulls']
+        records.append({
+            'column_name': name,
+            'row_count': entry['rows'],
+            'null_count': entry['nulls'],
+            'null_rate': entry['nulls'] / entry['rows'] if entry['rows'] else None,
+            'min_value': entry['min'],
+            'max_value': entry['max'],
+            'mean_value': entry['total'] / present if entry['total'] is not None and present
+                          else None,
+            'distinct_estimate': entry['hll'].estimate(),
+            'top_values': list(_top(entry['top']).items()),
+        })
+    return pd.DataFrame(records, columns=['column_name', 'row_count', 'null_count', 'null_rate',
+                                          'min_value', 'max_value', 'mean_value',
+                                          'distinct_estimate', 'top_values'])
@@ -0,0 +1,572 @@
+"""
+Loader Engine
+Shared raw-layer loader driven by a SourceSpec (see source_specs.py)
+"""
+
+import csv
+import io
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import psycopg
+
+from psycopg.types.json import Jsonb
+
+from bulk_load import (COPY_BUFFER_ROWS, INSERT_BATCH_ROWS, Throughput, copy_dataframe,
+                       insert_dataframe, peak_rss_mb, write_with_bisection)
+from load_manifest import clear_manifest, full_plan, latest_entries, plan_file, record_load
+from load_profiles import PROFILE_TABLE, FileProfile
+from metrics import PipelineMetrics, Stopwatch
+
+# Parsed chunks allowed to wait for the writer in streaming mode
+QUEUE_DEPTH = 2
+
+
+# ============================================================================
+# SPEC COMPILATION - whole-column conversions, no per-cell Python
+# ============================================================================
+
+def _to_integer(series):
+    numeric = pd.to_numeric(series, errors='coerce')
+    if pd.api.types.is_float_dtype(numeric):
+        numeric = np.trunc(numeric)
+    return numeric.astype('Int64')
+
+
+def _to_decimal(series):
+    return pd.to_numeric(series, errors='coerce').astype('Float64')
+
+
+def _to_text(series):
+    return series.astype('string')
+
+
+def _to_currency(series):
+    """'$67,349' -> 67349.0; anything unparseable becomes NULL"""
+    text = series.astype('string').str.replace(r'[$,\s]', '', regex=True)
+    return pd.to_numeric(text, errors='coerce').astype('Float64')
+
+
+def _to_date(series, date_format):
+    """Parse date strings once per distinct value, then map back onto the column
+
+    Source dates repeat heavily (birth dates, bind dates), so parsing the
+    unique values and broadcasting is much cheaper than parsing every cell.
+    Two-digit years that land in the future belong to the previous century
+    (16MAR39 is 1939, not 2039).
+    """
+    codes, distinct = pd.factorize(series.astype('string'))
+    parsed = pd.to_datetime(pd.Series(distinct, dtype='string'), format=date_format,
+                            errors='coerce').astype('datetime64[ns]')
+    if '%y' in date_format:
+        future = parsed > pd.Timestamp.now()
+        parsed[future] = parsed[future] - pd.DateOffset(years=100)
+    # Missing values have code -1; index them onto a trailing NaT
+    values = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))
+    return pd.Series(values[codes], index=series.index)
+
+
+# Vectorized converter for each supported target SQL type
+CONVERTERS = {
+    'INTEGER': _to_integer,
+    'BIGINT': _to_integer,
+    'DECIMAL': _to_decimal,
+    'CURRENCY': _to_currency,
+    'DATE': _to_date,
+    'VARCHAR': _to_text,
+}
+
+# Types read from the CSV as raw strings and parsed by their converter
+TEXT_INPUT_TYPES = {'VARCHAR', 'CURRENCY', 'DATE'}
+
+
+def _converter(col):
+    """Converter for one ColumnSpec, bound to its date format if it has one"""
+    if col.sql_type == 'DATE':
+        if not col.date_format:
+            raise ValueError(f"{col.source}: DATE columns need a date_format")
+        return partial(_to_date, date_format=col.date_format)
+    return CONVERTERS[col.sql_type]
+
+
+class CompiledSpec:
+    """A SourceSpec turned into read_csv options and column converters"""
+
+    def __init__(self, spec):
+        unknown = {col.sql_type for col in spec.columns} - set(CONVERTERS)
+        if unknown:
+            raise ValueError(f"{spec.name}: unsupported SQL type(s) {sorted(unknown)}")
+
+        self.spec = spec
+        self.converters = [(col.source, col.target, _converter(col))
+                           for col in spec.columns]
+        # Text columns are parsed as strings so e.g. zip-like codes keep their form
+        self.dtype = {col.source: 'string' for col in spec.columns
+                      if col.sql_type in TEXT_INPUT_TYPES}
+        self.na_values = {col.source: list(col.null_values)
+                          for col in spec.columns if col.null_values}
+
+    @property
+    def read_csv_kwargs(self):
+        return {'dtype': self.dtype, 'na_values': self.na_values}
+
+    def convert(self, df):
+        """Return a frame with target column names and types, plus coercion counts
+
+        Values that cannot be converted become NULL; the number of such values
+        per column is returned so the loader can report them.
+        """
+        missing = [source for source, _, _ in self.converters if source not in df.columns]
+        if missing:
+            raise ValueError(f"{self.spec.file_name} is missing columns: {missing}")
+
+        converted = {}
+        coerced = {}
+        for source, target, convert in self.converters:
+            series = df[source]
+            result = convert(series)
+            lost = int((series.notna() & result.isna()).sum())
+            if lost:
+                coerced[target] = lost
+            converted[target] = result
+        return pd.DataFrame(converted, index=df.index), coerced
+
+    def prepare(self, df, load_timestamp, source_file):
+        """Drop ignored columns, convert types and attach load metadata"""
+        df = df.drop(columns=[c for c in self.spec.drop_columns if c in df.columns])
+        frame, coerced = self.convert(df)
+        frame['load_timestamp'] = load_timestamp
+        frame['source_file'] = source_file
+        return frame, coerced
+
+
+def compile_spec(spec):
+    """Compile a SourceSpec into whole-column pandas/NumPy conversions"""
+    return CompiledSpec(spec)
+
+
+# ============================================================================
+# REJECT QUARANTINE
+# ============================================================================
+
+REJECTS_TABLE = 'insurance_raw.load_rejects'
+
+
+def _json_safe(value):
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return value
+
+
+def record_rejects(cursor, table, source_file, rejects, load_timestamp, prior_rows=0):
+    """Write rejected rows and their error text to insurance_raw.load_rejects"""
+    if not rejects:
+        return
+    metadata = {'load_timestamp', 'source_file'}
+    for reject in rejects:
+        reject['source_file'] = source_file
+        reject['source_row'] = prior_rows + int(reject['row']) + 1
+    cursor.executemany(f"""
+        INSERT INTO {REJECTS_TABLE}
+        (table_name, source_file, source_row_number, error_message, row_data, load_timestamp)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, [
+        (table, source_file, reject['source_row'], reject['error'],
+         Jsonb({k: _json_safe(v) for k, v in reject['data'].items() if k not in metadata}),
+         load_timestamp)
+        for reject in rejects
+    ])
+
+
+# ============================================================================
+# STREAMING - bounded producer/consumer queue
+# ============================================================================
+
+class _ProducerFailed:
+    """Carries an exception from the producer thread to the consumer"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+_DONE = object()
+
+
+def prefetch(iterable, depth=QUEUE_DEPTH):
+    """Yield items from iterable while a background thread produces ahead
+
+    At most `depth` produced items wait in the queue, so memory stays bounded
+    while parsing the next chunk overlaps with writing the current one.
+    Exceptions raised by the producer are re-raised in the consumer.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_ProducerFailed(e))
+        else:
+            put(_DONE)
+
+    def consume():
+        try:
+            while True:
+                item = items.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _ProducerFailed):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+            producer.join(timeout=1)
+
+    # Start producing now, not on first iteration, so parsing overlaps setup
+    producer = threading.Thread(target=produce, name='csv-chunk-producer', daemon=True)
+    producer.start()
+    return consume()
+
+
+# ============================================================================
+# LOAD
+# ============================================================================
+
+def _silent(*args, **kwargs):
+    pass
+
+
+def _connect(db_config, pool):
+    """Borrow a pooled connection, or open a dedicated one"""
+    if pool is not None:
+        return pool.connection()
+    return psycopg.connect(**db_config)
+
+
+@dataclass
+class LoadResult:
+    """Outcome of loading one source"""
+    source: str
+    success: bool = False
+    rows_read: int = 0
+    rows_loaded: int = 0
+    table_count: int = 0
+    files_loaded: int = 0
+    files_skipped: int = 0
+    seconds: float = 0.0        # Time spent writing rows
+    total_seconds: float = 0.0  # Read, connect, write and verify
+    errors: list = field(default_factory=list)
+    message: str = ''
+
+
+# How each incremental plan action is reported
+ACTION_TEXT = {
+    'new': 'new file, loading all rows',
+    'append': 'grew since last load, appending new rows',
+    'reload': 'changed since last load, reloading file',
+    'skip': 'unchanged, skipping',
+}
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of an open binary file that ends at a byte offset"""
+
+    def __init__(self, handle, end_offset):
+        self.handle = handle
+        self.remaining = max(end_offset - handle.tell(), 0)
+
+    def readable(self):
+        return True
+
+    def close(self):
+        if not self.closed:
+            self.handle.close()
+        super().close()
+
+    def readinto(self, buffer):
+        view = memoryview(buffer)[:self.remaining]
+        count = self.handle.readinto(view) if len(view) else 0
+        self.remaining -= count
+        return count
+
+
+def _iter_chunks(path, compiled, start_offset=0, chunksize=None, end_offset=None):
+    """Yield DataFrames parsed from path, between two byte offsets
+
+    Reading from an offset reuses the header from the first line. Reading
+    stops at end_offset (the file's end when None), so bytes appended
+    after a load was planned wait for the next run. Yields one frame for
+    the whole range unless chunksize is set.
+    """
+    kwargs = dict(compiled.read_csv_kwargs)
+    if chunksize:
+        kwargs['chunksize'] = chunksize
+
+    if not start_offset:
+        handle = open(path, 'rb')
+    else:
+        with open(path, newline='') as f:
+            kwargs['names'] = next(csv.reader([f.readline()]))
+        kwargs['header'] = None
+        handle = open(path, 'rb')
+        handle.seek(start_offset)
+    if end_offset is not None:
+        handle = io.BufferedReader(_ByteRange(handle, end_offset))
+
+    try:
+        try:
+            parsed = pd.read_csv(handle, **kwargs)
+        except pd.errors.EmptyDataError:
+            return  # Nothing but whitespace after the offset
+        if chunksize:
+            yield from parsed
+        else:
+            yield parsed
+    finally:
+        handle.close()
+
+
+def load_source(spec, db_config=None, method='copy', report=None, chunksize=None,
+                queue_depth=QUEUE_DEPTH, pool=None, verbose=True, incremental=False,
+                metrics=None):
+    """Load one source into its raw table
+
+    method='copy' streams rows with COPY FROM STDIN; method='insert' uses the
+    batched INSERT fallback. With chunksize set, each file is parsed in
+    chunks on a background thread and handed to the writer through a queue
+    of at most queue_depth chunks, so memory stays flat for any file size.
+
+    By default the table is truncated and reloaded. incremental=True instead
+    compares each file with insurance_raw.load_manifest: unchanged files are
+    skipped, files that grew only have their new trailing rows appended, new
+    files are loaded whole and rewritten files replace their earlier rows.
+
+    Rows the database rejects are isolated by bisecting the failed batch and
+    quarantined in insurance_raw.load_rejects; the rest of the batch commits.
+    Each written chunk also updates a per-column profile of its file, saved
+    to insurance_raw.load_profiles with the manifest row (see load_profiles.py).
+
+    report(cursor) runs after verification for source-specific sample
+    output. Connections come from pool when given (see load_all.py),
+    otherwise from psycopg.connect(**db_config). verbose=False silences the
+    step output so several sources can load side by side.
+
+    Each step (csv_read, connect, copy or insert, profile, verify, total) is recorded
+    to metrics, a PipelineMetrics shared by the caller; by default the load
+    gets its own and publishes it as load_<source>.prom. Returns a LoadResult.
+    """
+    say = print if verbose else _silent
+    started = Throughput()
+    label = spec.name.replace('_', ' ').upper()
+    result = LoadResult(source=spec.name)
+    own_metrics = metrics is None
+    metrics = metrics or PipelineMetrics(f"load_{spec.name}")
+    bytes_read = 0
+
+    say("="*80)
+    say(f"LOADING {label} DATA ({spec.file_glob or spec.file_name})")
+    say("="*80)
+
+    try:
+        compiled = compile_spec(spec)
+        load_timestamp = datetime.now()
+
+        # Find CSV files
+        say(f"\n1. Reading CSV file: {spec.csv_file}")
+        paths = spec.files()
+        for path in paths:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+        if len(paths) > 1:
+            say(f"   ✓ Found {len(paths)} files")
+        if chunksize:
+            say(f"   ✓ Streaming {chunksize:,} records per chunk "
+                f"(up to {queue_depth} chunks queued)")
+
+        # Connect to database
+        say("\n2. Connecting to PostgreSQL database...")
+        connect_timer = Throughput()
+        with _connect(db_config, pool) as connection:
+            cursor = connection.cursor()
+            metrics.record('connect', connect_timer.elapsed, source=spec.name)
+            say("   ✓ Connected successfully")
+
+            if incremental:
+                say("\n3. Comparing files with load manifest...")
+                entries = latest_entries(cursor, spec.table)
+                plans = [plan_file(path, entries.get(os.path.basename(path))) for path in paths]
+                connection.commit()
+                for plan in plans:
+                    say(f"   • {plan.source_file}: {ACTION_TEXT[plan.action]}")
+            else:
+                # Clear existing data
+                say("\n3. Clearing existing data from table...")
+                plans = [full_plan(path) for path in paths]
+                cursor.execute(f"TRUNCATE TABLE {spec.table};")
+                clear_manifest(cursor, spec.table)
+                connection.commit()
+                say("   ✓ Table cleared")
+
+            # Raw tables are partitioned by load month (see schema_setup.sql)
+            cursor.execute("SELECT insurance_raw.ensure_load_partition(%s::regclass, %s);",
+                           (spec.table, load_timestamp))
+            connection.commit()
+
+            # Load data
+            timer = Throughput()
+            if method == 'copy':
+                say("\n4. Copying data (COPY FROM STDIN)...")
+                write = lambda part: copy_dataframe(cursor, spec.table, part, show_progress=False)
+                batch_rows, verb = COPY_BUFFER_ROWS, 'Copied'
+            else:
+                say("\n4. Inserting data...")
+                write = lambda part: insert_dataframe(cursor, spec.table, part)
+                batch_rows, verb = INSERT_BATCH_ROWS, 'Inserted'
+
+            total_loaded = 0
+            errors = []
+            coerced = {}
+            # Parsing and writing interleave chunk by chunk, so each is timed separately
+            read_watch = Stopwatch()
+            write_watch = Stopwatch()
+            profile_watch = Stopwatch()
+            for plan in plans:
+                if plan.tail_bytes:
+                    say(f"   ⚠ {plan.source_file}: last {plan.tail_bytes:,} bytes have no "
+                        f"newline yet; left for the next run")
+                if plan.action == 'skip':
+                    result.files_skipped += 1
+                    continue
+
+                bytes_read += plan.size - plan.start_offset
+                frames = read_watch.timed(
+                    compiled.prepare(chunk, load_timestamp, plan.source_file)
+                    for chunk in _iter_chunks(plan.path, compiled, plan.start_offset, chunksize,
+                                              end_offset=plan.size))
+                if chunksize:
+                    frames = prefetch(frames, depth=queue_depth)
+
+                # Rows, rejects and manifest entry commit together, one file at a time
+                file_rows = 0
+                file_rejects = []
+                profile = FileProfile(spec)
+                with connection.transaction():
+                    if plan.action == 'reload':
+                        cursor.execute(f"DELETE FROM {spec.table} WHERE source_file = %s;",
+                                       (plan.source_file,))
+                    for frame, chunk_coerced in frames:
+                        file_rows += len(frame)
+                        for column, count in chunk_coerced.items():
+                            coerced[column] = coerced.get(column, 0) + count
+                        with write_watch:
+                            written, chunk_rejects = write_with_bisection(
+                                connection, write, frame, batch_rows, show_progress=verbose,
+                                progress_offset=total_loaded, verb=verb)
+                        total_loaded += written
+                        file_rejects.extend(chunk_rejects)
+                        # Profile the rows that landed, while the chunk is still in memory
+                        with profile_watch:
+                            if chunk_rejects:
+                                frame = frame.drop(index=[r['row'] for r in chunk_rejects])
+                            profile.update(frame)
+                    record_rejects(cursor, spec.table, plan.source_file, file_rejects,
+                                   load_timestamp, prior_rows=plan.prior_rows)
+                    record_load(cursor, spec.table, plan, file_rows, load_timestamp)
+                    with profile_watch:
+                        profile.save(cursor, spec.table, plan, load_timestamp)
+                errors.extend(file_rejects)
+                result.rows_read += file_rows
+                result.files_loaded += 1
+                say(f"\n   ✓ {plan.source_file}: {file_rows:,} records read ({plan.action})")
+
+            result.rows_loaded = total_loaded
+            result.errors = errors
+            result.seconds = timer.elapsed
+            metrics.record('csv_read', read_watch.seconds, result.rows_read, bytes_read,
+                           source=spec.name)
+            metrics.record(method, write_watch.seconds, total_loaded, bytes_read,
+                           source=spec.name)
+            metrics.record('profile', profile_watch.seconds, total_loaded, source=spec.name)
+            if not result.files_loaded:
+                say("   ✓ Nothing new to load")
+            say(f"   ✓ Successfully loaded {timer.summary(total_loaded)}")
+            if chunksize:
+                say(f"   ✓ Peak RSS: {peak_rss_mb():,.0f} MB")
+            for column, count in coerced.items():
+                say(f"   ⚠ {count:,} values in {column} could not be converted and load as NULL")
+            if result.files_loaded:
+                say(f"   ✓ Column profiles saved to {PROFILE_TABLE} "
+                    f"({profile_watch.seconds:.2f}s)")
+
+            # Report rejects if any
+            if errors:
+                say(f"\n   ⚠ {len(errors):,} records rejected and quarantined in {REJECTS_TABLE}")
+                say("\n   First 5 errors:")
+                for i, error in enumerate(errors[:5], 1):
+                    message = error['error'].splitlines()[0]
+                    say(f"     {i}. {error['source_file']} row {error['source_row']}: {message}")
+
+            # Verify data
+            say("\n5. Verifying data load...")
+            with metrics.stage('verify', source=spec.name) as run:
+                cursor.execute(f"SELECT COUNT(*) FROM {spec.table};")
+                result.table_count = run.rows = cursor.fetchone()[0]
+            say(f"   ✓ Table now contains {result.table_count:,} records")
+
+            if report is not None:
+                report(cursor)
+
+            cursor.close()
+
+        say("\n" + "="*80)
+        say(f"✓ {label} DATA LOAD COMPLETE")
+        say("="*80)
+
+        result.success = True
+
+    except FileNotFoundError as e:
+        result.message = f"File not found: {e.filename or e}"
+        say(f"\n✗ ERROR: {result.message}")
+        say("  Please check the file path.")
+
+    except psycopg.Error as e:
+        result.message = str(e)
+        say(f"\n✗ DATABASE ERROR: {e}")
+
+    except Exception as e:
+        result.message = f"{type(e).__name__}: {e}"
+        say(f"\n✗ UNEXPECTED ERROR: {e}")
+        if verbose:
+            import traceback
+            traceback.print_exc()
+
+    result.total_seconds = started.elapsed
+    metrics.record('total', result.total_seconds, result.rows_loaded, bytes_read,
+                   'ok' if result.success else 'failed', source=spec.name)
+    if own_metrics:
+        metrics.write_textfile()
+    return result
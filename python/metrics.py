@@ -0,0 +1,210 @@
+"""
+Pipeline Metrics
+Structured per-stage telemetry for the loaders and modeling: wall time, rows,
+rows/sec, bytes and peak RSS, appended as JSON lines and published as a
+Prometheus textfile (node_exporter --collector.textfile.directory) so load
+rates can be graphed and alerted on without scraping console output
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+from bulk_load import peak_rss_mb
+
+# Metrics folder; override with INSURANCE_METRICS_DIR
+METRICS_DIR = os.environ.get(
+    'INSURANCE_METRICS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'metrics'))
+
+# Every stage of every run, one JSON object per line
+JSONL_FILE = 'pipeline_metrics.jsonl'
+
+PROMETHEUS_PREFIX = 'insurance_pipeline_stage'
+
+
+@dataclass
+class StageMetric:
+    """One timed stage of a pipeline run"""
+    pipeline: str
+    stage: str
+    seconds: float
+    rows: int = 0
+    bytes: int = 0
+    peak_rss_mb: float = 0.0    # Process peak so far, sampled when the stage ends
+    status: str = 'ok'
+    labels: dict = field(default_factory=dict)
+    run_id: str = ''
+    timestamp: str = ''
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_json(self):
+        record = asdict(self)
+        record['rows_per_sec'] = round(self.rows_per_sec, 1)
+        return json.dumps(record)
+
+
+class Stopwatch:
+    """Accumulates time over separate intervals, e.g. every chunk's parse"""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds += time.perf_counter() - self._start
+
+    def timed(self, iterable):
+        """Yield from iterable, counting only the time spent producing items"""
+        iterator = iter(iterable)
+        while True:
+            with self:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+
+class _StageRun:
+    """Handle yielded by PipelineMetrics.stage; set rows and bytes before it ends"""
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+
+
+class PipelineMetrics:
+    """Collects stage metrics for one run of one pipeline
+
+    Each record() is appended to the JSON lines file straight away, so a
+    crashed run still leaves the stages it finished. write_textfile()
+    publishes the run as <pipeline>.prom. Safe to share across loader threads.
+    """
+
+    def __init__(self, pipeline, metrics_dir=None):
+        self.pipeline = pipeline
+        self.metrics_dir = metrics_dir or METRICS_DIR
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+        self._lock = threading.Lock()
+        self._warned = False
+
+    def _warn(self, error):
+        if not self._warned:
+            self._warned = True
+            print(f"   ⚠ Could not write metrics to {self.metrics_dir}: {error}")
+
+    def record(self, stage, seconds, rows=0, bytes=0, status='ok', **labels):
+        """Record one finished stage; labels (source=..., model=...) tell repeats apart"""
+        metric = StageMetric(
+            pipeline=self.pipeline, stage=stage, seconds=round(seconds, 4), rows=int(rows),
+            bytes=int(bytes), peak_rss_mb=round(peak_rss_mb(), 1), status=status,
+            labels={key: str(value) for key, value in labels.items()},
+            run_id=self.run_id, timestamp=datetime.now().isoformat(timespec='milliseconds'))
+        with self._lock:
+            self.records.append(metric)
+            try:
+                os.makedirs(self.metrics_dir, exist_ok=True)
+                with open(os.path.join(self.metrics_dir, JSONL_FILE), 'a') as f:
+                    f.write(metric.to_json() + '\n')
+            except OSError as e:
+                self._warn(e)
+        return metric
+
+    def stage(self, stage, **labels):
+        """Context manager timing a block as one stage
+
+            with metrics.stage('extract') as run:
+                df = ...
+                run.rows = len(df)
+
+        A block that raises is recorded with status 'failed' and re-raised.
+        """
+        return _TimedStage(self, stage, labels)
+
+    def write_textfile(self):
+        """Write this run's stages as Prometheus gauges to <pipeline>.prom
+
+        The newest record per stage and label set wins. The file is replaced
+        atomically so the collector never reads a partial file.
+        """
+        with self._lock:
+            latest = {}
+            for metric in self.records:
+                latest[(metric.stage, tuple(sorted(metric.labels.items())))] = metric
+            text = _prometheus_text(latest.values())
+            path = os.path.join(self.metrics_dir, f"{self.pipeline}.prom")
+            try:
+                os.makedirs(self.metrics_dir, exist_ok=True)
+                with open(path + '.tmp', 'w') as f:
+                    f.write(text)
+                os.replace(path + '.tmp', path)
+            except OSError as e:
+                self._warn(e)
+                return None
+        return path
+
+
+class _TimedStage:
+    def __init__(self, metrics, stage, labels):
+        self.metrics = metrics
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.run = _StageRun()
+        self.start = time.perf_counter()
+        return self.run
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record(self.stage, time.perf_counter() - self.start, self.run.rows,
+                            self.run.bytes, 'failed' if exc_type else 'ok', **self.labels)
+        return False
+
+
+# (suffix, help text, value) for each published gauge
+_GAUGES = [
+    ('seconds', 'Wall-clock seconds of the stage in its latest run',
+     lambda m: m.seconds),
+    ('rows', 'Rows processed by the stage in its latest run',
+     lambda m: m.rows),
+    ('rows_per_second', 'Stage throughput in its latest run',
+     lambda m: m.rows_per_sec),
+    ('bytes', 'Bytes processed by the stage in its latest run',
+     lambda m: m.bytes),
+    ('peak_rss_bytes', 'Process peak resident set size when the stage finished',
+     lambda m: m.peak_rss_mb * 1024 * 1024),
+    ('success', '1 if the stage succeeded in its latest run, else 0',
+     lambda m: 1 if m.status == 'ok' else 0),
+    ('last_run_timestamp_seconds', 'Unix time the stage last finished',
+     lambda m: datetime.fromisoformat(m.timestamp).timestamp()),
+]
+
+
+def _label_value(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _prometheus_text(metrics):
+    metrics = list(metrics)
+    lines = []
+    for suffix, help_text, value in _GAUGES:
+        name = f"{PROMETHEUS_PREFIX}_{suffix}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for metric in metrics:
+            labels = {'pipeline': metric.pipeline, 'stage': metric.stage, **metric.labels}
+            label_text = ','.join(f'{key}="{_label_value(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {float(value(metric))!r}")
+    return '\n'.join(lines) + '\n'
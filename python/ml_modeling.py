@@ -5,12 +5,13 @@ Author: Data Analyst Candidate
 Date: November 2025
 """
 
+import argparse
+import os
+
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import psycopg
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import (
@@ -24,14 +25,46 @@ import seaborn as sns
 import warnings
 warnings.filterwarnings('ignore')
 
-# Database connection
-DB_CONFIG = {
-    'dbname': 'insurance_analytics',
-    'user': 'addy',
-    'password': 'password123',  # Update with your password
-    'host': 'localhost',
-    'port': '5432'
-}
+import psycopg
+
+from db_config import DB_CONFIG
+from extraction import cached_query
+from feature_store import refresh_features
+from features import CATEGORICAL_FEATURES, FEATURE_TABLE, NUMERICAL_FEATURES, TRAINING_QUERY
+from incremental_training import TRAIN_CHUNK_ROWS, TRAIN_EPOCHS, train_streaming
+from metrics import PipelineMetrics
+from model_artifacts import SeverityModel, save_artifact
+from model_search import SEARCH_FOLDS, SEARCH_ITERATIONS, plain_params, search_models
+from preprocessing import ClaimPreprocessor
+
+parser = argparse.ArgumentParser(description="Train and select the claim severity model")
+parser.add_argument('--search', choices=['grid', 'random'], default=None,
+                    help="Tune every candidate with k-fold CV instead of fitting fixed settings once")
+parser.add_argument('--folds', type=int, default=SEARCH_FOLDS,
+                    help="Cross-validation folds for --search")
+parser.add_argument('--n-iter', type=int, default=SEARCH_ITERATIONS,
+                    help="Settings sampled per candidate with --search random")
+parser.add_argument('--n-jobs', type=int, default=-1,
+                    help="Worker processes for --search (default: all cores)")
+parser.add_argument('--engine', choices=['postgres', 'duckdb'],
+                    default=os.environ.get('INSURANCE_ENGINE', 'postgres'),
+                    help="Read fct_claims from PostgreSQL or a duckdb_engine.py build")
+parser.add_argument('--duckdb-path', default=None,
+                    help="DuckDB file for --engine duckdb (default: INSURANCE_DUCKDB_PATH)")
+parser.add_argument('--stream', action='store_true',
+                    help="Train out of core: stream claim_features in chunks into an SGD model")
+parser.add_argument('--chunksize', type=int, default=TRAIN_CHUNK_ROWS,
+                    help="Feature rows per chunk with --stream")
+parser.add_argument('--epochs', type=int, default=TRAIN_EPOCHS,
+                    help="Passes over the training rows with --stream")
+args = parser.parse_args()
+if args.stream and args.engine == 'duckdb':
+    parser.error("--stream reads the PostgreSQL feature store; use --engine postgres")
+if args.stream and args.search:
+    parser.error("--stream fits one SGD model; it cannot be combined with --search")
+
+# Stage timings, rows and memory for this run (see metrics.py)
+metrics = PipelineMetrics('ml_modeling')
 
 print("="*80)
 print("GUIDEWIRE INSURANCE ANALYTICS - ML MODELING")
@@ -39,130 +72,102 @@ print("="*80)
 print()
 
 # ============================================================================
-# 1. DATA EXTRACTION
+# 1. FEATURE STORE REFRESH
 # ============================================================================
 
-print("1. Extracting data from PostgreSQL...")
-
-query = """
-SELECT 
-    -- Target variable
-    CASE 
-        WHEN total_claim_amount >= 50000 THEN 'Severe'
-        WHEN total_claim_amount >= 10000 THEN 'Significant'
-        WHEN total_claim_amount >= 1000 THEN 'Moderate'
-        ELSE 'Minor'
-    END as claim_severity,
-    
-    -- Demographics
-    age,
-    CASE WHEN gender = 'M' THEN 1 ELSE 0 END as is_male,
-    CASE WHEN marital_status = 'Married' THEN 1 ELSE 0 END as is_married,
-    education_level,
-    occupation,
-    
-    -- Vehicle
-    vehicle_age,
-    vehicle_year,
-    vehicle_make,
-    vehicle_type,
-    CASE WHEN is_red_car = TRUE THEN 1 ELSE 0 END as is_red_car,
-    
-    -- Policy
-    policy_annual_premium,
-    policy_deductible,
-    coverage_limit_bi,
-    months_as_customer,
-    
-    -- Incident details
-    EXTRACT(MONTH FROM incident_date) as incident_month,
-    EXTRACT(DOW FROM incident_date) as incident_day_of_week,
-    incident_hour,
-    CASE WHEN incident_is_weekend THEN 1 ELSE 0 END as is_weekend,
-    incident_type,
-    collision_type,
-    incident_severity,
-    vehicles_involved,
-    bodily_injuries_count,
-    witnesses_count,
-    CASE WHEN police_report_available = TRUE THEN 1 ELSE 0 END as has_police_report,
-    CASE WHEN property_damage = TRUE THEN 1 ELSE 0 END as has_property_damage,
-    
-    -- Prior history
-    COALESCE(prior_claim_count, 0) as prior_claim_count,
-    COALESCE(prior_claim_total_amount, 0) as prior_claim_total,
-    COALESCE(mvr_points, 0) as mvr_points,
-    CASE WHEN license_revoked = TRUE THEN 1 ELSE 0 END as license_revoked,
-    
-    -- Financial
-    income_annual,
-    home_value,
-    
-    -- Fraud indicator
-    CASE WHEN fraud_reported = TRUE THEN 1 ELSE 0 END as is_fraud,
-    
-    -- Actual amount (for analysis)
-    total_claim_amount
-    
-FROM insurance_staging_analytics.fct_claims
-WHERE total_claim_amount > 0
-    AND age IS NOT NULL
-    AND total_claim_amount < 1000000  -- Remove extreme outliers
-"""
+print("1. Refreshing feature store...")
 
-try:
-    conn = psycopg.connect(**DB_CONFIG)
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    print(f"   ✓ Loaded {len(df):,} records")
-    print(f"   ✓ {len(df.columns)} features")
-except Exception as e:
-    print(f"   ✗ Error: {e}")
-    exit(1)
+# Age groups, vehicle age, time of day, tenure, premium ratio and risk score are
+# engineered once per claim into claim_features (see feature_store.py); this
+# only processes claims loaded since the last refresh
+if args.engine == 'duckdb':
+    print("   • Embedded engine: features are engineered in-process at extraction")
+else:
+    try:
+        refresh_features(metrics=metrics)
+    except psycopg.Error as e:
+        print(f"   ⚠ Could not refresh feature store: {e}")
 
 print()
 
 # ============================================================================
-# 2. FEATURE ENGINEERING
+# STREAMING MODE - out-of-core training, same artifact format
 # ============================================================================
 
-print("2. Engineering features...")
-
-# Age groups
-df['age_group'] = pd.cut(df['age'], 
-                         bins=[0, 25, 35, 45, 55, 65, 100],
-                         labels=['18-24', '25-34', '35-44', '45-54', '55-64', '65+'])
-
-# Vehicle age categories
-df['vehicle_age_cat'] = pd.cut(df['vehicle_age'].fillna(0), 
-                               bins=[-1, 3, 6, 11, 100],
-                               labels=['New', 'Recent', 'Older', 'Very Old'])
-
-# Time of day
-df['time_of_day'] = pd.cut(df['incident_hour'].fillna(12), 
-                           bins=[0, 6, 12, 18, 24],
-                           labels=['Night', 'Morning', 'Afternoon', 'Evening'])
-
-# Premium to coverage ratio
-df['premium_to_coverage_ratio'] = df['policy_annual_premium'] / (df['coverage_limit_bi'].fillna(100000) + 1)
-
-# Customer tenure category
-df['tenure_category'] = pd.cut(df['months_as_customer'].fillna(0),
-                              bins=[-1, 6, 12, 24, 1000],
-                              labels=['New', 'Short', 'Medium', 'Long'])
-
-# Risk score (composite)
-df['risk_score'] = (
-    (df['prior_claim_count'] * 2) +
-    (df['mvr_points']) +
-    (df['license_revoked'] * 5) +
-    (df['bodily_injuries_count'].fillna(0) * 3)
-)
+if args.stream:
+    print(f"2. Streaming {FEATURE_TABLE} ({args.chunksize:,} rows per chunk, "
+          f"{args.epochs} epochs)...")
+    try:
+        streamed = train_streaming(chunk_rows=args.chunksize, epochs=args.epochs,
+                                   metrics=metrics)
+    except (psycopg.Error, ValueError) as e:
+        print(f"   ✗ Error: {e}")
+        metrics.write_textfile()
+        exit(1)
+    print()
+
+    print("="*80)
+    print("MODEL PERFORMANCE SUMMARY")
+    print("="*80)
+    print()
+    print("Model: SGD Logistic Regression (streamed)")
+    print(f"AUC-ROC: {streamed['auc']:.4f}")
+    print()
+    print("Classification Report:")
+    print(classification_report(streamed['y_test'], streamed['predictions'],
+                                labels=[0, 1], target_names=['Not Severe', 'Severe']))
+    print("Confusion Matrix:")
+    print(confusion_matrix(streamed['y_test'], streamed['predictions'], labels=[0, 1]))
+    print()
+
+    print("Saving model artifact...")
+    artifact = SeverityModel(model=streamed['model'], preprocessor=streamed['preprocessor'])
+    model_version = save_artifact(artifact, {
+        'model_name': 'SGD Logistic Regression',
+        'auc': streamed['auc'],
+        'training_rows': streamed['training_rows'],
+        'test_rows': streamed['test_rows'],
+        'features': artifact.feature_columns,
+        'training_mode': 'stream',
+        'params': {'epochs': args.epochs, 'chunk_rows': args.chunksize},
+    })
+    print(f"   ✓ Saved SGD Logistic Regression as model version {model_version}")
+    metrics_path = metrics.write_textfile()
+    if metrics_path:
+        print(f"   ✓ Stage metrics published to {metrics_path}")
+    print()
+    print("="*80)
+    print("✓ MODELING COMPLETE")
+    print("="*80)
+    exit(0)
+
+# ============================================================================
+# 2. DATA EXTRACTION
+# ============================================================================
+
+print(f"2. Extracting features from {'DuckDB' if args.engine == 'duckdb' else 'PostgreSQL'}...")
 
-# Weekend incident flag
-df['is_weekend'] = df['is_weekend'].fillna(0)
+query = TRAINING_QUERY
+
+try:
+    with metrics.stage('extract', engine=args.engine) as run:
+        if args.engine == 'duckdb':
+            # fct_claims is read from the embedded build as Arrow (see duckdb_engine.py)
+            from duckdb_engine import DUCKDB_PATH, training_data
+            df = training_data(args.duckdb_path or DUCKDB_PATH)
+        else:
+            # Served from the local Parquet cache until claim_features changes; compact
+            # mode streams through a server-side cursor into category/downcast dtypes
+            df = cached_query(query, DB_CONFIG, version_table=FEATURE_TABLE, compact=True)
+        run.rows = len(df)
+        run.bytes = df.memory_usage(deep=True).sum()
+    print(f"   ✓ Loaded {len(df):,} records")
+    print(f"   ✓ {len(df.columns)} features")
+except Exception as e:
+    print(f"   ✗ Error: {e}")
+    metrics.write_textfile()
+    exit(1)
 
-print(f"   ✓ Created {len(df.columns)} total features")
 print()
 
 # ============================================================================
@@ -172,33 +177,11 @@ print()
 print("3. Preparing data for modeling...")
 
 # Select features for modeling
-categorical_features = [
-    'age_group', 'vehicle_age_cat', 'time_of_day', 
-    'tenure_category', 'incident_type', 'collision_type'
-]
-
-numerical_features = [
-    'age', 'is_male', 'is_married', 'vehicle_age', 'vehicle_year',
-    'policy_annual_premium', 'policy_deductible', 'months_as_customer',
-    'incident_month', 'incident_day_of_week', 'incident_hour',
-    'is_weekend', 'vehicles_involved', 'bodily_injuries_count',
-    'witnesses_count', 'has_police_report', 'has_property_damage',
-    'prior_claim_count', 'mvr_points', 'license_revoked',
-    'premium_to_coverage_ratio', 'risk_score', 'is_red_car'
-]
-
-# Create feature matrix
-X = df[numerical_features + categorical_features].copy()
-
-# Encode categorical variables
-label_encoders = {}
-for col in categorical_features:
-    le = LabelEncoder()
-    X[col] = le.fit_transform(X[col].astype(str))
-    label_encoders[col] = le
-
-# Fill missing values
-X = X.fillna(X.median())
+categorical_features = CATEGORICAL_FEATURES
+numerical_features = NUMERICAL_FEATURES
+
+# Feature rows as stored; encoding and imputation happen after the split
+X = df[numerical_features + categorical_features]
 
 # Target variable (Binary: Severe vs Not Severe)
 y = (df['claim_severity'] == 'Severe').astype(int)
@@ -216,12 +199,18 @@ X_train, X_test, y_train, y_test = train_test_split(
 
 print(f"   ✓ Training set: {len(X_train):,} records")
 print(f"   ✓ Test set: {len(X_test):,} records")
-print()
 
-# Scale features
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
+# Encode, impute and scale in one pass, learned from the training rows only;
+# the same fitted object is saved with the model for batch and online scoring
+preprocessor = ClaimPreprocessor(numerical_features, categorical_features)
+with metrics.stage('preprocess') as run:
+    X_train_prepared = preprocessor.fit_transform(X_train)
+    X_test_prepared = preprocessor.transform(X_test)
+    run.rows = len(X_train) + len(X_test)
+    run.bytes = X_train_prepared.nbytes + X_test_prepared.nbytes
+
+print(f"   ✓ Preprocessing fit on training set only")
+print()
 
 # ============================================================================
 # 4. MODEL TRAINING
@@ -247,31 +236,51 @@ models = {
 
 results = {}
 
-for name, model in models.items():
-    print(f"Training {name}...")
-    
-    # Train
-    if name == 'Logistic Regression':
-        model.fit(X_train_scaled, y_train)
-        y_pred = model.predict(X_test_scaled)
-        y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
-    else:
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
-        y_pred_proba = model.predict_proba(X_test)[:, 1]
+if args.search:
+    # Cross-validated search on the training set only; the test set stays
+    # untouched until the refitted winners are scored below
+    searches = search_models(X_train_prepared, y_train, args.search, args.folds, args.n_iter,
+                             args.n_jobs, metrics=metrics)
+    for name, search in searches.items():
+        model = search.best_estimator_
+        with metrics.stage('evaluate', model=name) as run:
+            y_pred_proba = model.predict_proba(X_test_prepared)[:, 1]
+            results[name] = {
+                'model': model,
+                'predictions': model.predict(X_test_prepared),
+                'probabilities': y_pred_proba,
+                'auc': roc_auc_score(y_test, y_pred_proba),
+                'cv_auc': search.best_score_,
+                'params': plain_params(search.best_params_),
+            }
+            run.rows, run.bytes = len(X_test), X_test_prepared.nbytes
+        print(f"   ✓ {name} holdout AUC-ROC: {results[name]['auc']:.4f}")
+    print()
+else:
+    for name, model in models.items():
+        print(f"Training {name}...")
     
-    # Evaluate
-    auc = roc_auc_score(y_test, y_pred_proba)
+        # Train
+        with metrics.stage('fit', model=name) as run:
+            model.fit(X_train_prepared, y_train)
+            run.rows, run.bytes = len(X_train), X_train_prepared.nbytes
+
+        # Evaluate
+        with metrics.stage('evaluate', model=name) as run:
+            y_pred = model.predict(X_test_prepared)
+            y_pred_proba = model.predict_proba(X_test_prepared)[:, 1]
+            auc = roc_auc_score(y_test, y_pred_proba)
+            run.rows, run.bytes = len(X_test), X_test_prepared.nbytes
     
-    results[name] = {
-        'model': model,
-        'predictions': y_pred,
-        'probabilities': y_pred_proba,
-        'auc': auc
-    }
+        results[name] = {
+            'model': model,
+            'predictions': y_pred,
+            'probabilities': y_pred_proba,
+            'auc': auc,
+        }
     
-    print(f"   ✓ AUC-ROC: {auc:.4f}")
-    print()
+        print(f"   ✓ AUC-ROC: {auc:.4f}")
+        print()
 
 # ============================================================================
 # 5. MODEL EVALUATION
@@ -282,10 +291,14 @@ print("MODEL PERFORMANCE SUMMARY")
 print("="*80)
 print()
 
-best_model_name = max(results.keys(), key=lambda x: results[x]['auc'])
+# A search selects on cross-validated AUC so the holdout stays an honest estimate
+selection_metric = 'cv_auc' if args.search else 'auc'
+best_model_name = max(results.keys(), key=lambda x: results[x][selection_metric])
 best_model = results[best_model_name]
 
 print(f"Best Model: {best_model_name}")
+if args.search:
+    print(f"CV AUC-ROC: {best_model['cv_auc']:.4f}")
 print(f"AUC-ROC: {best_model['auc']:.4f}")
 print()
 
@@ -305,14 +318,14 @@ print()
 # 6. FEATURE IMPORTANCE (for tree-based models)
 # ============================================================================
 
-if best_model_name in ['Random Forest', 'Gradient Boosting']:
+if hasattr(best_model['model'], 'feature_importances_'):
     print("="*80)
     print("TOP 15 MOST IMPORTANT FEATURES")
     print("="*80)
     print()
     
     feature_importance = pd.DataFrame({
-        'feature': X.columns,
+        'feature': preprocessor.feature_columns,
         'importance': best_model['model'].feature_importances_
     }).sort_values('importance', ascending=False)
     
@@ -358,18 +371,37 @@ print("="*80)
 print()
 
 print("Next Steps for Production:")
-print("  1. Save model artifacts (pickle/joblib)")
-print("  2. Create prediction API endpoint")
+print("  1. Schedule nightly batch scoring (python/batch_score.py)")
+print("  2. Serve online scores at FNOL (python/scoring_service.py)")
 print("  3. Set up monitoring for model drift")
 print("  4. A/B test model predictions")
 print("  5. Document model assumptions and limitations")
 print()
 
 # ============================================================================
-# 8. SAVE PREDICTIONS FOR FURTHER ANALYSIS
+# 8. SAVE MODEL ARTIFACT AND HOLDOUT PREDICTIONS
 # ============================================================================
 
-print("Saving predictions to database...")
+print("Saving model artifact...")
+
+# Everything batch_score.py needs to reproduce this model's input
+artifact = SeverityModel(
+    model=best_model['model'],
+    preprocessor=preprocessor,
+)
+model_version = save_artifact(artifact, {
+    'model_name': best_model_name,
+    'auc': best_model['auc'],
+    'training_rows': len(X_train),
+    'test_rows': len(X_test),
+    'features': artifact.feature_columns,
+    **{key: best_model[key] for key in ('cv_auc', 'params') if key in best_model},
+})
+print(f"   ✓ Saved {best_model_name} as model version {model_version}")
+metrics_path = metrics.write_textfile()
+if metrics_path:
+    print(f"   ✓ Stage metrics published to {metrics_path}")
+print()
 
 # Create predictions dataframe
 predictions_df = pd.DataFrame({
@@ -377,6 +409,7 @@ predictions_df = pd.DataFrame({
     'predicted_severity': best_model['predictions'],
     'prediction_probability': best_model['probabilities'],
     'model_name': best_model_name,
+    'model_version': model_version,
     'prediction_date': datetime.now()
 })
 
@@ -384,7 +417,7 @@ predictions_df = pd.DataFrame({
 test_indices = X_test.index
 predictions_df['claim_amount'] = df.loc[test_indices, 'total_claim_amount'].values
 
-print(f"   ✓ Created {len(predictions_df):,} predictions")
+print(f"   ✓ Created {len(predictions_df):,} holdout predictions")
 print()
 
 print("="*80)
@@ -0,0 +1,94 @@
+"""
+Model Artifacts
+Versioned on-disk store for the fitted claim severity model and its preprocessing,
+so scoring never depends on retraining
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+
+import joblib
+
+from preprocessing import ClaimPreprocessor
+
+# Artifact folder; override with INSURANCE_MODEL_DIR
+MODEL_DIR = os.environ.get(
+    'INSURANCE_MODEL_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models'))
+
+MODEL_NAME = 'claim_severity'
+
+# Probability at or above which a claim is flagged severe
+SEVERE_THRESHOLD = 0.5
+
+
+@dataclass
+class SeverityModel:
+    """A fitted estimator plus the fitted preprocessing that turns feature rows into its input"""
+    model: object
+    preprocessor: ClaimPreprocessor
+
+    @property
+    def feature_columns(self):
+        return self.preprocessor.feature_columns
+
+    def transform(self, df):
+        """Engineered feature frame -> model input (see ClaimPreprocessor)"""
+        return self.preprocessor.transform(df)
+
+    def predict_proba(self, df):
+        """Probability that each claim is severe"""
+        return self.model.predict_proba(self.transform(df))[:, 1]
+
+
+def _model_path(model_dir, name):
+    return os.path.join(model_dir or MODEL_DIR, name)
+
+
+def save_artifact(artifact, metadata, model_dir=None, name=MODEL_NAME):
+    """Write a new artifact version and point LATEST at it; returns the version"""
+    base = _model_path(model_dir, name)
+    stamp = datetime.now().strftime('v%Y%m%d_%H%M%S')
+    version, suffix = stamp, 1
+    while os.path.exists(os.path.join(base, version)):
+        suffix += 1
+        version = f"{stamp}-{suffix}"
+
+    path = os.path.join(base, version)
+    os.makedirs(path)
+    joblib.dump(artifact, os.path.join(path, 'model.joblib'))
+    metadata = {**metadata, 'name': name, 'version': version,
+                'created_at': datetime.now().isoformat(timespec='seconds')}
+    with open(os.path.join(path, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2, default=str)
+
+    # Swap the pointer atomically so readers never see a half-written version
+    latest = os.path.join(base, 'LATEST')
+    with open(latest + '.tmp', 'w') as f:
+        f.write(version + '\n')
+    os.replace(latest + '.tmp', latest)
+    return version
+
+
+def latest_version(model_dir=None, name=MODEL_NAME):
+    latest = os.path.join(_model_path(model_dir, name), 'LATEST')
+    if not os.path.exists(latest):
+        raise FileNotFoundError(f"No saved {name} model in {_model_path(model_dir, name)}; "
+                                f"run ml_modeling.py first")
+    with open(latest) as f:
+        return f.read().strip()
+
+
+def load_artifact(version=None, model_dir=None, name=MODEL_NAME):
+    """Load (artifact, metadata) for a version, or the latest one"""
+    version = version or latest_version(model_dir, name)
+    path = os.path.join(_model_path(model_dir, name), version)
+    artifact = joblib.load(os.path.join(path, 'model.joblib'))
+    if not hasattr(artifact, 'preprocessor'):
+        raise ValueError(f"Model {version} predates the fitted ClaimPreprocessor; "
+                         f"retrain with ml_modeling.py")
+    with open(os.path.join(path, 'metadata.json')) as f:
+        metadata = json.load(f)
+    return artifact, metadata
@@ -0,0 +1,118 @@
+"""
+Model Search
+Cross-validated hyperparameter search for the claim severity candidates, fanned
+out over a process pool so every core fits folds at once
+"""
+
+import time
+
+from scipy.stats import loguniform, randint, uniform
+from sklearn.ensemble import (GradientBoostingClassifier, HistGradientBoostingClassifier,
+                              RandomForestClassifier)
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, StratifiedKFold
+
+SEARCH_FOLDS = 5
+
+# Sampled settings per candidate in random search
+SEARCH_ITERATIONS = 20
+
+# Boosting rounds stop once this many show no gain on a held-out 10% of the fold
+EARLY_STOPPING_ROUNDS = 10
+
+
+def _candidates(random_state):
+    """name -> (estimator, grid, random-search distributions)
+
+    Estimators run single-threaded; the search parallelises across folds and
+    settings instead, which keeps every core busy without oversubscribing.
+    Inputs arrive already standardised by ClaimPreprocessor.
+    """
+    return {
+        'Logistic Regression': (
+            LogisticRegression(random_state=random_state, max_iter=1000),
+            {'C': [0.01, 0.1, 1, 10]},
+            {'C': loguniform(1e-3, 1e2)},
+        ),
+        'Random Forest': (
+            RandomForestClassifier(n_estimators=300, random_state=random_state, n_jobs=1),
+            {'max_depth': [8, 12, None], 'min_samples_leaf': [1, 5]},
+            {'max_depth': [6, 8, 10, 12, 16, None], 'min_samples_leaf': randint(1, 20),
+             'max_features': ['sqrt', 0.5]},
+        ),
+        'Gradient Boosting': (
+            GradientBoostingClassifier(n_estimators=500, validation_fraction=0.1,
+                                       n_iter_no_change=EARLY_STOPPING_ROUNDS,
+                                       random_state=random_state),
+            {'learning_rate': [0.05, 0.1], 'max_depth': [3, 5], 'subsample': [0.8, 1.0]},
+            {'learning_rate': loguniform(0.01, 0.3), 'max_depth': randint(2, 7),
+             'subsample': uniform(0.6, 0.4)},
+        ),
+        # Bins features into histograms: far faster than Gradient Boosting on large marts
+        'Hist Gradient Boosting': (
+            HistGradientBoostingClassifier(max_iter=500, early_stopping=True, validation_fraction=0.1,
+                                           n_iter_no_change=EARLY_STOPPING_ROUNDS,
+                                           random_state=random_state),
+            {'learning_rate': [0.05, 0.1], 'max_leaf_nodes': [15, 31, 63],
+             'l2_regularization': [0.0, 1.0]},
+            {'learning_rate': loguniform(0.01, 0.3), 'max_leaf_nodes': randint(8, 128),
+             'min_samples_leaf': randint(10, 100), 'l2_regularization': loguniform(1e-3, 10)},
+        ),
+    }
+
+
+def plain_params(params):
+    """best_params_ with numpy scalars as plain Python values, ready for JSON"""
+    return {key: value.item() if hasattr(value, 'item') else value for key, value in params.items()}
+
+
+def _describe(params):
+    return ', '.join(f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}"
+                     for key, value in plain_params(params).items())
+
+
+def boosting_rounds(model):
+    """Rounds an early-stopped booster actually used, else None"""
+    if isinstance(model, GradientBoostingClassifier):
+        return int(model.n_estimators_)
+    if isinstance(model, HistGradientBoostingClassifier):
+        return int(model.n_iter_)
+    return None
+
+
+def search_models(X, y, method='grid', folds=SEARCH_FOLDS, n_iter=SEARCH_ITERATIONS,
+                  n_jobs=-1, random_state=42, metrics=None):
+    """Run a k-fold CV search per candidate; returns name -> fitted search
+
+    method is 'grid' (every combination) or 'random' (n_iter samples). Each
+    search scores ROC AUC, spreads fold fits over n_jobs worker processes and
+    refits its best setting on all of X. With metrics (a PipelineMetrics),
+    each candidate's whole search is recorded as its fit stage.
+    """
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=random_state)
+    searches = {}
+    for name, (estimator, grid, distributions) in _candidates(random_state).items():
+        print(f"Searching {name}...")
+        start = time.perf_counter()
+        if method == 'random':
+            search = RandomizedSearchCV(estimator, distributions, n_iter=n_iter, scoring='roc_auc',
+                                        cv=cv, n_jobs=n_jobs, random_state=random_state)
+        else:
+            search = GridSearchCV(estimator, grid, scoring='roc_auc', cv=cv, n_jobs=n_jobs)
+        search.fit(X, y)
+        searches[name] = search
+        seconds = time.perf_counter() - start
+        if metrics is not None:
+            metrics.record('fit', seconds, len(X), X.nbytes, model=name)
+
+        best = search.best_index_
+        fits = len(search.cv_results_['params']) * folds
+        print(f"   ✓ CV AUC-ROC: {search.best_score_:.4f} "
+              f"(± {search.cv_results_['std_test_score'][best]:.4f}), "
+              f"{fits} fits in {seconds:.1f}s")
+        print(f"   ✓ Best: {_describe(search.best_params_)}")
+        rounds = boosting_rounds(search.best_estimator_)
+        if rounds is not None:
+            print(f"   ✓ Early stopping kept {rounds} boosting rounds")
+        print()
+    return searches
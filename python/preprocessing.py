@@ -0,0 +1,182 @@
+"""
+Claim Preprocessing
+One fitted transform from feature rows to model input: categorical encoding,
+imputation and standardisation in a single vectorized pass, learned from the
+training split only and pickled with the model artifact. partial_fit learns
+the same statistics chunk by chunk for training sets larger than memory.
+"""
+
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import TDigest
+
+
+class ClaimPreprocessor:
+    """Feature frame -> float64 matrix, fitted once and reused for every scoring path
+
+    Categoricals become integer codes over the categories seen in training;
+    missing and unseen categories are imputed with the most frequent code.
+    Numerical NULLs are imputed with the training median. With scale=True
+    every column is then standardised with the training mean and std.
+
+    fit_transform learns from one frame; partial_fit instead accumulates over
+    chunks and is usable after every call. Its categories, modes, means and
+    stds are exact; its medians come from a t-digest per column.
+    """
+
+    def __init__(self, numerical_features, categorical_features, scale=True):
+        self.numerical_features = list(numerical_features)
+        self.categorical_features = list(categorical_features)
+        self.scale = scale
+
+    @property
+    def feature_columns(self):
+        return self.numerical_features + self.categorical_features
+
+    def _codes(self, series, col):
+        """Integer codes over the training categories, -1 for missing or unseen"""
+        lookup = self.categories_[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Match the few distinct categories, then index by the existing codes,
+            # instead of materialising a string per row
+            table = lookup.get_indexer(series.cat.categories.astype(str))
+            codes = series.cat.codes.to_numpy()
+            return np.where(codes >= 0, table[codes], -1)
+        return lookup.get_indexer(series.astype(str))
+
+    def _encode(self, df):
+        """Raw matrix: numerics as float64, categoricals as codes, missing as NaN"""
+        X = np.empty((len(df), len(self.feature_columns)))
+        n_numeric = len(self.numerical_features)
+        if n_numeric:
+            X[:, :n_numeric] = df[self.numerical_features].to_numpy(dtype='float64', na_value=np.nan)
+        for i, col in enumerate(self.categorical_features, start=n_numeric):
+            codes = self._codes(df[col], col)
+            X[:, i] = np.where(codes >= 0, codes, np.nan)
+        return X
+
+    def _impute(self, X):
+        rows, cols = np.nonzero(np.isnan(X))
+        X[rows, cols] = self.fill_values_[cols]
+        return X
+
+    def _standardise(self, X):
+        if self.scale:
+            X -= self.mean_
+            X /= self.scale_
+        return X
+
+    def fit_transform(self, df):
+        """Learn categories, fill values and scaling from training rows; returns them prepared"""
+        self._stream = None
+        self.categories_ = {}
+        for col in self.categorical_features:
+            values = pd.Series(df[col].dropna().unique()).astype(str)
+            self.categories_[col] = pd.Index(np.sort(values.unique()), dtype=object)
+
+        X = self._encode(df)
+        n_numeric = len(self.numerical_features)
+        self.fill_values_ = np.zeros(X.shape[1])
+        if n_numeric and len(X):
+            with np.errstate(all='ignore'):
+                medians = np.nanmedian(X[:, :n_numeric], axis=0)
+            self.fill_values_[:n_numeric] = np.nan_to_num(medians)
+        for i in range(n_numeric, X.shape[1]):
+            present = X[:, i][~np.isnan(X[:, i])]
+            if present.size:
+                self.fill_values_[i] = np.bincount(present.astype(np.int64)).argmax()
+        X = self._impute(X)
+
+        self.mean_ = X.mean(axis=0) if self.scale else np.zeros(X.shape[1])
+        std = X.std(axis=0) if self.scale else np.ones(X.shape[1])
+        self.scale_ = np.where(std > 0, std, 1.0)
+        return self._standardise(X)
+
+    def fit(self, df):
+        self.fit_transform(df)
+        return self
+
+    def transform(self, df):
+        return self._standardise(self._impute(self._encode(df)))
+
+    def partial_fit(self, df):
+        """Fold one chunk of training rows into the fitted statistics
+
+        Keeps category counts, a t-digest of each numerical column and the
+        count, mean and sum of squared deviations of its present values
+        (merged per chunk as in Chan et al.), then refits categories_,
+        fill_values_, mean_ and scale_ from them. The mean and std include
+        the imputed values, as fit_transform's do.
+        """
+        n_numeric = len(self.numerical_features)
+        if getattr(self, '_stream', None) is None:
+            self._stream = {
+                'rows': 0,
+                'counts': {col: {} for col in self.categorical_features},
+                'digests': [TDigest() for _ in range(n_numeric)],
+                'present': np.zeros(n_numeric),
+                'mean': np.zeros(n_numeric),
+                'm2': np.zeros(n_numeric),
+            }
+        stream = self._stream
+        stream['rows'] += len(df)
+
+        for col in self.categorical_features:
+            counts = stream['counts'][col]
+            for value, count in df[col].dropna().astype(str).value_counts().items():
+                if count:
+                    counts[value] = counts.get(value, 0) + int(count)
+
+        if n_numeric and len(df):
+            X = df[self.numerical_features].to_numpy(dtype='float64', na_value=np.nan)
+            for digest, column in zip(stream['digests'], X.T):
+                digest.update(column)
+            present = (~np.isnan(X)).sum(axis=0)
+            with np.errstate(all='ignore'):
+                mean = np.where(present > 0, np.nansum(X, axis=0) / present, 0.0)
+                m2 = np.nansum((X - mean) ** 2, axis=0)
+                total = stream['present'] + present
+                delta = mean - stream['mean']
+                weight = np.where(total > 0, present / total, 0.0)
+                stream['m2'] += m2 + delta ** 2 * stream['present'] * weight
+                stream['mean'] += delta * weight
+            stream['present'] = total
+
+        self._finish_partial()
+        return self
+
+    def _finish_partial(self):
+        """Fitted attributes from the accumulated statistics"""
+        stream = self._stream
+        rows = max(stream['rows'], 1)
+        n_numeric = len(self.numerical_features)
+        fill = np.zeros(len(self.feature_columns))
+        mean = np.zeros(len(fill))
+        variance = np.zeros(len(fill))
+
+        for i, digest in enumerate(stream['digests']):
+            fill[i] = np.nan_to_num(digest.quantile(0.5))
+            present, missing = stream['present'][i], stream['rows'] - stream['present'][i]
+            mean[i] = (present * stream['mean'][i] + missing * fill[i]) / rows
+            variance[i] = (stream['m2'][i] + present * (stream['mean'][i] - mean[i]) ** 2
+                           + missing * (fill[i] - mean[i]) ** 2) / rows
+
+        self.categories_ = {}
+        for i, col in enumerate(self.categorical_features, start=n_numeric):
+            lookup = pd.Index(np.sort(list(stream['counts'][col])), dtype=object)
+            self.categories_[col] = lookup
+            counts = np.array([stream['counts'][col][value] for value in lookup], dtype='float64')
+            if counts.size:
+                # argmax takes the first of tied categories, as bincount().argmax() does
+                fill[i] = counts.argmax()
+            missing = stream['rows'] - counts.sum()
+            codes = np.arange(counts.size)
+            mean[i] = (codes @ counts + missing * fill[i]) / rows
+            variance[i] = (((codes - mean[i]) ** 2) @ counts
+                           + missing * (fill[i] - mean[i]) ** 2) / rows
+
+        self.fill_values_ = fill
+        self.mean_ = mean if self.scale else np.zeros(len(fill))
+        std = np.sqrt(variance) if self.scale else np.ones(len(fill))
+        self.scale_ = np.where(std > 0, std, 1.0)
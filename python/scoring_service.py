@@ -0,0 +1,258 @@
+"""
+Online Scoring Service
+Local HTTP service that scores claims for severity at first notice of loss. The
+model loads once at startup and concurrent requests are coalesced into
+micro-batches so each predict_proba call scores many claims at once.
+
+    POST /score   one claim object, a list of claims, or {"claims": [...]}
+    GET  /stats   request count, batch sizes and p50/p99 latency
+    GET  /health  model version
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from features import coerce_inputs, engineer_features
+from model_artifacts import SEVERE_THRESHOLD, load_artifact
+
+# Upper bound on claims scored in one predict_proba call
+MAX_BATCH_ROWS = 256
+
+# How long the first request in a batch waits for company
+MAX_WAIT_MS = 2.0
+
+# Latencies kept for the percentile report
+LATENCY_WINDOW = 10000
+
+
+class _Pending:
+    """One request's claims, waiting for the batcher to fill in results"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Coalesces concurrent scoring requests into shared predict_proba calls"""
+
+    def __init__(self, artifact, max_batch_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS):
+        self.artifact = artifact
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.pending = queue.Queue()
+        self.batches = 0
+        self.batched_rows = 0
+        threading.Thread(target=self._run, name='micro-batcher', daemon=True).start()
+
+    def score(self, frame):
+        """Block until the claims in frame are scored; returns their probabilities"""
+        item = _Pending(frame)
+        self.pending.put(item)
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _collect(self):
+        """Take the next request plus whatever arrives within max_wait"""
+        batch = [self.pending.get()]
+        rows = len(batch[0].frame)
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch_rows:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self.pending.get(timeout=timeout) if timeout > 0 else self.pending.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item.frame)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                frame = pd.concat([item.frame for item in batch], ignore_index=True)
+                probabilities = self.artifact.predict_proba(engineer_features(frame))
+            except Exception as e:
+                for item in batch:
+                    item.error = e
+                    item.done.set()
+                continue
+
+            self.batches += 1
+            self.batched_rows += len(frame)
+            offset = 0
+            for item in batch:
+                item.result = probabilities[offset:offset + len(item.frame)]
+                offset += len(item.frame)
+                item.done.set()
+
+
+class LatencyTracker:
+    """Rolling window of request latencies with percentile summaries"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+        self.claims = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds, claims):
+        with self.lock:
+            self.samples.append(seconds * 1000)
+            self.requests += 1
+            self.claims += claims
+
+    def summary(self):
+        with self.lock:
+            samples = np.array(self.samples)
+            requests, claims = self.requests, self.claims
+        if not samples.size:
+            return {'requests': requests, 'claims': claims}
+        return {
+            'requests': requests,
+            'claims': claims,
+            'p50_ms': round(float(np.percentile(samples, 50)), 3),
+            'p99_ms': round(float(np.percentile(samples, 99)), 3),
+            'max_ms': round(float(samples.max()), 3),
+        }
+
+
+def parse_claims(payload):
+    """Accept one claim, a list of claims, or {"claims": [...]}; returns (records, single)"""
+    if isinstance(payload, dict) and 'claims' in payload:
+        payload = payload['claims']
+    if isinstance(payload, dict):
+        return [payload], True
+    if isinstance(payload, list) and payload and all(isinstance(c, dict) for c in payload):
+        return payload, False
+    raise ValueError("expected a claim object, a non-empty list of claims, or {\"claims\": [...]}")
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog sized for bursts of FNOL traffic"""
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """Routes requests to the server's batcher; set up by make_server"""
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', 'model_version': self.server.model_version})
+        elif self.path == '/stats':
+            batcher = self.server.batcher
+            stats = self.server.latency.summary()
+            stats['batches'] = batcher.batches
+            stats['mean_batch_rows'] = (round(batcher.batched_rows / batcher.batches, 2)
+                                        if batcher.batches else 0)
+            self._send(200, stats)
+        else:
+            self._send(404, {'error': f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/score':
+            self._send(404, {'error': f"unknown path {self.path}"})
+            return
+
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            records, single = parse_claims(json.loads(self.rfile.read(length)))
+            frame = coerce_inputs(records)
+        except (ValueError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+            return
+
+        try:
+            probabilities = self.server.batcher.score(frame)
+        except Exception as e:
+            self._send(500, {'error': f"scoring failed: {e}"})
+            return
+
+        predictions = [
+            {'claim_id': claim_id if pd.notna(claim_id) else None,
+             'severe_probability': round(float(probability), 6),
+             'predicted_severe': bool(probability >= SEVERE_THRESHOLD)}
+            for claim_id, probability in zip(frame['claim_id'], probabilities)
+        ]
+        body = {'model_version': self.server.model_version}
+        if single:
+            body.update(predictions[0])
+        else:
+            body['predictions'] = predictions
+        self._send(200, body)
+        self.server.latency.record(time.perf_counter() - start, len(records))
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate latency at FNOL volumes
+        pass
+
+
+def make_server(host, port, version=None, max_batch_rows=MAX_BATCH_ROWS,
+                max_wait_ms=MAX_WAIT_MS):
+    """Load the model once and build a threaded HTTP server around it"""
+    artifact, metadata = load_artifact(version)
+    server = ScoringServer((host, port), ScoringHandler)
+    server.model_version = metadata['version']
+    server.model_name = metadata['model_name']
+    server.batcher = MicroBatcher(artifact, max_batch_rows, max_wait_ms)
+    server.latency = LatencyTracker()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve claim severity scores over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--version', default=None,
+                        help="Model version to serve (default: latest)")
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH_ROWS,
+                        help="Most claims scored in one model call")
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS,
+                        help="How long a request waits to share a batch")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("GUIDEWIRE INSURANCE ANALYTICS - ONLINE SCORING SERVICE")
+    print("Claim Severity at First Notice of Loss")
+    print("="*80)
+
+    print("\n1. Loading model artifact...")
+    server = make_server(args.host, args.port, args.version, args.max_batch, args.max_wait_ms)
+    print(f"   ✓ {server.model_name} {server.model_version}")
+
+    print(f"\n2. Listening on http://{args.host}:{args.port}")
+    print("   POST /score   GET /stats   GET /health   (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    stats = server.latency.summary()
+    print(f"\n3. Served {stats['requests']:,} requests ({stats['claims']:,} claims)")
+    if 'p50_ms' in stats:
+        print(f"   ✓ Latency p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms")
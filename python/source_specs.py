@@ -0,0 +1,164 @@
+"""
+Source Specifications
+Declarative column mapping, target SQL type and null handling for every raw feed.
+Adding a customer feed means adding a SourceSpec here, not another loader script.
+"""
+
+import glob
+import os
+from dataclasses import dataclass, field
+
+# Folder holding the source CSV files; override with INSURANCE_DATA_DIR
+DATA_DIR = os.environ.get('INSURANCE_DATA_DIR',
+                          '/Users/addy/Desktop/Projects/Data Analysis Project/Dataset')
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """One source column and how it lands in the raw table"""
+    source: str                 # Header in the CSV file
+    target: str                 # Column in the raw table
+    sql_type: str               # INTEGER, BIGINT, DECIMAL, CURRENCY, DATE or VARCHAR
+    null_values: tuple = ()     # Extra tokens to load as NULL
+    date_format: str = None     # strptime format for DATE columns, e.g. '%d%b%y'
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    """Everything the loader engine needs to know about one feed"""
+    name: str                   # e.g. 'customer_a'
+    title: str                  # Banner text, e.g. 'Comprehensive Claims System'
+    table: str                  # Fully-qualified raw table
+    file_name: str              # CSV file name, also stored as source_file
+    columns: tuple
+    drop_columns: tuple = field(default=())
+    file_glob: str = None       # Optional pattern for multi-file feeds, e.g. monthly extracts
+
+    @property
+    def csv_file(self):
+        return os.path.join(DATA_DIR, self.file_glob or self.file_name)
+
+    def files(self):
+        """Source files to load, oldest name first"""
+        if not self.file_glob:
+            return [self.csv_file]
+        paths = sorted(glob.glob(self.csv_file))
+        if not paths:
+            raise FileNotFoundError(self.csv_file)
+        return paths
+
+    @property
+    def target_columns(self):
+        return [col.target for col in self.columns]
+
+
+def _columns(*rows):
+    """Build ColumnSpecs from (source, target, sql_type) tuples or ColumnSpecs"""
+    return tuple(row if isinstance(row, ColumnSpec) else ColumnSpec(*row) for row in rows)
+
+
+CUSTOMER_A = SourceSpec(
+    name='customer_a',
+    title='Comprehensive Claims System',
+    table='insurance_raw.customer_a_claims',
+    file_name='insurance_claims.csv',
+    drop_columns=('_c39',),  # Trailing empty column in the export
+    columns=_columns(
+        ('months_as_customer', 'months_as_customer', 'INTEGER'),
+        ('age', 'age', 'INTEGER'),
+        ('policy_number', 'policy_number', 'BIGINT'),
+        ColumnSpec('policy_bind_date', 'policy_bind_date', 'DATE', date_format='%Y-%m-%d'),
+        ('policy_state', 'policy_state', 'VARCHAR'),
+        ('policy_csl', 'policy_csl', 'VARCHAR'),
+        ('policy_deductable', 'policy_deductable', 'INTEGER'),
+        ('policy_annual_premium', 'policy_annual_premium', 'DECIMAL'),
+        ('umbrella_limit', 'umbrella_limit', 'BIGINT'),
+        ('insured_zip', 'insured_zip', 'INTEGER'),
+        ('insured_sex', 'insured_sex', 'VARCHAR'),
+        ('insured_education_level', 'insured_education_level', 'VARCHAR'),
+        ('insured_occupation', 'insured_occupation', 'VARCHAR'),
+        ('insured_hobbies', 'insured_hobbies', 'VARCHAR'),
+        ('insured_relationship', 'insured_relationship', 'VARCHAR'),
+        ('capital-gains', 'capital_gains', 'INTEGER'),
+        ('capital-loss', 'capital_loss', 'INTEGER'),
+        ColumnSpec('incident_date', 'incident_date', 'DATE', date_format='%Y-%m-%d'),
+        ('incident_type', 'incident_type', 'VARCHAR'),
+        ('collision_type', 'collision_type', 'VARCHAR'),
+        ('incident_severity', 'incident_severity', 'VARCHAR'),
+        ('authorities_contacted', 'authorities_contacted', 'VARCHAR'),
+        ('incident_state', 'incident_state', 'VARCHAR'),
+        ('incident_city', 'incident_city', 'VARCHAR'),
+        ('incident_location', 'incident_location', 'VARCHAR'),
+        ('incident_hour_of_the_day', 'incident_hour_of_the_day', 'INTEGER'),
+        ('number_of_vehicles_involved', 'number_of_vehicles_involved', 'INTEGER'),
+        ('property_damage', 'property_damage', 'VARCHAR'),
+        ('bodily_injuries', 'bodily_injuries', 'INTEGER'),
+        ('witnesses', 'witnesses', 'INTEGER'),
+        ('police_report_available', 'police_report_available', 'VARCHAR'),
+        ('total_claim_amount', 'total_claim_amount', 'INTEGER'),
+        ('injury_claim', 'injury_claim', 'INTEGER'),
+        ('property_claim', 'property_claim', 'INTEGER'),
+        ('vehicle_claim', 'vehicle_claim', 'INTEGER'),
+        ('auto_make', 'auto_make', 'VARCHAR'),
+        ('auto_model', 'auto_model', 'VARCHAR'),
+        ('auto_year', 'auto_year', 'INTEGER'),
+        ('fraud_reported', 'fraud_reported', 'VARCHAR'),
+    ),
+)
+
+CUSTOMER_B = SourceSpec(
+    name='customer_b',
+    title='Bodily Injury Claims System',
+    table='insurance_raw.customer_b_claims',
+    file_name='AutoBi.csv',
+    columns=_columns(
+        ('Index', 'index_id', 'INTEGER'),
+        ('CASENUM', 'case_number', 'INTEGER'),
+        ('ATTORNEY', 'attorney', 'INTEGER'),
+        ('CLMSEX', 'claimant_sex', 'DECIMAL'),
+        ('MARITAL', 'marital_status', 'DECIMAL'),
+        ('CLMINSUR', 'claimant_insured', 'DECIMAL'),
+        ('SEATBELT', 'seatbelt', 'DECIMAL'),
+        ('CLMAGE', 'claimant_age', 'DECIMAL'),
+        ('LOSS', 'loss_amount', 'DECIMAL'),
+    ),
+)
+
+CUSTOMER_C = SourceSpec(
+    name='customer_c',
+    title='Policy & Claims System',
+    table='insurance_raw.customer_c_policies',
+    file_name='car_insurance_claim.csv',
+    columns=_columns(
+        ('ID', 'record_id', 'BIGINT'),
+        ('KIDSDRIV', 'kids_driving', 'INTEGER'),
+        ColumnSpec('BIRTH', 'birth_date', 'DATE', date_format='%d%b%y'),  # e.g. 16MAR39
+        ('AGE', 'age', 'DECIMAL'),
+        ('HOMEKIDS', 'home_kids', 'INTEGER'),
+        ('YOJ', 'years_on_job', 'DECIMAL'),
+        ('INCOME', 'income', 'CURRENCY'),  # e.g. "$67,349"
+        ('PARENT1', 'parent1', 'VARCHAR'),
+        ('HOME_VAL', 'home_value', 'CURRENCY'),
+        ('MSTATUS', 'marital_status', 'VARCHAR'),
+        ('GENDER', 'gender', 'VARCHAR'),
+        ('EDUCATION', 'education', 'VARCHAR'),
+        ('OCCUPATION', 'occupation', 'VARCHAR'),
+        ('TRAVTIME', 'travel_time', 'INTEGER'),
+        ('CAR_USE', 'car_use', 'VARCHAR'),
+        ('BLUEBOOK', 'bluebook_value', 'CURRENCY'),
+        ('TIF', 'time_in_force', 'INTEGER'),
+        ('CAR_TYPE', 'car_type', 'VARCHAR'),
+        ('RED_CAR', 'red_car', 'VARCHAR'),
+        ('OLDCLAIM', 'old_claim', 'CURRENCY'),
+        ('CLM_FREQ', 'claim_frequency', 'INTEGER'),
+        ('REVOKED', 'license_revoked', 'VARCHAR'),
+        ('MVR_PTS', 'mvr_points', 'INTEGER'),
+        ('CLM_AMT', 'claim_amount', 'CURRENCY'),
+        ('CAR_AGE', 'car_age', 'DECIMAL'),
+        ('CLAIM_FLAG', 'claim_flag', 'INTEGER'),
+        ('URBANICITY', 'urbanicity', 'VARCHAR'),
+    ),
+)
+
+# Registry of every feed the loaders know about, in load order
+SOURCES = {spec.name: spec for spec in (CUSTOMER_A, CUSTOMER_B, CUSTOMER_C)}
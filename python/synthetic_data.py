@@ -0,0 +1,250 @@
+"""
+Synthetic Data Generator
+Scales the Dataset/*_sample.csv files to any number of rows for benchmarking.
+Rows are bootstrapped from the sample, so joint structure and source quirks
+("$67,349" currency text, z_ prefixes, ? placeholders, blank fields) carry over
+as-is, then continuous columns are jittered so the data is not just copies.
+Columns tied to another (C's BIRTH and AGE; A's bind and incident dates, and
+its tenure and age) move with that column's jitter, so the ties hold in every
+generated row
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from source_specs import SOURCES
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Dataset')
+
+# Rows generated and written per round, bounding memory at any scale
+GENERATE_CHUNK_ROWS = 500000
+
+# Numeric columns with fewer distinct sample values are codes or counts and
+# are resampled as-is (CLAIM_FLAG, KIDSDRIV, SEATBELT...)
+CONTINUOUS_MIN_DISTINCT = 15
+
+# Identifiers that must stay unique: regenerated as a sequence
+KEY_COLUMNS = {
+    'customer_a': ('policy_number',),
+    'customer_b': ('Index', 'CASENUM'),
+    'customer_c': ('ID',),
+}
+
+# Numeric but categorical in meaning; never jittered
+VERBATIM_COLUMNS = {
+    'customer_a': ('insured_zip',),
+}
+
+# Columns moved by another column's jitter instead of their own, as
+# (anchor, step): step of the column's units per unit the anchor moved. A date
+# tied to a number moves by whole months, keeping the day (BIRTH stays the
+# birthday for the jittered AGE); tied to a date it moves by days.
+LINKED_COLUMNS = {
+    'customer_a': {'policy_bind_date': ('incident_date', 1), 'months_as_customer': ('age', 12)},
+    'customer_c': {'BIRTH': ('AGE', -12)},
+}
+
+# Columns recomputed as the sum of their parts after jitter
+SUM_COLUMNS = {
+    'customer_a': {'total_claim_amount': ('injury_claim', 'property_claim', 'vehicle_claim')},
+}
+
+
+def sample_path(spec, sample_dir=None):
+    """Dataset/<file>_sample.csv for a source, e.g. AutoBi_sample.csv"""
+    stem = os.path.splitext(spec.file_name)[0]
+    return os.path.join(sample_dir or SAMPLE_DIR, f"{stem}_sample.csv")
+
+
+def _decimals(texts):
+    """Most common number of decimal places in numeric text"""
+    places = texts.str.extract(r'\.(\d+)$', expand=False).str.len().fillna(0)
+    return int(places.mode().iloc[0]) if len(places) else 0
+
+
+def _format_unique(values, formatter):
+    """Format an array through its distinct values only"""
+    uniques, inverse = np.unique(values, return_inverse=True)
+    return np.array([formatter(value) for value in uniques], dtype=object)[inverse]
+
+
+class ColumnModel:
+    """How one sample column is reproduced: key, verbatim, number, currency or date"""
+
+    def __init__(self, column_spec, texts, kind):
+        self.name = column_spec.source
+        self.kind = kind
+        self.date_format = column_spec.date_format
+        if kind == 'date':
+            parsed = pd.to_datetime(texts, format=self.date_format, errors='coerce')
+            self.values = (parsed.to_numpy('datetime64[D]').astype('int64')
+                           .astype('float64'))
+            self.values[parsed.isna().to_numpy()] = np.nan
+            self.upper = texts[parsed.notna()].str.isupper().all()
+        elif kind in ('number', 'currency'):
+            cleaned = texts.str.replace(r'[$,]', '', regex=True) if kind == 'currency' else texts
+            self.values = pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype='float64')
+            present = texts[~np.isnan(self.values)]
+            self.decimals = _decimals(present)
+            # Whole-number columns stay whole even when written as "60.0"
+            self.integral = bool(np.all(np.mod(self.values[~np.isnan(self.values)], 1) == 0))
+        if kind in ('number', 'currency', 'date'):
+            present = self.values[~np.isnan(self.values)]
+            self.low, self.high = present.min(), present.max()
+            # Silverman's rule: a Gaussian kernel wide enough to fill the gaps
+            # between sample values without blurring the overall shape
+            self.bandwidth = 1.06 * present.std() * len(present) ** -0.2
+
+    @classmethod
+    def for_column(cls, source, column_spec, texts):
+        if column_spec.source in KEY_COLUMNS.get(source, ()):
+            return cls(column_spec, texts, 'key')
+        if column_spec.source in VERBATIM_COLUMNS.get(source, ()):
+            return cls(column_spec, texts, 'verbatim')
+        kind = {'DATE': 'date', 'CURRENCY': 'currency', 'DECIMAL': 'number',
+                'INTEGER': 'number', 'BIGINT': 'number'}.get(column_spec.sql_type)
+        if kind is None:
+            return cls(column_spec, texts, 'verbatim')
+        model = cls(column_spec, texts, kind)
+        if np.unique(model.values[~np.isnan(model.values)]).size < CONTINUOUS_MIN_DISTINCT:
+            model.kind = 'verbatim'
+        return model
+
+    def jitter(self, rows, rng):
+        """Smoothed bootstrap of the sample values at the given sample rows
+
+        Missing values and placeholders keep their sample text (None here);
+        zeros stay zero so "$0" and no-claim rows keep their share.
+        """
+        base = self.values[rows]
+        keep = ~np.isnan(base) & (base != 0)
+        jittered = np.clip(base + rng.normal(0, self.bandwidth, len(base)), self.low, self.high)
+        values = np.where(keep, jittered, base)
+        if self.kind == 'date' or self.integral:
+            return np.round(values)
+        return np.round(values, self.decimals)
+
+    def shift(self, rows, steps, months=False):
+        """Sample values at the given rows moved by steps (days or months for dates)
+
+        Missing values stay missing; unlike jitter the result is not clipped
+        to the sample range, so the tie to the anchor column is exact.
+        """
+        base = self.values[rows]
+        if not months:
+            shifted = base + steps
+            if self.kind == 'date' or self.integral:
+                return np.round(shifted)
+            return np.round(shifted, self.decimals)
+        shifted = base.copy()
+        present = ~np.isnan(base)
+        days = base[present].astype('int64').astype('datetime64[D]')
+        month_starts = days.astype('datetime64[M]')
+        moved = (month_starts + np.round(steps[present]).astype('int64')).astype('datetime64[D]')
+        shifted[present] = (moved + (days - month_starts.astype('datetime64[D]'))).astype('int64')
+        return shifted
+
+    def format(self, values):
+        if self.kind == 'currency':
+            return _format_unique(values, lambda v: f"${v:,.{self.decimals}f}")
+        if self.kind == 'date':
+            days = values.astype('int64').astype('datetime64[D]')
+            text = _format_unique(days, lambda d: pd.Timestamp(d).strftime(self.date_format))
+            return np.char.upper(text.astype(str)).astype(object) if self.upper else text
+        return _format_unique(values, lambda v: f"{v:.{self.decimals}f}")
+
+
+def generate_source(spec, rows, output_dir, sample_dir=None, seed=42,
+                    chunk_rows=GENERATE_CHUNK_ROWS):
+    """Write `rows` synthetic rows of one source to output_dir/<spec.file_name>"""
+    path = sample_path(spec, sample_dir)
+    sample = pd.read_csv(path, dtype=str, keep_default_na=False)
+    with open(path, newline='') as f:
+        header = f.readline()  # Verbatim, including A's trailing empty column
+
+    models = [ColumnModel.for_column(spec.name, column_spec, sample[column_spec.source])
+              for column_spec in spec.columns if column_spec.source in sample.columns]
+    by_name = {model.name: model for model in models}
+    linked = {name: link for name, link in LINKED_COLUMNS.get(spec.name, {}).items()
+              if name in by_name and by_name[name].kind not in ('key', 'verbatim')}
+    sums = SUM_COLUMNS.get(spec.name, {})
+    rng = np.random.default_rng([seed, list(SOURCES).index(spec.name)])
+
+    out_path = os.path.join(output_dir, spec.file_name)
+    with open(out_path, 'w', newline='') as f:
+        f.write(header)
+        for start in range(0, rows, chunk_rows):
+            size = min(chunk_rows, rows - start)
+            picks = rng.integers(0, len(sample), size)
+            chunk = sample.iloc[picks].reset_index(drop=True)
+
+            values = {}
+            for model in models:
+                if model.kind == 'key':
+                    chunk[model.name] = np.arange(start + 1, start + size + 1).astype(str)
+                elif model.kind != 'verbatim' and model.name not in linked:
+                    values[model.name] = model.jitter(picks, rng)
+            for name, (anchor, step) in linked.items():
+                base = by_name[anchor].values[picks]
+                moved = values.get(anchor, base) - base
+                values[name] = by_name[name].shift(
+                    picks, step * np.nan_to_num(moved),
+                    months=by_name[name].kind == 'date' and by_name[anchor].kind != 'date')
+            for total, parts in sums.items():
+                values[total] = sum(values.get(part, by_name[part].values[picks]) for part in parts)
+
+            for name, column in values.items():
+                # Blanks and placeholders keep their sample text
+                present = ~np.isnan(column)
+                formatted = chunk[name].to_numpy(dtype=object)
+                formatted[present] = by_name[name].format(column[present])
+                chunk[name] = formatted
+            chunk.to_csv(f, header=False, index=False)
+    return out_path
+
+
+def generate_dataset(rows, output_dir, sources=None, sample_dir=None, seed=42,
+                     chunk_rows=GENERATE_CHUNK_ROWS, verbose=True):
+    """Write `rows` synthetic rows for each selected source; returns {source: path}"""
+    say = print if verbose else (lambda *args, **kwargs: None)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for name in sources or list(SOURCES):
+        start = time.perf_counter()
+        paths[name] = generate_source(SOURCES[name], rows, output_dir, sample_dir, seed, chunk_rows)
+        size_mb = os.path.getsize(paths[name]) / (1024 * 1024)
+        say(f"   ✓ {name}: {rows:,} rows, {size_mb:,.1f} MB in {time.perf_counter() - start:.2f}s")
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic source files from the samples")
+    parser.add_argument('--rows', type=int, required=True, help="Rows per source")
+    parser.add_argument('--output', required=True,
+                        help="Folder for the generated CSVs (point INSURANCE_DATA_DIR here)")
+    parser.add_argument('--sources', nargs='+', choices=list(SOURCES), default=None,
+                        help="Subset of sources to generate (default: all)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunksize', type=int, default=GENERATE_CHUNK_ROWS,
+                        help="Rows generated per chunk")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("GUIDEWIRE INSURANCE ANALYTICS - SYNTHETIC DATA GENERATOR")
+    print(f"{args.rows:,} rows per source from the Dataset samples")
+    print("="*80)
+
+    print(f"\n1. Writing to {args.output}...")
+    try:
+        generate_dataset(args.rows, args.output, args.sources, seed=args.seed,
+                         chunk_rows=args.chunksize)
+    except FileNotFoundError as e:
+        print(f"\n✗ Sample file not found: {e}")
+        sys.exit(1)
+
+    print("\n✓ SYNTHETIC DATA COMPLETE")
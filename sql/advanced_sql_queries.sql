@@ -36,20 +36,21 @@ ORDER BY source_system, claim_rank_in_source
 LIMIT 20;
 
 -- Query 1.2: Running total of claims by incident date
--- Demonstrates: SUM() OVER with ORDER BY
+-- Demonstrates: SUM() OVER with ORDER BY, pre-aggregated rollups
+-- Reads the agg_claims_daily rollup (one row per day and source), not every claim
 SELECT 
     incident_date,
-    COUNT(*) as daily_claims,
-    SUM(total_claim_amount) as daily_claim_total,
-    SUM(COUNT(*)) OVER (
+    SUM(claim_count) as daily_claims,
+    SUM(amount_sum) as daily_claim_total,
+    SUM(SUM(claim_count)) OVER (
         ORDER BY incident_date 
         ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
     ) as running_total_claims,
-    SUM(SUM(total_claim_amount)) OVER (
+    SUM(SUM(amount_sum)) OVER (
         ORDER BY incident_date 
         ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
     ) as running_total_dollars
-FROM fct_claims
+FROM agg_claims_daily
 WHERE incident_date IS NOT NULL
 GROUP BY incident_date
 ORDER BY incident_date;
@@ -112,26 +113,28 @@ LIMIT 25;
 
 -- Query 3.1: Calculate loss ratios by age group and vehicle age
 -- Demonstrates: Multiple CTEs, aggregations, business logic
+-- Reads the agg_claims_segments_monthly rollup; paid_* columns count only
+-- amounts and premiums above zero
 WITH claim_totals AS (
     SELECT 
         age_group,
         vehicle_age_category,
-        COUNT(*) as claim_count,
-        SUM(total_claim_amount) as total_claims_paid,
-        AVG(total_claim_amount) as avg_claim_amount
-    FROM fct_claims
-    WHERE total_claim_amount > 0
+        SUM(paid_claim_count) as claim_count,
+        SUM(paid_amount_sum) as total_claims_paid,
+        SUM(paid_amount_sum) / NULLIF(SUM(paid_claim_count), 0) as avg_claim_amount
+    FROM agg_claims_segments_monthly
     GROUP BY age_group, vehicle_age_category
+    HAVING SUM(paid_claim_count) > 0
 ),
 premium_estimates AS (
     SELECT 
         age_group,
         vehicle_age_category,
-        COUNT(*) as policy_count,
-        AVG(policy_annual_premium) as avg_premium
-    FROM fct_claims
-    WHERE policy_annual_premium > 0
+        SUM(paid_premium_count) as policy_count,
+        SUM(paid_premium_sum) / NULLIF(SUM(paid_premium_count), 0) as avg_premium
+    FROM agg_claims_segments_monthly
     GROUP BY age_group, vehicle_age_category
+    HAVING SUM(paid_premium_count) > 0
 ),
 loss_ratios AS (
     SELECT 
@@ -173,20 +176,19 @@ ORDER BY loss_ratio_pct DESC;
 
 -- Query 4.1: Monthly claim trends with year-over-year comparison
 -- Demonstrates: DATE functions, LAG(), complex aggregations
+-- Reads the agg_claims_segments_monthly rollup, whose claim_month is the
+-- incident month wherever has_incident_date is true
 WITH monthly_claims AS (
     SELECT 
-        DATE_TRUNC('month', incident_date) as claim_month,
-        EXTRACT(YEAR FROM incident_date) as claim_year,
-        EXTRACT(MONTH FROM incident_date) as month_num,
-        COUNT(*) as claim_count,
-        SUM(total_claim_amount) as total_amount,
-        AVG(total_claim_amount) as avg_amount
-    FROM fct_claims
-    WHERE incident_date IS NOT NULL
-    GROUP BY 
-        DATE_TRUNC('month', incident_date),
-        EXTRACT(YEAR FROM incident_date),
-        EXTRACT(MONTH FROM incident_date)
+        claim_month,
+        EXTRACT(YEAR FROM claim_month) as claim_year,
+        EXTRACT(MONTH FROM claim_month) as month_num,
+        SUM(claim_count) as claim_count,
+        SUM(amount_sum) as total_amount,
+        SUM(amount_sum) / NULLIF(SUM(amount_count), 0) as avg_amount
+    FROM agg_claims_segments_monthly
+    WHERE has_incident_date
+    GROUP BY claim_month
 )
 SELECT 
     claim_month,
@@ -228,7 +230,7 @@ SELECT
     c.total_claim_amount,
     ROUND(s.median::numeric, 2) as median_claim,
     ROUND(
-        (c.total_claim_amount - s.median)::numeric / NULLIF(s.iqr, 0),
+        (c.total_claim_amount - s.median)::numeric / NULLIF(s.iqr, 0)::numeric,
     2) as iqr_distance,
     CASE 
         WHEN c.total_claim_amount > (s.q3 + 3 * s.iqr) THEN 'Extreme Outlier (>3 IQR)'
@@ -239,37 +241,61 @@ SELECT
 FROM fct_claims c
 CROSS JOIN claim_stats s
 WHERE c.total_claim_amount > 0
-    AND c.total_claim_amount > (s.q3 + 1.5 * s.iqr)
+    -- A scalar NUMERIC fence (not the float8 CROSS JOIN column) becomes an
+    -- index range on total_claim_amount instead of a per-row filter
+    AND c.total_claim_amount > (SELECT (q3 + 1.5 * iqr)::numeric FROM claim_stats)
 ORDER BY c.total_claim_amount DESC
 LIMIT 50;
 
+-- Query 5.2: Outlier claims tagged from streaming quantile sketches
+-- Demonstrates: Reading precomputed tags instead of sorting fct_claims
+-- python/claim_outliers.py tags each paid claim as it loads, against a
+-- t-digest of its source and incident type, so no percentile is computed here
+SELECT
+    claim_id,
+    source_system,
+    incident_type,
+    total_claim_amount,
+    ROUND(median::numeric, 2) as median_claim,
+    iqr_distance,
+    outlier_category,
+    sketch_scope
+FROM claim_outlier_tags
+WHERE outlier_category <> 'Normal'
+ORDER BY total_claim_amount DESC
+LIMIT 50;
+
 -- ============================================================================
 -- 6. FRAUD DETECTION ANALYSIS
 -- ============================================================================
 
 -- Query 6.1: Fraud patterns by demographic and incident characteristics
 -- Demonstrates: Conditional aggregation, multiple dimensions
+-- Reads the agg_claims_segments_monthly rollup; fraud_known_count counts
+-- claims with fraud_reported set, the fraud_/legit_ columns split their amounts
 SELECT 
     age_group,
     gender,
     incident_severity,
-    COUNT(*) as total_claims,
-    COUNT(CASE WHEN fraud_reported = TRUE THEN 1 END) as fraud_claims,
+    SUM(fraud_known_count) as total_claims,
+    SUM(fraud_count) as fraud_claims,
     ROUND(
-        COUNT(CASE WHEN fraud_reported = TRUE THEN 1 END)::numeric / 
-        NULLIF(COUNT(*), 0) * 100,
+        SUM(fraud_count)::numeric / 
+        NULLIF(SUM(fraud_known_count), 0) * 100,
     2) as fraud_rate_pct,
-    ROUND(AVG(total_claim_amount)::numeric, 2) as avg_claim_all,
     ROUND(
-        AVG(CASE WHEN fraud_reported = TRUE THEN total_claim_amount END)::numeric,
+        (COALESCE(SUM(fraud_amount_sum), 0) + COALESCE(SUM(legit_amount_sum), 0))::numeric /
+        NULLIF(SUM(fraud_amount_count) + SUM(legit_amount_count), 0),
+    2) as avg_claim_all,
+    ROUND(
+        SUM(fraud_amount_sum)::numeric / NULLIF(SUM(fraud_amount_count), 0),
     2) as avg_claim_fraud,
     ROUND(
-        AVG(CASE WHEN fraud_reported = FALSE THEN total_claim_amount END)::numeric,
+        SUM(legit_amount_sum)::numeric / NULLIF(SUM(legit_amount_count), 0),
     2) as avg_claim_legit
-FROM fct_claims
-WHERE fraud_reported IS NOT NULL
+FROM agg_claims_segments_monthly
 GROUP BY age_group, gender, incident_severity
-HAVING COUNT(*) >= 5  -- Only show segments with sufficient data
+HAVING SUM(fraud_known_count) >= 5  -- Only show segments with sufficient data
 ORDER BY fraud_rate_pct DESC
 LIMIT 30;
 
@@ -279,17 +305,31 @@ LIMIT 30;
 
 -- Query 7.1: Claims analysis by state
 -- Demonstrates: Grouping, ranking, geographic analysis
-WITH state_summary AS (
+-- Reads the agg_claims_states_monthly rollup; the sample standard deviation
+-- is rebuilt from the sum of squares
+WITH state_totals AS (
     SELECT 
-        COALESCE(incident_state, policy_state) as state,
-        COUNT(*) as claim_count,
-        SUM(total_claim_amount) as total_amount,
-        AVG(total_claim_amount) as avg_amount,
-        STDDEV(total_claim_amount) as stddev_amount,
-        COUNT(CASE WHEN claim_severity_category = 'Severe' THEN 1 END) as severe_count
-    FROM fct_claims
-    WHERE COALESCE(incident_state, policy_state) IS NOT NULL
-    GROUP BY COALESCE(incident_state, policy_state)
+        state,
+        SUM(claim_count) as claim_count,
+        SUM(amount_count) as amount_count,
+        SUM(amount_sum) as total_amount,
+        SUM(amount_sum_squares) as amount_sum_squares,
+        SUM(severe_count) as severe_count
+    FROM agg_claims_states_monthly
+    WHERE state IS NOT NULL
+    GROUP BY state
+),
+state_summary AS (
+    SELECT 
+        state,
+        claim_count,
+        total_amount,
+        total_amount / NULLIF(amount_count, 0) as avg_amount,
+        SQRT(GREATEST(
+            (amount_sum_squares - total_amount * total_amount / amount_count)
+            / NULLIF(amount_count - 1, 0), 0)) as stddev_amount,
+        severe_count
+    FROM state_totals
 )
 SELECT 
     state,
@@ -338,6 +378,30 @@ FROM fct_claims
 GROUP BY source_system
 ORDER BY avg_quality_score DESC;
 
+-- Query 8.2: Raw column completeness from load-time profiles
+-- Demonstrates: Reading statistics saved during the load instead of rescanning raw tables
+WITH current_loads AS (
+    -- Appends add to the last full, new or reload load of each file
+    SELECT 
+        table_name,
+        source_file,
+        MAX(load_timestamp) FILTER (WHERE load_mode <> 'append') as since
+    FROM insurance_raw.load_manifest
+    GROUP BY table_name, source_file
+)
+SELECT 
+    p.table_name,
+    p.column_name,
+    SUM(p.row_count) as total_records,
+    ROUND(100 - SUM(p.null_count)::numeric / NULLIF(SUM(p.row_count), 0) * 100, 1) as pct_complete,
+    ROUND((SUM(p.value_sum) / NULLIF(SUM(p.row_count - p.null_count), 0))::numeric, 2) as mean_value,
+    MAX(p.distinct_estimate) as max_file_distinct
+FROM insurance_raw.load_profiles p
+JOIN current_loads c USING (table_name, source_file)
+WHERE p.load_timestamp >= c.since
+GROUP BY p.table_name, p.column_name
+ORDER BY p.table_name, pct_complete, p.column_name;
+
 -- ============================================================================
 -- 9. PREDICTIVE FEATURES - Feature Engineering for ML
 -- ============================================================================
@@ -20,13 +20,17 @@ CREATE SCHEMA insurance_analytics; -- Analytics-ready marts
 -- ============================================================================
 -- RAW LAYER - Store data as-is from each source
 -- ============================================================================
+-- Raw claim tables are range-partitioned by load month on load_timestamp, so
+-- incremental dbt runs (load_timestamp > last watermark) prune to the newest
+-- partitions. Loaders create the month's partition before writing with
+-- insurance_raw.ensure_load_partition (below).
 
 -- Raw table for Dataset 1: insurance_claims.csv (Customer A)
 CREATE TABLE insurance_raw.customer_a_claims (
     months_as_customer INTEGER,
     age INTEGER,
     policy_number BIGINT,
-    policy_bind_date VARCHAR(20),
+    policy_bind_date DATE,
     policy_state VARCHAR(10),
     policy_csl VARCHAR(20),
     policy_deductable INTEGER,
@@ -40,7 +44,7 @@ CREATE TABLE insurance_raw.customer_a_claims (
     insured_relationship VARCHAR(50),
     capital_gains INTEGER,
     capital_loss INTEGER,
-    incident_date VARCHAR(20),
+    incident_date DATE,
     incident_type VARCHAR(50),
     collision_type VARCHAR(50),
     incident_severity VARCHAR(50),
@@ -62,9 +66,9 @@ CREATE TABLE insurance_raw.customer_a_claims (
     auto_model VARCHAR(50),
     auto_year INTEGER,
     fraud_reported VARCHAR(10),
-    load_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    load_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     source_file VARCHAR(100) DEFAULT 'insurance_claims.csv'
-);
+) PARTITION BY RANGE (load_timestamp);
 
 -- Raw table for Dataset 2: AutoBi.csv (Customer B)
 CREATE TABLE insurance_raw.customer_b_claims (
@@ -77,43 +81,126 @@ CREATE TABLE insurance_raw.customer_b_claims (
     seatbelt DECIMAL(5,2),
     claimant_age DECIMAL(5,2),
     loss_amount DECIMAL(10,3),
-    load_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    load_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     source_file VARCHAR(100) DEFAULT 'AutoBi.csv'
-);
+) PARTITION BY RANGE (load_timestamp);
 
 -- Raw table for Dataset 3: car_insurance_claim.csv (Customer C)
 CREATE TABLE insurance_raw.customer_c_policies (
     record_id BIGINT,
     kids_driving INTEGER,
-    birth_date VARCHAR(20),
+    birth_date DATE,                     -- Parsed from e.g. 16MAR39 at load time
     age DECIMAL(5,2),
     home_kids INTEGER,
     years_on_job DECIMAL(5,2),
-    income VARCHAR(20),
+    income NUMERIC(12,2),                -- Currency strings parsed at load time
     parent1 VARCHAR(10),
-    home_value VARCHAR(20),
+    home_value NUMERIC(12,2),
     marital_status VARCHAR(20),
     gender VARCHAR(10),
     education VARCHAR(50),
     occupation VARCHAR(100),
     travel_time INTEGER,
     car_use VARCHAR(20),
-    bluebook_value VARCHAR(20),
+    bluebook_value NUMERIC(12,2),
     time_in_force INTEGER,
     car_type VARCHAR(50),
     red_car VARCHAR(10),
-    old_claim VARCHAR(20),
+    old_claim NUMERIC(12,2),
     claim_frequency INTEGER,
     license_revoked VARCHAR(10),
     mvr_points INTEGER,
-    claim_amount VARCHAR(20),
+    claim_amount NUMERIC(12,2),
     car_age DECIMAL(5,2),
     claim_flag INTEGER,
     urbanicity VARCHAR(50),
-    load_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    load_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     source_file VARCHAR(100) DEFAULT 'car_insurance_claim.csv'
+) PARTITION BY RANGE (load_timestamp);
+
+-- Create (if missing) the monthly partition of a raw table that holds ts.
+-- There is deliberately no DEFAULT partition: a row for a month nobody
+-- prepared fails loudly instead of landing where a later partition for that
+-- month could no longer be created.
+CREATE OR REPLACE FUNCTION insurance_raw.ensure_load_partition(parent REGCLASS, ts TIMESTAMP)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start TIMESTAMP := date_trunc('month', ts);
+    schema_name TEXT;
+    partition_name TEXT;
+BEGIN
+    SELECT n.nspname, c.relname || '_p' || to_char(month_start, 'YYYY_MM')
+    INTO schema_name, partition_name
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.oid = parent;
+
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I.%I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+                   schema_name, partition_name, parent,
+                   month_start, month_start + INTERVAL '1 month');
+    RETURN partition_name;
+END;
+$$;
+
+-- Load manifest: one row per file load, used by incremental loads to skip
+-- unchanged files and append only rows past the recorded byte offset
+CREATE TABLE insurance_raw.load_manifest (
+    manifest_id SERIAL PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    source_file VARCHAR(100) NOT NULL,
+    content_hash CHAR(64) NOT NULL,      -- sha256 of the first byte_offset bytes
+    row_count BIGINT NOT NULL,           -- Total rows loaded from this file
+    byte_offset BIGINT NOT NULL,         -- File size when loaded; next append starts here
+    rows_appended BIGINT NOT NULL,       -- Rows added by this load
+    load_mode VARCHAR(20) NOT NULL,      -- full, new, append or reload
+    load_timestamp TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_load_manifest_file
+    ON insurance_raw.load_manifest(table_name, source_file, manifest_id DESC);
+
+-- Load rejects: rows the database refused during a bulk load, isolated by
+-- bisecting the failed batch, with the error text and the converted row
+CREATE TABLE insurance_raw.load_rejects (
+    reject_id SERIAL PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    source_file VARCHAR(100) NOT NULL,
+    source_row_number BIGINT,            -- 1-based data row in the source file
+    error_message TEXT NOT NULL,
+    row_data JSONB,
+    load_timestamp TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_load_rejects_load
+    ON insurance_raw.load_rejects(table_name, load_timestamp);
+
+-- Load profiles: per-column statistics computed while each file streams in,
+-- one row per column, file and load (see python/load_profiles.py)
+CREATE TABLE insurance_raw.load_profiles (
+    profile_id BIGSERIAL PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    source_file VARCHAR(100) NOT NULL,
+    load_mode VARCHAR(20) NOT NULL,      -- Same as the manifest row of this load
+    column_name VARCHAR(100) NOT NULL,
+    row_count BIGINT NOT NULL,           -- Rows this load added from the file
+    null_count BIGINT NOT NULL,
+    min_value TEXT,                      -- Numbers, ISO dates or text
+    max_value TEXT,
+    value_sum DOUBLE PRECISION,          -- Numeric columns only
+    distinct_estimate BIGINT,            -- HyperLogLog estimate
+    hll_registers BYTEA,                 -- Mergeable across files and loads
+    top_values JSONB,                    -- [[value, count], ...] most frequent first
+    load_timestamp TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_load_profiles_file
+    ON insurance_raw.load_profiles(table_name, source_file, load_timestamp);
+
 -- ============================================================================
 -- STAGING LAYER - Cleaned and standardized data
 -- ============================================================================
@@ -285,10 +372,117 @@ CREATE TABLE insurance_analytics.data_quality_log (
     CONSTRAINT chk_severity CHECK (severity IN ('Critical', 'High', 'Medium', 'Low'))
 );
 
+-- 9. Claim Predictions Table (written by python/batch_score.py)
+CREATE TABLE insurance_analytics.claim_predictions (
+    claim_id VARCHAR(100) NOT NULL,
+    model_version VARCHAR(50) NOT NULL,
+    severe_probability DOUBLE PRECISION NOT NULL,
+    predicted_severe BOOLEAN NOT NULL,
+    -- claim_features.source_load_timestamp scored; a newer one is re-scored
+    source_load_timestamp TIMESTAMP NOT NULL,
+    scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (claim_id, model_version)
+);
+
+-- 10. Claim Features Table (feature store, maintained by python/feature_store.py)
+CREATE TABLE insurance_analytics.claim_features (
+    claim_id VARCHAR(100) PRIMARY KEY,
+    -- Numerical features (NULLs are filled by the model artifact)
+    age DOUBLE PRECISION,
+    is_male DOUBLE PRECISION,
+    is_married DOUBLE PRECISION,
+    vehicle_age DOUBLE PRECISION,
+    vehicle_year DOUBLE PRECISION,
+    policy_annual_premium DOUBLE PRECISION,
+    policy_deductible DOUBLE PRECISION,
+    months_as_customer DOUBLE PRECISION,
+    incident_month DOUBLE PRECISION,
+    incident_day_of_week DOUBLE PRECISION,
+    incident_hour DOUBLE PRECISION,
+    is_weekend DOUBLE PRECISION,
+    vehicles_involved DOUBLE PRECISION,
+    bodily_injuries_count DOUBLE PRECISION,
+    witnesses_count DOUBLE PRECISION,
+    has_police_report DOUBLE PRECISION,
+    has_property_damage DOUBLE PRECISION,
+    prior_claim_count DOUBLE PRECISION,
+    mvr_points DOUBLE PRECISION,
+    license_revoked DOUBLE PRECISION,
+    premium_to_coverage_ratio DOUBLE PRECISION,
+    risk_score DOUBLE PRECISION,
+    is_red_car DOUBLE PRECISION,
+    -- Categorical features
+    age_group VARCHAR(20),
+    vehicle_age_cat VARCHAR(20),
+    time_of_day VARCHAR(20),
+    tenure_category VARCHAR(20),
+    incident_type VARCHAR(100),
+    collision_type VARCHAR(100),
+    -- Training label source
+    total_claim_amount NUMERIC(12,2),
+    -- Lineage: fct_claims source and load_timestamp consumed, and the feature
+    -- definitions used
+    source_system VARCHAR(50) NOT NULL,
+    source_load_timestamp TIMESTAMP NOT NULL,
+    feature_version VARCHAR(16) NOT NULL,
+    load_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 11. Duplicate Claim Clusters (written by python/duplicate_claims.py)
+-- Every claim_id in fct_claims with the cluster it belongs to; claims that
+-- match nothing are clusters of one with a NULL best_match_score
+CREATE TABLE insurance_analytics.claim_duplicate_clusters (
+    claim_id VARCHAR(100) PRIMARY KEY,
+    cluster_id VARCHAR(100) NOT NULL,          -- Smallest claim_id in the cluster
+    cluster_size INTEGER NOT NULL,
+    best_match_score DOUBLE PRECISION,         -- Highest pair score with another member
+    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 12. Claim Amount Sketches (maintained by python/claim_outliers.py)
+-- One t-digest of paid claim amounts per source and incident type
+CREATE TABLE insurance_analytics.claim_amount_sketches (
+    source_system VARCHAR(50) NOT NULL,
+    incident_type VARCHAR(100) NOT NULL,
+    compression INTEGER NOT NULL,
+    means DOUBLE PRECISION[] NOT NULL,         -- Centroid means, ascending
+    weights DOUBLE PRECISION[] NOT NULL,       -- Claims per centroid
+    claim_count BIGINT NOT NULL,
+    min_amount DOUBLE PRECISION,
+    max_amount DOUBLE PRECISION,
+    source_watermark TIMESTAMP NOT NULL,       -- Newest first_load_timestamp sketched for the source
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (source_system, incident_type)
+);
+
+-- 13. Claim Outlier Tags (written by python/claim_outliers.py)
+-- IQR outlier category of each paid claim, against its group's sketch at load time
+CREATE TABLE insurance_analytics.claim_outlier_tags (
+    claim_id VARCHAR(100) PRIMARY KEY,
+    source_system VARCHAR(50) NOT NULL,
+    incident_type VARCHAR(100) NOT NULL,
+    total_claim_amount NUMERIC(12,2) NOT NULL,
+    q1 DOUBLE PRECISION,
+    median DOUBLE PRECISION,
+    q3 DOUBLE PRECISION,
+    iqr_distance NUMERIC(12,2),
+    outlier_category VARCHAR(30) NOT NULL,
+    sketch_scope VARCHAR(20) NOT NULL,         -- incident_type, source_system or all
+    tagged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- ============================================================================
 -- INDEXES for Performance
 -- ============================================================================
 
+-- Raw load_timestamp indexes. BRIN stores only a min/max per block range;
+-- rows arrive in load_timestamp order, so the ranges are tight and the index
+-- is a few pages however large a partition grows. Created on the parent, so
+-- every partition gets one.
+CREATE INDEX idx_customer_a_load_ts ON insurance_raw.customer_a_claims USING BRIN (load_timestamp);
+CREATE INDEX idx_customer_b_load_ts ON insurance_raw.customer_b_claims USING BRIN (load_timestamp);
+CREATE INDEX idx_customer_c_load_ts ON insurance_raw.customer_c_policies USING BRIN (load_timestamp);
+
 -- Policies indexes
 CREATE INDEX idx_policies_source ON insurance_analytics.policies(source_system);
 CREATE INDEX idx_policies_state ON insurance_analytics.policies(policy_state);
@@ -309,6 +503,15 @@ CREATE INDEX idx_claims_incident_date ON insurance_analytics.claims(incident_dat
 CREATE INDEX idx_claims_source ON insurance_analytics.claims(source_system);
 CREATE INDEX idx_claims_status ON insurance_analytics.claims(claim_status);
 
+-- Claim features indexes (refresh watermark)
+CREATE INDEX idx_claim_features_source_ts ON insurance_analytics.claim_features(source_system, source_load_timestamp);
+
+-- Duplicate cluster members by cluster
+CREATE INDEX idx_duplicate_clusters_cluster ON insurance_analytics.claim_duplicate_clusters(cluster_id);
+
+-- Outlier tags: largest claims first (query 5.2)
+CREATE INDEX idx_outlier_tags_amount ON insurance_analytics.claim_outlier_tags(total_claim_amount);
+
 -- Claim amounts indexes
 CREATE INDEX idx_amounts_claim ON insurance_analytics.claim_amounts(claim_id);
 CREATE INDEX idx_amounts_total ON insurance_analytics.claim_amounts(total_claim_amount);
@@ -385,6 +588,9 @@ COMMENT ON SCHEMA insurance_raw IS 'Raw data layer - stores unmodified data from
 COMMENT ON SCHEMA insurance_staging IS 'Staging layer - cleaned and standardized data (managed by DBT)';
 COMMENT ON SCHEMA insurance_analytics IS 'Analytics layer - unified schema for reporting and analysis';
 
+COMMENT ON TABLE insurance_raw.load_manifest IS 'Fingerprint and byte offset of every loaded source file';
+COMMENT ON TABLE insurance_raw.load_rejects IS 'Rows rejected during bulk loads, with error text';
+COMMENT ON TABLE insurance_raw.load_profiles IS 'Per-column profile of every loaded file, computed during the load';
 COMMENT ON TABLE insurance_analytics.policies IS 'Unified policy information from all sources';
 COMMENT ON TABLE insurance_analytics.insureds IS 'Unified insured/policyholder information';
 COMMENT ON TABLE insurance_analytics.vehicles IS 'Unified vehicle information';
@@ -392,6 +598,11 @@ COMMENT ON TABLE insurance_analytics.claims IS 'Unified claims incidents';
 COMMENT ON TABLE insurance_analytics.claim_amounts IS 'Financial claim amounts';
 COMMENT ON TABLE insurance_analytics.fraud_indicators IS 'Fraud detection indicators';
 COMMENT ON TABLE insurance_analytics.data_quality_log IS 'Log of data quality issues and resolutions';
+COMMENT ON TABLE insurance_analytics.claim_predictions IS 'Claim severity probabilities per model version';
+COMMENT ON TABLE insurance_analytics.claim_features IS 'Model-ready features per claim, refreshed incrementally from fct_claims';
+COMMENT ON TABLE insurance_analytics.claim_duplicate_clusters IS 'Duplicate claim cluster per fct_claims claim_id';
+COMMENT ON TABLE insurance_analytics.claim_amount_sketches IS 'Mergeable t-digests of paid claim amounts per source and incident type';
+COMMENT ON TABLE insurance_analytics.claim_outlier_tags IS 'IQR outlier tag per paid claim from the streaming sketches';
 
 -- ============================================================================
 -- GRANT PERMISSIONS (adjust based on your user setup)
@@ -415,8 +626,9 @@ BEGIN
     RAISE NOTICE '  - insurance_staging (DBT transformations)';
     RAISE NOTICE '  - insurance_analytics (analytics tables)';
     RAISE NOTICE '';
-    RAISE NOTICE 'Tables Created: 11';
+    RAISE NOTICE 'Tables Created: 19';
     RAISE NOTICE 'Views Created: 3';
-    RAISE NOTICE 'Indexes Created: 15';
+    RAISE NOTICE 'Indexes Created: 24';
+    RAISE NOTICE 'Raw tables partitioned by load month (insurance_raw.ensure_load_partition)';
     RAISE NOTICE '====================================================================';
 END $$;
@@ -0,0 +1,347 @@
+"""
+Unit tests for the pipeline building blocks that need no database: bad-row
+isolation in bulk writes, two-digit-year dates, incremental file plans, the
+mergeable sketches, streaming preprocessing, duplicate clustering, dtype
+downcasting and request micro-batching.
+"""
+
+import hashlib
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import psycopg
+import pytest
+
+import load_manifest
+from bulk_load import write_with_bisection
+from duplicate_claims import block_pairs, find_duplicates
+from extraction import FLOAT32_EXACT_INT, _downcast
+from features import coerce_inputs
+from load_manifest import hash_file, plan_file
+from load_profiles import HyperLogLog
+from loader_engine import _to_date
+from preprocessing import ClaimPreprocessor
+from quantile_sketch import TDigest
+from scoring_service import MicroBatcher
+
+
+# ============================================================================
+# LOADER
+# ============================================================================
+
+class FakeConnection:
+    """Stands in for a psycopg connection; transaction() lets errors through"""
+
+    @contextmanager
+    def transaction(self):
+        yield
+
+
+def test_bisection_rejects_only_the_bad_row():
+    frame = pd.DataFrame({'amount': range(100)}, index=range(1000, 1100))
+    stored = []
+
+    def write(part):
+        if (part['amount'] == 37).any():
+            raise psycopg.DataError("invalid input for amount")
+        stored.extend(part['amount'])
+
+    written, rejects = write_with_bisection(FakeConnection(), write, frame, batch_rows=16,
+                                            show_progress=False)
+
+    assert written == 99
+    assert sorted(stored) == [amount for amount in range(100) if amount != 37]
+    assert len(rejects) == 1
+    assert rejects[0]['row'] == 1037
+    assert rejects[0]['data'] == {'amount': 37}
+    assert 'invalid input' in rejects[0]['error']
+
+
+def test_two_digit_years_in_the_future_roll_back_a_century():
+    series = pd.Series(['16MAR39', '01JAN05', None, '16MAR39'])
+
+    dates = _to_date(series, '%d%b%y')
+
+    assert dates[0] == pd.Timestamp('1939-03-16')
+    assert dates[1] == pd.Timestamp('2005-01-01')
+    assert pd.isna(dates[2])
+    assert dates[3] == dates[0]
+
+
+# ============================================================================
+# SKETCHES
+# ============================================================================
+
+def test_tdigest_merge_matches_a_single_pass():
+    values = np.random.default_rng(7).lognormal(mean=8, sigma=1.2, size=60000)
+    quantiles = [0.01, 0.25, 0.5, 0.9, 0.99]
+
+    single = TDigest().update(values)
+    merged = TDigest().merge(*(TDigest().update(part) for part in np.array_split(values, 6)))
+
+    assert merged.count == single.count == len(values)
+    assert (merged.minimum, merged.maximum) == (values.min(), values.max())
+    exact = np.quantile(values, quantiles)
+    for sketch in (single, merged):
+        ranks = np.searchsorted(np.sort(values), sketch.quantile(quantiles)) / len(values)
+        assert np.abs(ranks - quantiles).max() < 0.01
+    assert np.allclose(merged.quantile(quantiles), exact, rtol=0.05)
+
+
+def test_hyperloglog_merge_matches_a_single_pass():
+    ids = pd.Series([f"CLM{n:07d}" for n in range(50000)])
+    hashes = pd.util.hash_pandas_object(ids, index=False).to_numpy()
+
+    single = HyperLogLog().update(hashes)
+    merged = HyperLogLog()
+    for part in np.array_split(hashes, 5):
+        merged = merged.merge(HyperLogLog().update(part))
+
+    assert np.array_equal(merged.registers, single.registers)
+    assert merged.estimate() == single.estimate()
+    assert abs(single.estimate() - len(ids)) / len(ids) < 0.05
+
+
+# ============================================================================
+# LOAD MANIFEST
+# ============================================================================
+
+@pytest.fixture(params=[4, 1024 * 1024], ids=['small blocks', 'one block'])
+def block_bytes(request, monkeypatch):
+    """Hash in tiny blocks too, so prefixes and newlines straddle block edges"""
+    monkeypatch.setattr(load_manifest, 'HASH_BLOCK_BYTES', request.param)
+    return request.param
+
+
+def manifest_entry(plan):
+    """The manifest row a load of plan would record"""
+    return {'content_hash': plan.content_hash, 'row_count': plan.prior_rows + 2,
+            'byte_offset': plan.size}
+
+
+def test_hash_file_stops_at_the_last_newline(tmp_path, block_bytes):
+    path = tmp_path / 'claims.csv'
+    path.write_bytes(b'id,amount\n1,100\n2,25')
+
+    prefix_hash, lines_hash, lines_size, tail_bytes = hash_file(path, prefix_bytes=3)
+
+    assert prefix_hash == hashlib.sha256(b'id,').hexdigest()
+    assert lines_hash == hashlib.sha256(b'id,amount\n1,100\n').hexdigest()
+    assert (lines_size, tail_bytes) == (16, 4)
+    assert hash_file(path, prefix_bytes=100)[0] is None
+
+
+def test_plan_file_new_skip_append_and_reload(tmp_path, block_bytes):
+    path = tmp_path / 'claims.csv'
+    path.write_bytes(b'id,amount\n1,100\n2,2')
+
+    new = plan_file(path, None)
+    assert (new.action, new.start_offset, new.size, new.tail_bytes) == ('new', 0, 16, 3)
+
+    # The half-written line is still not loaded on the next run
+    skip = plan_file(path, manifest_entry(new))
+    assert (skip.action, skip.start_offset, skip.size, skip.tail_bytes) == ('skip', 16, 16, 3)
+
+    path.write_bytes(b'id,amount\n1,100\n2,250\n3,75\n')
+    append = plan_file(path, manifest_entry(new))
+    assert (append.action, append.start_offset, append.size) == ('append', 16, 27)
+    assert append.tail_bytes == 0
+    assert append.prior_rows == 2
+
+    path.write_bytes(b'id,amount\n1,999\n2,250\n3,75\n')
+    reload = plan_file(path, manifest_entry(append))
+    assert (reload.action, reload.start_offset, reload.size) == ('reload', 0, 27)
+    assert reload.prior_rows == 0
+
+
+def test_plan_file_reloads_a_truncated_file(tmp_path, block_bytes):
+    path = tmp_path / 'claims.csv'
+    path.write_bytes(b'id,amount\n1,100\n2,250\n')
+    loaded = plan_file(path, None)
+
+    path.write_bytes(b'id,amount\n')
+    assert plan_file(path, manifest_entry(loaded)).action == 'reload'
+
+
+# ============================================================================
+# PREPROCESSING
+# ============================================================================
+
+def training_frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    age = rng.normal(45, 12, rows)
+    age[rng.random(rows) < 0.1] = np.nan
+    return pd.DataFrame({
+        'age': age,
+        'premium': rng.lognormal(7, 0.3, rows),
+        'state': pd.Series(rng.choice(['OH', 'IN', 'IL', None], rows, p=[0.5, 0.3, 0.15, 0.05]),
+                           dtype=object),
+    })
+
+
+def test_partial_fit_matches_fit():
+    frame = training_frame(20000, seed=3)
+    fitted = ClaimPreprocessor(['age', 'premium'], ['state']).fit(frame)
+    streamed = ClaimPreprocessor(['age', 'premium'], ['state'])
+    for start in range(0, len(frame), 3000):
+        streamed.partial_fit(frame.iloc[start:start + 3000])
+
+    # Categories, modes and the std of complete columns are exact
+    assert list(streamed.categories_['state']) == list(fitted.categories_['state'])
+    assert streamed.fill_values_[2] == fitted.fill_values_[2]
+    np.testing.assert_allclose(streamed.mean_[[1, 2]], fitted.mean_[[1, 2]], rtol=1e-9)
+    np.testing.assert_allclose(streamed.scale_[[1, 2]], fitted.scale_[[1, 2]], rtol=1e-9)
+    # Medians come from a t-digest, and the age statistics include them
+    np.testing.assert_allclose(streamed.fill_values_[:2], fitted.fill_values_[:2], rtol=1e-2)
+    np.testing.assert_allclose(streamed.mean_[0], fitted.mean_[0], rtol=1e-3)
+    np.testing.assert_allclose(streamed.scale_[0], fitted.scale_[0], rtol=1e-2)
+
+    unseen = training_frame(500, seed=4)
+    unseen.loc[:10, 'state'] = 'TX'
+    np.testing.assert_allclose(streamed.transform(unseen), fitted.transform(unseen),
+                               rtol=1e-2, atol=1e-2)
+
+
+# ============================================================================
+# DUPLICATE CLAIMS
+# ============================================================================
+
+def test_block_pairs_pairs_each_block_once_and_skips_oversized_ones():
+    normalized = pd.DataFrame({
+        'gender': [0, 0, 0, 1, 1, 0, 1, 1, 1, np.nan],
+        'zip_code': [7, 7, 7, 7, 7, 8, 9, 9, 9, 9],
+    })
+
+    left, right, skipped = block_pairs(normalized, ('gender', 'zip_code'), max_block=2)
+    pairs = {tuple(sorted(pair)) for pair in zip(left, right)}
+    assert pairs == {(3, 4)}
+    assert len(left) == 1
+    assert skipped == 2    # (0, 7) and (1, 9) have three claims each; NULL keys never pair
+
+    left, right, skipped = block_pairs(normalized, ('gender', 'zip_code'), max_block=3)
+    pairs = {tuple(sorted(pair)) for pair in zip(left, right)}
+    assert pairs == {(0, 1), (0, 2), (1, 2), (3, 4), (6, 7), (6, 8), (7, 8)}
+    assert len(left) == 7
+    assert skipped == 0
+
+
+def test_find_duplicates_clusters_one_claimant_across_feeds():
+    claims = pd.DataFrame({
+        'claim_id': ['customer_a_1', 'customer_b_7', 'customer_a_2', 'customer_c_3',
+                     'customer_a_1'],
+        'source_system': ['customer_a', 'customer_b', 'customer_a', 'customer_c',
+                          'customer_a'],
+        'gender': ['MALE', 'M', 'FEMALE', 'M', 'MALE'],
+        'age': [40, 41, 40, 63, 40],
+        'total_claim_amount': [52080.0, 52080.4, 52080.0, 1200.0, 52080.0],
+        'incident_date': ['2015-01-25', None, '2015-01-25', None, '2015-01-25'],
+        'marital_status': ['Married', 'MARRIED', 'Single', None, 'Married'],
+        'zip_code': ['43201', None, '43201', '60601', '43201'],
+        'vehicle_year': [2004, None, 2011, 1999, 2004],
+    })
+
+    clusters, stats = find_duplicates(claims, verbose=False)
+
+    clusters = clusters.set_index('claim_id')
+    assert len(clusters) == 4    # the re-delivered customer_a_1 counts once
+    assert clusters.loc['customer_b_7', 'cluster_id'] == 'customer_a_1'
+    assert clusters.loc['customer_a_1', 'cluster_size'] == 2
+    assert clusters.loc['customer_a_1', 'best_match_score'] == 1.0
+    for claim_id in ('customer_a_2', 'customer_c_3'):
+        assert clusters.loc[claim_id, 'cluster_id'] == claim_id
+        assert clusters.loc[claim_id, 'cluster_size'] == 1
+        assert np.isnan(clusters.loc[claim_id, 'best_match_score'])
+    assert stats['duplicate_clusters'] == 1
+    assert stats['cross_source_pairs'] == 1
+
+
+# ============================================================================
+# EXTRACTION DTYPES
+# ============================================================================
+
+@pytest.mark.parametrize('values, dtype', [
+    ([0, 1, 127], 'int8'),
+    ([-40000, 3], 'int32'),
+    ([2 ** 40, 1], 'int64'),
+    ([1.0, None, 3.0], 'float32'),
+    ([FLOAT32_EXACT_INT + 1.0, None], 'float64'),
+    ([19.99, 5.0], 'float64'),
+])
+def test_downcast_picks_the_narrowest_exact_dtype(values, dtype):
+    series = pd.Series(values, dtype='float64')
+
+    narrowed = _downcast(series)
+
+    assert narrowed.dtype == dtype
+    np.testing.assert_array_equal(narrowed.astype('float64').to_numpy(), series.to_numpy())
+
+
+def test_downcast_leaves_flags_and_text_alone():
+    flags = pd.Series([True, False])
+    text = pd.Series(['a', 'b'])
+    assert _downcast(flags) is flags
+    assert _downcast(text) is text
+
+
+# ============================================================================
+# SCORING SERVICE
+# ============================================================================
+
+class RecordingArtifact:
+    """Scores each claim as age / 100 and records the rows of every call"""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def predict_proba(self, frame):
+        self.calls.append(len(frame))
+        if self.error is not None:
+            raise self.error
+        return frame['age'].to_numpy() / 100
+
+
+def score_concurrently(batcher, ages):
+    """Score one claim per age from its own thread; returns results in age order"""
+    results, errors = {}, {}
+
+    def request(age):
+        try:
+            results[age] = batcher.score(coerce_inputs([{'claim_id': str(age), 'age': age}]))
+        except Exception as e:
+            errors[age] = e
+
+    threads = [threading.Thread(target=request, args=(age,)) for age in ages]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results, errors
+
+
+def test_micro_batcher_coalesces_requests_and_returns_each_its_own_rows():
+    artifact = RecordingArtifact()
+    batcher = MicroBatcher(artifact, max_batch_rows=100, max_wait_ms=500)
+
+    results, errors = score_concurrently(batcher, range(20, 30))
+
+    assert not errors
+    assert {age: list(result) for age, result in results.items()} == \
+        {age: [age / 100] for age in range(20, 30)}
+    assert sum(artifact.calls) == 10
+    assert len(artifact.calls) < 10
+    assert batcher.batches == len(artifact.calls)
+
+
+def test_micro_batcher_caps_batch_rows_and_reports_errors_to_every_request():
+    capped = RecordingArtifact()
+    score_concurrently(MicroBatcher(capped, max_batch_rows=1, max_wait_ms=200), range(30, 35))
+    assert capped.calls == [1] * 5
+
+    failing = RecordingArtifact(error=ValueError("model unavailable"))
+    results, errors = score_concurrently(MicroBatcher(failing, max_wait_ms=200), range(40, 44))
+    assert not results
+    assert sorted(errors) == list(range(40, 44))
+    assert all(str(e) == "model unavailable" for e in errors.values())